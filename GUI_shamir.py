@@ -6,13 +6,21 @@
 # The program requires the next packages:
     # tkinter   -> PythonGUI toolkit to create the elements in the application
     # shamir    -> shamir algorithm that calculates the share secret and recovers the secret from the points given.
+    # shamir_share_file -> compact binary format used to export and upload the shares.
+    # shamir_worker     -> the secret sharing and the recovery run in a background thread, so the window keeps responding.
 from tkinter import Label,Entry,Tk,Button,filedialog,messagebox, Frame, Canvas, Scrollbar, WORD, Text, END
-from shamir_secret_sharing import Shamir
+from shamir_share_file import write_shares, read_shares
+import shamir_worker
+
+POLL_INTERVAL = 20      # Milliseconds between the reads of the events of the running task
+EVENTS_PER_POLL = 4     # Events handled in every read, the buttons of thousands of shares are added over several reads
 
 # Global variables used
 exported_shares = []        # List with button elements of the secret shares.
 recovered_points = []       # List with the points recovered from the uploaded file
 recovered_prime = []        # List with the prime number recovered from the uploaded file
+current_task = None         # The BackgroundTask that is running, only its events are shown
+shares_prime = None         # The prime number of the shares that are being generated
 
 def update_scrollregion():
     # update_scrollregion method to dynamically update the scrollbar
@@ -69,6 +77,88 @@ def generate_button(part,i,prime_number):
     button.grid(row=i+5, column=0, padx=10, pady=10)
     return button
 
+def start_task(operation, handler, *args):
+    # start_task method use to run an operation in the background
+    # Params:
+        # operation -> function of shamir_worker that will run in the worker thread
+        # handler   -> function that receives the events of the operation in the main loop
+        # args      -> the arguments of the operation
+    # Returns:
+        # -
+    # Description:
+        # The running task is cancelled, so the events of a previous operation are never mixed with the new ones
+    global current_task
+    if current_task is not None:
+        current_task.cancel()
+    current_task = shamir_worker.BackgroundTask(operation, *args).start()
+    l_progress.config(text="Working...")
+    root.after(POLL_INTERVAL, poll_task, current_task, handler)
+
+def poll_task(task, handler):
+    # poll_task method use to read the events of a task from the main loop
+    # Params:
+        # task      -> the BackgroundTask that is read
+        # handler   -> function that receives the events, it returns True with the last event of the task
+    # Returns:
+        # -
+    # Description:
+        # Only a few events are handled in every read and the read is scheduled again, so the window keeps responding
+        # while the buttons of the shares are added. The reads stop when the task finishes or is replaced.
+    global current_task
+    if task is not current_task:
+        return
+    for event in task.poll(EVENTS_PER_POLL):
+        if event[0] == "progress":
+            l_progress.config(text=f"{event[1]} / {event[2]}")
+        elif event[0] == "cancelled":
+            l_progress.config(text="Cancelled")
+            current_task = None
+            return
+        elif handler(event):
+            current_task = None
+            return
+    root.after(POLL_INTERVAL, poll_task, task, handler)
+
+def cancel_task():
+    # cancel_task method use to stop the running operation
+    # Params:
+        # -
+    # Returns:
+        # -
+    # Description:
+        # The operation stops the next time it reports its progress, the shares already shown are kept
+    if current_task is not None:
+        current_task.cancel()
+
+def share_event(event):
+    # share_event method use to show the events of the secret sharing operation
+    # Params:
+        # event -> a tuple with the kind and the values of the event (see shamir_worker)
+    # Returns:
+        # boolean -> True if it is the last event of the operation
+    # Description:
+        # The buttons of every batch of shares are added to the canvas as soon as the batch is received
+    global shares_prime
+    kind = event[0]
+    if kind == "prime":
+        shares_prime = event[1]
+    elif kind == "shares":
+        for part in event[1]:
+            exported_shares.append(generate_button(part, len(exported_shares), shares_prime))  # Track the new button
+        update_scrollregion()
+    elif kind == "result":
+        l_progress.config(text=f"{len(exported_shares)} shares generated")
+        return True
+    elif kind == "error":
+        l_progress.config(text="")
+        if isinstance(event[1], TypeError):
+            # Handle invalid input
+            messagebox.showerror("Invalid Input", "Please enter valid integers!")
+        else:
+            messagebox.showerror("Invalid Input", str(event[1]))
+        return True
+    return False
+
 def calculate_share_secret():
     # clear_values generate the shares of the secret number with the given values
     # Params:
@@ -76,23 +166,32 @@ def calculate_share_secret():
     # Returns:
         # -
     # Description:
-        # This method creates the number of shares based on the number of indicated n_number in the form
-    try:
-        # Read input from the Entry widgets
-        secret_number = el1.get()
-        n_elements = el2.get()
-        k_number = el3.get()
-        shamir_instance = Shamir()
-        shamir_instance.get_values(secret=secret_number,n_parts=n_elements, k_parts=k_number)
-        delete_buttons()
-        for i, part in enumerate(shamir_instance.points):
-            print(part)
-            button = generate_button(part, i, shamir_instance.prime_number)
-            exported_shares.append(button)  # Track the new button
-        update_scrollregion()
-    except TypeError:
-        # Handle invalid input
-        messagebox.showerror("Invalid Input", "Please enter valid integers!")
+        # This method creates the number of shares based on the number of indicated n_number in the form. The shares are
+        # calculated in the background and the buttons are added while they are received
+    # Read input from the Entry widgets
+    secret_number = el1.get()
+    n_elements = el2.get()
+    k_number = el3.get()
+    delete_buttons()
+    update_scrollregion()
+    start_task(shamir_worker.split_secret, share_event, secret_number, n_elements, k_number)
+
+def recovery_event(event):
+    # recovery_event method use to show the events of the recovery operation
+    # Params:
+        # event -> a tuple with the kind and the values of the event (see shamir_worker)
+    # Returns:
+        # boolean -> True if it is the last event of the operation
+    if event[0] == "result":
+        l_secret.config(text=event[1])
+        l_progress.config(text="")
+        text_widget.delete(1.0, END)
+        return True
+    if event[0] == "error":
+        l_progress.config(text="")
+        messagebox.showerror("Invalid Input", "The secret could not be recovered")
+        return True
+    return False
 
 def recover_secret():
     # recover_secret generate the secret number with the given parts
@@ -101,18 +200,14 @@ def recover_secret():
     # Returns:
         # -
     # Description:
-        # This method shows the secret recovered from the uploaded values
-    try:
-        shamir_instance = Shamir()
-        prime = list(set(recovered_prime)) # Making sure only one prime number is used
-        if(len(prime) > 1):
-            raise TypeError("The prime number should be the same for all values to recover")
-        secret = shamir_instance.reconstruct_secret_shamir(recovered_points, prime[0])
-        l_secret.config(text=secret)
-        text_widget.delete(1.0, END)
-    except TypeError:
+        # This method shows the secret recovered from the uploaded values. The lagrange basis is calculated in the
+        # background and the recovery can be cancelled
+    prime = list(set(recovered_prime)) # Making sure only one prime number is used
+    if len(prime) != 1:
         # Handle invalid input
         messagebox.showerror("Invalid Input", "The secret could not be recovered")
+        return
+    start_task(shamir_worker.recover_secret, recovery_event, list(recovered_points), prime[0])
 
 def upload_file():
     # upload_file method reads the uploaded document
@@ -121,21 +216,27 @@ def upload_file():
     # Returns:
         # -
     # Description:
-        # The document shoud have the correct format in order to recover the files. The expected values are the point position, point value and the prime number
+        # The document shoud have the correct format in order to recover the files. The binary share files contain the prime number and
+        # one or more points, the text files (previous format) contain the point position, point value and the prime number
     # Open a file dialog for the user to select a file
     file_path = filedialog.askopenfilename(
         title="Select a File",
-        filetypes=[("Text files", "*.txt")]
+        filetypes=[("Share files", "*.shr"), ("Text files", "*.txt")]
     )
     if file_path:
         try:
-            content = []
-            # Read the file content (optional)
-            with open(file_path, "r") as file:
-                for line in file:
-                    content.append(line.strip())
-            recovered_points.append((int(content[0]),int(content[1])))
-            recovered_prime.append(int(content[2]))
+            if file_path.endswith(".txt"):
+                content = []
+                # Read the file content (optional)
+                with open(file_path, "r") as file:
+                    for line in file:
+                        content.append(line.strip())
+                recovered_points.append((int(content[0]),int(content[1])))
+                recovered_prime.append(int(content[2]))
+            else:
+                prime_number, points = read_shares(file_path)
+                recovered_points.extend(points)
+                recovered_prime.extend([prime_number] * len(points))
             text_widget.delete(1.0, END) # Clears previous content
             text_widget.insert(END, "Recovered points: " + str(recovered_points) + "\n" +  "Recovered prime number: " + str(recovered_prime) + "\n" + "*************\n")
         except Exception as e:
@@ -148,19 +249,16 @@ def download_file(value, prime_number):
     # Returns:
         # -
     # Description:
-        # This method generates a file with the correct format to be read and operate correctly.
+        # This method generates a binary share file with the correct format to be read and operate correctly.
     # Ask the user where to save the file
     file_path = filedialog.asksaveasfilename(
-        defaultextension=".txt",
-        filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+        defaultextension=".shr",
+        filetypes=[("Share files", "*.shr"), ("All files", "*.*")],
     )
     if file_path:
         try:
             # Write the value to the file
-            with open(file_path, "w") as file:
-                file.write(str(value[0])+"\n")
-                file.write(str(value[1])+"\n")
-                file.write(str(prime_number)+"\n")
+            write_shares(file_path, [value], prime_number)
             messagebox.showinfo("Success", f"File saved successfully at {file_path}")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
@@ -239,5 +337,12 @@ upload_button.grid(row=3, column=0, columnspan=1, pady=10)
 upload_button = Button(right_frame, text="Clear values", command=clear_values, width=20, height=2)
 upload_button.grid(row=3, column=1, columnspan=1, pady=10)
 
+# Create the status bar with the progress of the running operation and the button to cancel it
+status_frame = Frame(root)
+status_frame.grid(row=1, column=0, columnspan=2, sticky="ew")
+l_progress = Label(status_frame, text="")
+l_progress.pack(side="left", padx=10)
+Button(status_frame, text="Cancel", command=cancel_task, width=10).pack(side="right", padx=10, pady=5)
+
 # Start the main loop
 root.mainloop()
\ No newline at end of file
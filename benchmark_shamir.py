@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# The program is meant to measure the performance of the Shamir secret sharing operations.
+# Run it directly with python benchmark_shamir.py, the results are written as JSON so they can be compared between
+# releases and between backends:
+    # python benchmark_shamir.py --profile quick --output results.json
+    # python benchmark_shamir.py --profile full --compare results.json
+# The lagrange basis comparison between the per term inversions and the batch inversion is run with --lagrange.
+# The comparison of the arithmetic backends (gmpy2 and the builtin integers) is run with --backends.
+# The verification cost per share of the Feldman commitments, one by one and in batch, is measured with --vss.
+# The memory of the shares stored as a list of tuples and as a ShareSet is compared with --memory.
+
+# The program requires the next packages:
+    # time          -> perf_counter is used to measure the elapsed time of the operations and strftime to date the results
+    # json          -> used to write and read the results
+    # sys           -> used to write the progress and the results
+    # platform      -> used to describe the machine in the results
+    # argparse      -> used to read the command line parameters
+    # tracemalloc   -> used to measure the memory of the stored shares
+    # shamir        -> shamir algorithm that calculates the share secret and recovers the secret from the points given.
+import sys
+import json
+import platform
+import argparse
+import tracemalloc
+from time import perf_counter, strftime
+import shamir_secret_sharing
+from shamir_vss import feldman_group
+from shamir_share_set import ShareSet
+from shamir_secret_sharing import Shamir, lagrange_weights, random_prime, search_prime, field_prime, field_prime_search, select_field_prime, PRIME_REGISTRY, \
+    ReconstructionContext, horner_evaluation, consecutive_evaluation, Share, BACKEND_GMPY2, BACKEND_PYTHON, use_backend
+
+# Benchmark profiles, the full profile covers the prime sizes from 64 to 4096 bits and k/n values up to 255 (and
+# 5000 shares to measure the evaluation of the points).
+# The batch benchmarks are skipped when batch * k * n is greater than max_batch_work.
+PROFILES = {
+    "quick": {
+        "prime_bits": (64, 256, 1024),
+        "parts": ((2, 3), (3, 5), (10, 20)),
+        "batch_sizes": (1, 100),
+        "prime_search_bits": (64, 256, 512),
+        "max_batch_work": 10**5,
+        "repeat": 3,
+    },
+    "full": {
+        "prime_bits": (64, 128, 256, 512, 1024, 2048, 3072, 4096),
+        "parts": ((2, 3), (3, 5), (10, 20), (50, 100), (128, 255), (255, 255), (100, 5000)),
+        "batch_sizes": (1, 100, 1000, 10000),
+        "prime_search_bits": (64, 128, 256, 512, 1024, 2048),
+        "max_batch_work": 10**7,
+        "repeat": 5,
+    },
+}
+
+def benchmark_prime(bits):
+    # benchmark_prime function used to get the prime number of the field used for a bit size.
+    # Params:
+        # bits  -> an integer value with the bit size of the field
+    # Returns:
+        # integer -> the registered prime of the size, or a searched prime if the size is not registered
+    return PRIME_REGISTRY.get(bits) or field_prime(bits)
+
+def per_term_lagrange_weights(x_shares, p_number):
+    # per_term_lagrange_weights function used as the reference of the previous lagrange basis calculation.
+    # Params:
+        # x_shares  -> a list with the different point positions
+        # p_number  -> an integer value with the prime number used during the secret sharing
+    # Returns:
+        # list  -> the lagrange basis of every position in the same order
+    # Description:
+        # Every term of every basis calculates its own modular inverse, k * (k - 1) inversions in total.
+    weights = []
+    for j, x_j in enumerate(x_shares):
+        lagrange_base = 1
+        for m, x_m in enumerate(x_shares):
+            if m != j:
+                lagrange_base = (lagrange_base * ((0 - x_m) % p_number) * pow((x_j - x_m) % p_number, -1, p_number)) % p_number
+        weights.append(lagrange_base)
+    return weights
+
+def measure(function, *args, repeat=3):
+    # measure function used to get the elapsed times of a function call.
+    # Params:
+        # function  -> the function that will be measured
+        # args      -> the arguments of the function
+        # repeat    -> an integer value with the number of times the function will be called
+    # Returns:
+        # list  -> the elapsed time in seconds of every call
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function(*args)
+        timings.append(perf_counter() - start)
+    return timings
+
+def _result(benchmark, params, timings, operations=1):
+    # _result function used to build the record of a benchmark.
+    # Params:
+        # benchmark     -> a string value with the name of the benchmark
+        # params        -> a dictionary with the parameters of the benchmark
+        # timings       -> a list with the elapsed times in seconds
+        # operations    -> an integer value with the number of operations (secrets, primes...) of every call
+    # Returns:
+        # dictionary -> the record with the best and mean times and the operations per second
+    best = min(timings)
+    return {
+        "benchmark": benchmark,
+        "params": params,
+        "repeat": len(timings),
+        "best_s": best,
+        "mean_s": sum(timings) / len(timings),
+        "ops_per_s": operations / best if best else None,
+    }
+
+def benchmark_batch_inversion(k_values=(10, 50, 200), p_number=Shamir._PRIME, repeat=3):
+    # benchmark_batch_inversion function used to compare the per term inversions against the batch inversion.
+    # Params:
+        # k_values  -> an iterable with the number of points used to recover the secret
+        # p_number  -> an integer value with the prime number, by default the 4096 bits prime
+        # repeat    -> an integer value with the number of times every calculation will be measured
+    # Returns:
+        # list  -> a dictionary for every k with the elapsed times and the speedup
+    results = []
+    for k_parts in k_values:
+        x_shares = list(range(1, k_parts + 1))
+        if per_term_lagrange_weights(x_shares, p_number) != lagrange_weights(x_shares, p_number):
+            raise ArithmeticError("The lagrange basis calculations do not match")
+        per_term = min(measure(per_term_lagrange_weights, x_shares, p_number, repeat=repeat))
+        batch = min(measure(lagrange_weights, x_shares, p_number, repeat=repeat))
+        results.append({"k": k_parts, "per_term_s": per_term, "batch_s": batch, "speedup": per_term / batch})
+    return results
+
+def benchmark_backends(prime_number=Shamir._PRIME, k_parts=10, n_parts=20, repeat=3):
+    # benchmark_backends function used to compare the arithmetic backends with the same operations.
+    # Params:
+        # prime_number  -> an integer value with the prime number, by default the 4096 bits prime
+        # k_parts       -> an integer value with the minimum parts to recover the secret
+        # n_parts       -> an integer value with the number of parts
+        # repeat        -> an integer value with the number of times every operation will be measured
+    # Returns:
+        # list  -> a dictionary for every operation with the best time of every installed backend and the speedup
+    # Description:
+        # The active backend is restored at the end. The reconstruction builds a new context every time, so the lagrange
+        # basis and the inversion are measured too.
+    active = shamir_secret_sharing.BACKEND
+    shamir_instance = Shamir()
+    shamir_instance.secret, shamir_instance.k_parts, shamir_instance.n_parts = prime_number // 3, k_parts, n_parts
+    shamir_instance.prime_number = prime_number
+    shamir_instance.polynomial_construction()
+    shamir_instance.points_generation()
+    x_shares, y_shares = zip(*shamir_instance.points[:k_parts])
+    value = pow(7, prime_number.bit_length(), prime_number)   # A value of the size of the prime
+    operations = {
+        "points_generation": shamir_instance.points_generation,
+        "reconstruct": lambda: ReconstructionContext(x_shares, prime_number).reconstruct(y_shares),
+        "invert": lambda: shamir_secret_sharing.invert(value, prime_number),
+        "powmod": lambda: shamir_secret_sharing.powmod(3, prime_number - 2, prime_number),
+    }
+    timings = {}
+    try:
+        for backend in (BACKEND_PYTHON, BACKEND_GMPY2):
+            try:
+                use_backend(backend)
+            except ImportError:
+                continue
+            for name, function in operations.items():
+                timings.setdefault(name, {})[backend] = min(measure(function, repeat=repeat))
+    finally:
+        use_backend(active)
+    results = []
+    for name, backend_timings in timings.items():
+        result = {"operation": name, "prime_bits": prime_number.bit_length()}
+        result.update(backend_timings)
+        if BACKEND_GMPY2 in backend_timings:
+            result["speedup"] = backend_timings[BACKEND_PYTHON] / backend_timings[BACKEND_GMPY2]
+        results.append(result)
+    return results
+
+def benchmark_verification(field_bits=(256, 2048), k_parts=10, n_parts=100, repeat=3):
+    # benchmark_verification function used to measure the verification cost per share of the Feldman commitments.
+    # Params:
+        # field_bits    -> an iterable with the bit size of the registered field primes
+        # k_parts       -> an integer value with the minimum parts to recover the secret
+        # n_parts       -> an integer value with the number of shares verified
+        # repeat        -> an integer value with the number of times every verification will be measured
+    # Returns:
+        # list  -> a dictionary for every field with the time per share of the single and the batch verification
+    results = []
+    for bits in field_bits:
+        group = feldman_group(PRIME_REGISTRY[bits])
+        shamir_instance = Shamir()
+        shamir_instance.get_values("12345", str(n_parts), str(k_parts), group=group)
+        points, commitments = shamir_instance.points, shamir_instance.commitments
+        single = min(measure(lambda: all(group.verify_share(point, commitments) for point in points), repeat=repeat))
+        batch = min(measure(group.verify_shares, points, commitments, repeat=repeat))
+        commit = min(measure(group.commit, shamir_instance.polynomial, repeat=repeat))
+        results.append({"field_bits": bits, "group_bits": group.modulus.bit_length(), "k": k_parts, "n": n_parts,
+                        "commit_s": commit, "single_per_share_s": single / n_parts, "batch_per_share_s": batch / n_parts,
+                        "speedup": single / batch})
+    return results
+
+def _allocated(function, *args):
+    # _allocated function used to measure the memory allocated by the result of a function.
+    # Params:
+        # function  -> the function that will be measured
+        # args      -> the arguments of the function
+    # Returns:
+        # tuple -> the bytes still allocated after the call (the memory of the result) and the elapsed time
+    tracemalloc.start()
+    try:
+        start = perf_counter()
+        result = function(*args)
+        elapsed = perf_counter() - start
+        allocated = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated, elapsed
+
+def benchmark_memory(field_bits=(64, 256, 4096), n_parts=10000, k_parts=10):
+    # benchmark_memory function used to compare the memory of the shares stored as a list and as a ShareSet.
+    # Params:
+        # field_bits    -> an iterable with the bit size of the registered field primes
+        # n_parts       -> an integer value with the number of shares
+        # k_parts       -> an integer value with the minimum parts to recover the secret
+    # Returns:
+        # list  -> a dictionary for every field with the bytes per share and the time to build every representation
+    # Description:
+        # The values are calculated before the measure, so only the containers are measured: the list of tuples
+        # (the previous points), the list of Share objects and the ShareSet packed from the same values. The recovery
+        # from a slice of k shares of every representation is also measured.
+    results = []
+    for bits in field_bits:
+        prime_number = PRIME_REGISTRY[bits]
+        polynomial = [12345] + [prime_number - index for index in range(1, k_parts)]
+        # The values are copied to new integers, so the list of tuples does not share them with the other containers.
+        values = list(consecutive_evaluation(polynomial, n_parts, prime_number))
+        tuples_bytes, tuples_s = _allocated(lambda: [(x, y + 0) for x, y in zip(range(1, n_parts + 1), values)])
+        shares_bytes, shares_s = _allocated(lambda: [Share(x, y + 0) for x, y in zip(range(1, n_parts + 1), values)])
+        set_bytes, set_s = _allocated(lambda: ShareSet.from_points(zip(range(1, n_parts + 1), values), prime_number))
+        points = list(zip(range(1, n_parts + 1), values))
+        share_set = ShareSet.from_points(points, prime_number)
+        reconstruct_list = min(measure(lambda: Shamir().reconstruct_secret_shamir(points[n_parts - k_parts:], prime_number)))
+        reconstruct_set = min(measure(lambda: share_set[n_parts - k_parts:].reconstruct()))
+        results.append({"field_bits": bits, "n": n_parts, "tuples_per_share_b": tuples_bytes / n_parts,
+                        "shares_per_share_b": shares_bytes / n_parts, "share_set_per_share_b": set_bytes / n_parts,
+                        "ratio": tuples_bytes / set_bytes, "tuples_s": tuples_s, "share_set_s": set_s,
+                        "reconstruct_list_s": reconstruct_list, "reconstruct_set_s": reconstruct_set})
+    return results
+
+def _uncached_field_prime_search(bits):
+    # _uncached_field_prime_search function used to search the field prime of a size without the cached prime.
+    # Params:
+        # bits  -> an integer value with the bit size of the prime
+    # Returns:
+        # PrimeSearch -> the result of the search
+    # Description:
+        # The cached prime of the size is put back after the search, so the fields used before the benchmark keep
+        # their prime number.
+    previous = shamir_secret_sharing._FIELD_PRIME_CACHE.pop(bits, None)
+    try:
+        return field_prime_search(bits)
+    finally:
+        if previous is not None:
+            shamir_secret_sharing._FIELD_PRIME_CACHE[bits] = previous
+
+def benchmark_prime_search(bits, repeat):
+    # benchmark_prime_search function used to measure the search of new primes and the cached prime selection.
+    # Params:
+        # bits      -> an integer value with the bit size of the primes
+        # repeat    -> an integer value with the number of measures
+    # Returns:
+        # list  -> the records of the benchmarks
+    # Description:
+        # generate_prime_number takes the registered primes, so the sieved search is measured directly: search_prime
+        # (with the mean of the candidates tested with Baillie-PSW), the first field_prime_search of a size and the
+        # cached field_prime_search of the next requests.
+    results = [_result("random_prime", {"bits": bits}, measure(random_prime, bits, repeat=repeat))]
+    searches = [search_prime(bits) for _ in range(repeat)]
+    result = _result("search_prime", {"bits": bits}, [search.elapsed for search in searches])
+    result["candidates"] = sum(search.candidates for search in searches) / repeat
+    results.append(result)
+    results.append(_result("field_prime_search", {"bits": bits}, measure(_uncached_field_prime_search, bits, repeat=repeat)))
+    results.append(_result("field_prime_cached", {"bits": bits}, measure(field_prime_search, bits, repeat=repeat)))
+    return results
+
+def benchmark_field_selection(secret_bits, repeat):
+    # benchmark_field_selection function used to measure the selection of the field prime for a secret size.
+    # Params:
+        # secret_bits   -> an integer value with the bit size of the secret
+        # repeat        -> an integer value with the number of measures
+    # Returns:
+        # dictionary -> the record of the benchmark with the field size and the time of the first (uncached) selection
+    secret = (1 << secret_bits) - 1
+    first = select_field_prime(secret, Shamir._PRIME, time_budget=None)
+    timings = measure(select_field_prime, secret, Shamir._PRIME, repeat=repeat)
+    result = _result("select_field_prime", {"secret_bits": secret_bits}, timings)
+    result.update(field_bits=first.bits, source=first.source, first_s=first.elapsed, candidates=first.candidates)
+    return result
+
+def benchmark_field(prime_number, k_parts, n_parts, batch_sizes, repeat, max_batch_work=None):
+    # benchmark_field function used to measure the secret sharing operations for a prime number and parts.
+    # Params:
+        # prime_number  -> an integer value with the prime number of the field
+        # k_parts       -> an integer value with the minimum parts to recover the secret
+        # n_parts       -> an integer value with the number of parts
+        # batch_sizes   -> an iterable with the number of secrets of the batch benchmarks
+        # repeat        -> an integer value with the number of measures
+        # max_batch_work -> an integer value with the maximum batch * k * n of the batch benchmarks
+    # Returns:
+        # list  -> the records of the benchmarks
+    params = {"prime_bits": prime_number.bit_length(), "k": k_parts, "n": n_parts}
+    shamir_instance = Shamir()
+    shamir_instance.secret, shamir_instance.k_parts, shamir_instance.n_parts = prime_number // 3, k_parts, n_parts
+    shamir_instance.prime_number = prime_number
+    results = [_result("polynomial_construction", params, measure(shamir_instance.polynomial_construction, repeat=repeat))]
+    results.append(_result("points_generation", params, measure(shamir_instance.points_generation, repeat=repeat)))
+    horner_points = lambda: [horner_evaluation(shamir_instance.polynomial, x, prime_number) for x in range(1, n_parts + 1)]
+    results.append(_result("horner_points", params, measure(horner_points, repeat=repeat)))
+    points = shamir_instance.points[:k_parts]
+    timings = measure(shamir_instance.reconstruct_secret_shamir, points, prime_number, repeat=repeat)
+    results.append(_result("reconstruct_secret_shamir", params, timings))
+    timings = measure(lagrange_weights, [x for x, _ in points], prime_number, repeat=repeat)
+    results.append(_result("lagrange_weights", params, timings))
+    for batch_size in batch_sizes:
+        if max_batch_work and batch_size * k_parts * n_parts > max_batch_work:
+            continue
+        batch_params = dict(params, batch=batch_size)
+        secrets = [(prime_number // 7 * secret) % prime_number for secret in range(batch_size)]
+        timings = measure(shamir_instance.split_many, secrets, n_parts, k_parts, prime_number, repeat=repeat)
+        results.append(_result("split_many", batch_params, timings, batch_size))
+        points_batches = [points[:k_parts] for points in shamir_instance.split_many(secrets, n_parts, k_parts, prime_number)]
+        timings = measure(shamir_instance.reconstruct_many, points_batches, prime_number, repeat=repeat)
+        results.append(_result("reconstruct_many", batch_params, timings, batch_size))
+    return results
+
+def run_benchmarks(profile, progress=None):
+    # run_benchmarks function used to run all the benchmarks of a profile.
+    # Params:
+        # profile   -> a dictionary with the benchmark parameters (see PROFILES)
+        # progress  -> a text stream where the name of every benchmark is written, by default nothing is written
+    # Returns:
+        # dictionary -> the description of the environment and the records of every benchmark
+    results = []
+    for bits in profile["prime_search_bits"]:
+        if progress:
+            progress.write("prime search {} bits\n".format(bits))
+        results.extend(benchmark_prime_search(bits, profile["repeat"]))
+        results.append(benchmark_field_selection(bits - 1, profile["repeat"]))
+    for bits in profile["prime_bits"]:
+        prime_number = benchmark_prime(bits)
+        for k_parts, n_parts in profile["parts"]:
+            if progress:
+                progress.write("field {} bits k={} n={}\n".format(bits, k_parts, n_parts))
+            results.extend(benchmark_field(prime_number, k_parts, n_parts, profile["batch_sizes"], profile["repeat"], profile.get("max_batch_work")))
+    return {
+        "created": strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "backend": shamir_secret_sharing.BACKEND,
+        "profile": profile,
+        "results": results,
+    }
+
+def _result_key(result):
+    # _result_key function used to identify the same benchmark in different runs.
+    # Params:
+        # result    -> a dictionary with the record of a benchmark
+    # Returns:
+        # string -> the name and the sorted parameters of the benchmark
+    return result["benchmark"] + json.dumps(result["params"], sort_keys=True)
+
+def compare_results(baseline, current):
+    # compare_results function used to compare the best times of two runs.
+    # Params:
+        # baseline  -> a dictionary with the results of the previous run
+        # current   -> a dictionary with the results of the current run
+    # Returns:
+        # list  -> a dictionary for every common benchmark with the ratio current / baseline (greater than 1 is slower)
+    previous = {_result_key(result): result for result in baseline["results"]}
+    comparison = []
+    for result in current["results"]:
+        old = previous.get(_result_key(result))
+        if old and old["best_s"]:
+            comparison.append({"benchmark": result["benchmark"], "params": result["params"],
+                               "baseline_s": old["best_s"], "current_s": result["best_s"], "ratio": result["best_s"] / old["best_s"]})
+    return comparison
+
+def main(arguments=None):
+    # main function used to run the benchmarks from the command line.
+    # Params:
+        # arguments -> a list with the command line arguments, by default sys.argv
+    # Returns:
+        # integer -> the exit code
+    parser = argparse.ArgumentParser(description="Benchmarks of the Shamir secret sharing operations")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick", help="set of parameters to measure")
+    parser.add_argument("--repeat", type=int, help="number of measures of every benchmark")
+    parser.add_argument("--output", help="path of the JSON results, by default they are written to stdout")
+    parser.add_argument("--compare", help="path of previous JSON results to compare with")
+    parser.add_argument("--lagrange", action="store_true", help="only compare the per term and the batch lagrange inversions")
+    parser.add_argument("--backends", action="store_true", help="only compare the arithmetic backends with the 4096 bits prime")
+    parser.add_argument("--vss", action="store_true", help="only measure the verification cost per share of the commitments")
+    parser.add_argument("--memory", action="store_true", help="only compare the memory of the shares as a list of tuples and as a ShareSet")
+    options = parser.parse_args(arguments)
+    if options.lagrange:
+        print("Lagrange basis with a {}-bit prime".format(Shamir._PRIME.bit_length()))
+        print("{:>6} {:>14} {:>14} {:>10}".format("k", "per term (s)", "batch (s)", "speedup"))
+        for result in benchmark_batch_inversion():
+            print("{k:>6} {per_term_s:>14.6f} {batch_s:>14.6f} {speedup:>9.1f}x".format(**result))
+        return 0
+    if options.backends:
+        print("Arithmetic backends with a {}-bit prime (active: {})".format(Shamir._PRIME.bit_length(), shamir_secret_sharing.BACKEND))
+        print("{:>18} {:>14} {:>14} {:>10}".format("operation", BACKEND_PYTHON + " (s)", BACKEND_GMPY2 + " (s)", "speedup"))
+        for result in benchmark_backends(repeat=options.repeat or 3):
+            gmpy2_time = "{:>14.6f}".format(result[BACKEND_GMPY2]) if BACKEND_GMPY2 in result else "{:>14}".format("-")
+            speedup = "{:>9.1f}x".format(result["speedup"]) if "speedup" in result else "{:>10}".format("-")
+            print("{:>18} {:>14.6f} {} {}".format(result["operation"], result[BACKEND_PYTHON], gmpy2_time, speedup))
+        return 0
+    if options.vss:
+        print("Feldman share verification (backend: {})".format(shamir_secret_sharing.BACKEND))
+        print("{:>6} {:>6} {:>5} {:>6} {:>12} {:>16} {:>16} {:>10}".format("field", "group", "k", "n", "commit (s)", "single/share (s)", "batch/share (s)", "speedup"))
+        for result in benchmark_verification(repeat=options.repeat or 3):
+            print("{field_bits:>6} {group_bits:>6} {k:>5} {n:>6} {commit_s:>12.6f} {single_per_share_s:>16.6f} {batch_per_share_s:>16.6f} {speedup:>9.1f}x".format(**result))
+        return 0
+    if options.memory:
+        print("Share storage with 10000 shares")
+        print("{:>6} {:>14} {:>14} {:>14} {:>8} {:>12} {:>12}".format("field", "tuples (B)", "Share (B)", "ShareSet (B)", "ratio", "tuples (s)", "ShareSet (s)"))
+        for result in benchmark_memory():
+            print("{field_bits:>6} {tuples_per_share_b:>14.1f} {shares_per_share_b:>14.1f} {share_set_per_share_b:>14.1f} {ratio:>7.1f}x {tuples_s:>12.6f} {share_set_s:>12.6f}".format(**result))
+        return 0
+    profile = dict(PROFILES[options.profile], name=options.profile)
+    if options.repeat:
+        profile["repeat"] = options.repeat
+    report = run_benchmarks(profile, sys.stderr)
+    if options.compare:
+        with open(options.compare) as file:
+            report["comparison"] = compare_results(json.load(file), report)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# Command line implementation of the Shamir secret sharing algorithm.
+# The tool shares or recovers secrets without the graphical interface, a single secret or a whole batch is read from
+# the options, a file or the standard input and all the shares are written in a single pass.
+#     python shamir_cli.py split -n 5 -k 3 --secret 1234 > shares.csv
+#     python shamir_cli.py split -n 5 -k 3 --input secrets.csv --output shares.csv
+#     python shamir_cli.py recover --input shares.csv
+
+# The batches are text files with one secret per line, optionally with a label (label,secret). Empty lines and the
+# lines that start with # are ignored. The shares are written as CSV:
+    # prime,<prime number>      -> first line, the prime number used for all the secrets
+    # <label>,<x>,<y>           -> a line for every share, the label is the line of the secret if it is not given
+# The labels should be unique, the labels made only of digits are reserved for the secrets without label, so the line
+# numbers never collide with the given labels.
+# The recovery reads the same format (any subset of the lines of every secret) and writes a <label>,<secret> line for
+# every secret. The throughput is reported in the standard error when the operation finishes.
+
+# The program requires the next packages:
+    # argparse  -> used to parse the options of the command line
+    # os        -> environ selects the arithmetic backend before the engine is imported
+    # contextlib -> ExitStack restores the previous backend when the command finishes
+    # sys       -> the standard input, output and error streams
+    # time      -> perf_counter is used to measure the throughput
+    # shamir    -> shamir algorithm, imported after the options are parsed (the optional backends are loaded on demand).
+import argparse
+import sys
+from os import environ
+from contextlib import ExitStack
+from time import perf_counter
+
+_BUFFER_SIZE = 1 << 20      # Size in bytes of the buffers of the input and output files
+_SECRETS_PER_BATCH = 1024   # Number of secrets shared with a single call of the engine
+_BACKENDS = ("gmpy2", "python-int")
+
+def _parser():
+    # _parser function used to build the parser of the command line.
+    # Params:
+        # -
+    # Returns:
+        # ArgumentParser -> the parser with the split and recover commands
+    parser = argparse.ArgumentParser(prog="shamir_cli.py", description="Shamir secret sharing without the graphical interface.")
+    parser.add_argument("--backend", choices=_BACKENDS, help="arithmetic backend, by default the fastest installed")
+    parser.add_argument("--workers", type=int, help="number of worker processes for the large batches")
+    parser.add_argument("--quiet", action="store_true", help="do not report the throughput")
+    commands = parser.add_subparsers(dest="command", required=True)
+    split = commands.add_parser("split", help="share one or many secrets")
+    split.add_argument("-n", "--parts", type=int, required=True, help="number of shares of every secret")
+    split.add_argument("-k", "--threshold", type=int, required=True, help="minimum shares to recover every secret")
+    split.add_argument("--secret", action="append", help="secret to share, it can be repeated (by default the input is read)")
+    split.add_argument("--prime-bits", type=int, help="size of a registered prime used instead of the smallest field")
+    split.add_argument("-i", "--input", default="-", help="file with the secrets, - for the standard input")
+    split.add_argument("-o", "--output", default="-", help="file for the shares, - for the standard output")
+    recover = commands.add_parser("recover", help="recover the secrets of a file of shares")
+    recover.add_argument("-k", "--threshold", type=int, help="use only the first k shares of every secret")
+    recover.add_argument("-i", "--input", default="-", help="file with the shares, - for the standard input")
+    recover.add_argument("-o", "--output", default="-", help="file for the secrets, - for the standard output")
+    return parser
+
+def _open(path, mode):
+    # _open function used to open a buffered text file or to get the standard stream for -.
+    # Params:
+        # path  -> a string value with the path of the file or -
+        # mode  -> a string value with "r" or "w"
+    # Returns:
+        # file -> the opened file or the standard stream
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    return open(path, mode, buffering=_BUFFER_SIZE, newline="")
+
+def _close(stream):
+    # _close function used to close a file without closing the standard streams.
+    if stream is sys.stdout:
+        stream.flush()
+    elif stream is not sys.stdin:
+        stream.close()
+
+def read_secrets(lines):
+    # read_secrets function used to read a batch of secrets.
+    # Params:
+        # lines -> an iterable with the lines of the batch (secret or label,secret)
+    # Returns:
+        # tuple -> a list with the labels and a list with the integer secrets
+    # Description:
+        # The shares are grouped by the label during the recovery, so a ValueError is raised for a repeated label and
+        # for a given label made only of digits (they are reserved for the line numbers of the secrets without label).
+    labels, secrets, seen = [], [], set()
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        label, _, secret = line.rpartition(",")
+        label, secret = label.strip(), secret.strip()
+        if not secret.isdigit():
+            raise ValueError("Line {}: the secret must be an integer number".format(number))
+        if label.isdigit():
+            raise ValueError("Line {}: the labels made only of digits are reserved for the secrets without label".format(number))
+        label = label or str(number)
+        if label in seen:
+            raise ValueError("Line {}: the label {} is repeated".format(number, label))
+        seen.add(label)
+        labels.append(label)
+        secrets.append(int(secret))
+    return labels, secrets
+
+def read_shares(lines):
+    # read_shares function used to read a file of shares.
+    # Params:
+        # lines -> an iterable with the lines of the file (prime,p and then label,x,y)
+    # Returns:
+        # tuple -> the prime number and a dictionary with the list of (x, y) shares of every label, in the order of the file
+    prime_number, shares = None, {}
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            if prime_number is None:
+                name, value = line.split(",")
+                if name.strip() != "prime":
+                    raise ValueError
+                prime_number = int(value)
+            else:
+                label, x, y = line.rsplit(",", 2)
+                shares.setdefault(label.strip(), []).append((int(x), int(y)))
+        except ValueError:
+            raise ValueError("Line {}: expected {}".format(number, "prime,<prime number>" if prime_number is None else "<label>,<x>,<y>")) from None
+    if prime_number is None:
+        raise ValueError("The file of shares does not have the prime number")
+    return prime_number, shares
+
+def _split_batches(secrets, n_parts, k_parts, prime_number, workers):
+    # _split_batches function used to share the secrets in batches.
+    # Params:
+        # secrets       -> a list with the integer secrets
+        # n_parts       -> an integer value with the number of shares of every secret
+        # k_parts       -> an integer value with the minimum shares to recover every secret
+        # prime_number  -> an integer value with the prime number of the field
+        # workers       -> an integer value with the number of worker processes or None
+    # Returns:
+        # generator -> the list of shares of every secret, in the same order as the secrets
+    # Description:
+        # Without workers the secrets are shared in batches of _SECRETS_PER_BATCH, so only the shares of one batch are
+        # kept in memory. The pool of worker processes receives the whole list, it already divides it in chunks.
+    if workers:
+        import shamir_parallel
+        yield from shamir_parallel.split_many(secrets, n_parts, k_parts, prime_number, workers)
+        return
+    from shamir_secret_sharing import Shamir
+    shamir = Shamir()
+    for start in range(0, len(secrets), _SECRETS_PER_BATCH):
+        yield from shamir.split_many(secrets[start:start + _SECRETS_PER_BATCH], n_parts, k_parts, prime_number)
+
+def split(arguments):
+    # split function used to run the split command.
+    # Params:
+        # arguments -> the parsed options of the command line
+    # Returns:
+        # tuple -> the number of secrets and the number of shares written
+    # Description:
+        # The smallest field for the largest secret is used for the whole batch, unless a registered prime is selected.
+        # The lines of every batch are written with a single call to the buffered output. The parts and the secrets are
+        # validated before the output is opened, so an invalid batch does not overwrite the output file.
+    from shamir_secret_sharing import Shamir, PRIME_REGISTRY, select_field_prime
+    if arguments.secret:
+        labels, secrets = read_secrets(arguments.secret)
+    else:
+        source = _open(arguments.input, "r")
+        try:
+            labels, secrets = read_secrets(source)
+        finally:
+            _close(source)
+    if not secrets:
+        raise ValueError("There are no secrets to share")
+    if arguments.prime_bits is not None:
+        if arguments.prime_bits not in PRIME_REGISTRY:
+            raise ValueError("There is no registered prime of {} bits, the sizes are {}".format(arguments.prime_bits, sorted(PRIME_REGISTRY)))
+        prime_number = PRIME_REGISTRY[arguments.prime_bits]
+    else:
+        prime_number = select_field_prime(max(secrets), Shamir._PRIME).prime
+    Shamir().split_many([], arguments.parts, arguments.threshold, prime_number)   # Validation of the parts
+    if max(secrets) >= prime_number:
+        raise ValueError("The secret number is too large for the given prime number...")
+    output = _open(arguments.output, "w")
+    try:
+        output.write("prime,{}\n".format(prime_number))
+        row = "{},{},{}\n".format
+        batches = _split_batches(secrets, arguments.parts, arguments.threshold, prime_number, arguments.workers)
+        for label, shares in zip(labels, batches):
+            output.writelines([row(label, x, y) for x, y in shares])
+    finally:
+        _close(output)
+    return len(secrets), len(secrets) * arguments.parts
+
+def recover(arguments):
+    # recover function used to run the recover command.
+    # Params:
+        # arguments -> the parsed options of the command line
+    # Returns:
+        # tuple -> the number of secrets recovered and the number of shares used
+    # Description:
+        # The secrets with the same positions reuse the cached lagrange basis of the engine.
+    from shamir_secret_sharing import Shamir
+    source = _open(arguments.input, "r")
+    try:
+        prime_number, shares = read_shares(source)
+    finally:
+        _close(source)
+    points_batches = list(shares.values())
+    if arguments.threshold is not None:
+        if any(len(points) < arguments.threshold for points in points_batches):
+            raise ValueError("There are secrets with less than {} shares".format(arguments.threshold))
+        points_batches = [points[:arguments.threshold] for points in points_batches]
+    if arguments.workers:
+        import shamir_parallel
+        secrets = shamir_parallel.reconstruct_many(points_batches, prime_number, arguments.workers)
+    else:
+        secrets = Shamir().reconstruct_many(points_batches, prime_number)
+    output = _open(arguments.output, "w")
+    try:
+        output.writelines(["{},{}\n".format(label, secret) for label, secret in zip(shares, secrets)])
+    finally:
+        _close(output)
+    return len(secrets), sum(len(points) for points in points_batches)
+
+def main(argv=None):
+    # main function used to run the command line tool.
+    # Params:
+        # argv  -> a list with the arguments, by default the arguments of the program
+    # Returns:
+        # integer -> the exit code, 0 if the operation succeeded and 1 if there was an error
+    # Description:
+        # The backend option is set in the environment while the command runs, the engine reads it when it is imported
+        # for the first time (so gmpy2 is not imported for python-int). If the engine was already imported the backend
+        # is selected with use_backend. The previous backend and environment are restored when the command finishes.
+    arguments = _parser().parse_args(argv)
+    previous_environment = environ.get("SHAMIR_BACKEND")
+    if arguments.backend is not None:
+        environ["SHAMIR_BACKEND"] = arguments.backend
+    try:
+        import shamir_secret_sharing
+        with ExitStack() as stack:
+            if arguments.backend is not None and shamir_secret_sharing.BACKEND != arguments.backend:
+                stack.enter_context(shamir_secret_sharing.use_backend(arguments.backend))
+            backend = shamir_secret_sharing.BACKEND
+            started = perf_counter()
+            secrets, shares = split(arguments) if arguments.command == "split" else recover(arguments)
+            elapsed = perf_counter() - started
+    except (ValueError, TypeError, ArithmeticError, ImportError, OSError) as error:
+        print("shamir: error: {}".format(error), file=sys.stderr)
+        return 1
+    finally:
+        if previous_environment is None:
+            environ.pop("SHAMIR_BACKEND", None)
+        else:
+            environ["SHAMIR_BACKEND"] = previous_environment
+    if not arguments.quiet:
+        rate = 1 / elapsed if elapsed > 0 else float("inf")
+        print("shamir: {} {} secrets ({} shares) in {:.3f} s, {:.0f} secrets/s, {:.0f} shares/s, backend {}".format(
+            "split" if arguments.command == "split" else "recovered", secrets, shares, elapsed, secrets * rate, shares * rate,
+            backend), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
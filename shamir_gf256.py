@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# Implementation of the Shamir secret sharing algorithm over the finite field GF(2^8).
+# Every byte of the secret is shared independently, so every share has the same size as the secret and the operations
+# are table lookups instead of big prime number arithmetic. The field uses the AES polynomial x^8 + x^4 + x^3 + x + 1
+# and the generator 3 for the logarithm and antilogarithm tables.
+# The positions of the shares should be between 1 and 255.
+
+# The program requires the next packages:
+    # os
+    # numpy (optional) -> used to evaluate the polynomials over the whole buffer with table lookups, it is imported the
+    #                     first time a secret is shared
+    # shamir           -> numpy_module imports numpy when it is needed.
+# The program uses the urandom package to generate random coefficients directly from the OS.
+from os import urandom
+from shamir_secret_sharing import numpy_module
+
+_FIELD_POLYNOMIAL = 0x11B
+
+def _build_tables():
+    # _build_tables function used to calculate the antilogarithm and logarithm tables of the field.
+    # Params:
+        # -
+    # Returns:
+        # tuple -> the antilogarithm table (doubled to avoid the module 255) and the logarithm table
+    exp_table, log_table = [0] * 510, [0] * 256
+    value = 1
+    for power in range(255):
+        exp_table[power] = exp_table[power + 255] = value
+        log_table[value] = power
+        # The value is multiplied by the generator 3 (value * 2 + value)
+        doubled = value << 1
+        if doubled & 0x100:
+            doubled ^= _FIELD_POLYNOMIAL
+        value ^= doubled
+    return exp_table, log_table
+
+_EXP, _LOG = _build_tables()
+
+def gf_mul(a, b):
+    # gf_mul function used to multiply two elements of the field.
+    # Params:
+        # a -> an integer value between 0 and 255
+        # b -> an integer value between 0 and 255
+    # Returns:
+        # integer -> the product in GF(2^8)
+    if a == 0 or b == 0:
+        return 0
+    return _EXP[_LOG[a] + _LOG[b]]
+
+def gf_inverse(a):
+    # gf_inverse function used to calculate the multiplicative inverse of an element of the field.
+    # Params:
+        # a -> an integer value between 1 and 255
+    # Returns:
+        # integer -> the inverse in GF(2^8)
+    if a == 0:
+        raise ZeroDivisionError("Zero does not have an inverse in GF(2^8)")
+    return _EXP[255 - _LOG[a]]
+
+# Multiplication table, the row a is a translation table that multiplies every byte by a.
+_MUL_TABLES = [bytes(gf_mul(a, b) for b in range(256)) for a in range(256)]
+_MUL_ARRAY = False   # The multiplication table as a numpy array once it is built, None without numpy
+
+def _mul_array():
+    # _mul_array function used to build the numpy multiplication table the first time it is needed.
+    # Params:
+        # -
+    # Returns:
+        # array -> the (256 x 256) uint8 multiplication table, None if numpy is not installed
+    global _MUL_ARRAY
+    if _MUL_ARRAY is False:
+        np = numpy_module()
+        _MUL_ARRAY = np.frombuffer(b"".join(_MUL_TABLES), dtype=np.uint8).reshape(256, 256) if np is not None else None
+    return _MUL_ARRAY
+
+def _xor(a, b):
+    # _xor function used to add two buffers of the same size in GF(2^8).
+    # Params:
+        # a -> a bytes value
+        # b -> a bytes value with the same size
+    # Returns:
+        # bytes -> the byte-wise exclusive or of the buffers
+    return (int.from_bytes(a) ^ int.from_bytes(b)).to_bytes(len(a))
+
+def _evaluate(coefficients, x):
+    # _evaluate function used to evaluate the polynomials of every byte in the position x with the Horner method.
+    # Params:
+        # coefficients  -> a list with the coefficient buffers, starting with the secret
+        # x             -> an integer value with the position between 1 and 255
+    # Returns:
+        # bytes -> the value of every byte polynomial in the position x
+    # Description:
+        # With numpy the multiplication is a lookup of the row x of the multiplication table for the whole buffer,
+        # otherwise the row is used as a translation table of the bytes.
+    mul_array = _mul_array()
+    if mul_array is not None:
+        np = numpy_module()
+        row = mul_array[x]
+        result = np.frombuffer(coefficients[-1], dtype=np.uint8)
+        for coeff in reversed(coefficients[:-1]):
+            result = row[result] ^ np.frombuffer(coeff, dtype=np.uint8)
+        return result.tobytes()
+    table = _MUL_TABLES[x]
+    result = coefficients[-1]
+    for coeff in reversed(coefficients[:-1]):
+        result = _xor(result.translate(table), coeff)
+    return result
+
+def split_bytes(secret, n_parts, k_parts):
+    # split_bytes function used to share a byte string secret in GF(2^8).
+    # Params:
+        # secret    -> a bytes value with the secret
+        # n_parts   -> an integer value with the number of shares, at most 255
+        # k_parts   -> an integer value with the minimum shares to recover the secret
+    # Returns:
+        # list  -> a tuple with the position and the share bytes for every share, the shares have the size of the secret
+    # Description:
+        # The k - 1 random coefficients of every byte are taken from a single read of random bytes, every byte value
+        # is a valid element of the field so no value is rejected.
+    if not isinstance(n_parts, int) or not isinstance(k_parts, int):
+        raise TypeError("The parts that will be devided must be integer numbers")
+    if k_parts > n_parts or k_parts <= 1:
+        raise ArithmeticError("The minimum number to recover must be lower or equal than the nummber of pieces and should be greater than 1")
+    if n_parts > 255:
+        raise ValueError("The number of shares in GF(2^8) should be at most 255")
+    secret = bytes(secret)
+    length = len(secret)
+    random_bytes = urandom(length * (k_parts - 1))
+    coefficients = [secret] + [random_bytes[power * length:(power + 1) * length] for power in range(k_parts - 1)]
+    return [(x, _evaluate(coefficients, x)) for x in range(1, n_parts + 1)]
+
+def recover_bytes(shares):
+    # recover_bytes function used to recover a byte string secret from its GF(2^8) shares.
+    # Params:
+        # shares    -> a list with at least k tuples with the position and the share bytes
+    # Returns:
+        # bytes -> the secret
+    # Description:
+        # The lagrange basis in x = 0 are calculated once for the positions (the subtraction in the field is the
+        # exclusive or), then every share is multiplied by its basis with a table lookup and all of them are added.
+    x_shares = [x for x, _ in shares]
+    if len(set(x_shares)) != len(x_shares) or not all(0 < x < 256 for x in x_shares):
+        raise ValueError("The share positions should be different and between 1 and 255")
+    if len({len(y) for _, y in shares}) != 1:
+        raise ValueError("The shares should have the same size")
+    secret = None
+    for x_j, y_j in shares:
+        numerator, denominator = 1, 1
+        for x_m in x_shares:
+            if x_m != x_j:
+                numerator = gf_mul(numerator, x_m)
+                denominator = gf_mul(denominator, x_j ^ x_m)
+        term = bytes(y_j).translate(_MUL_TABLES[gf_mul(numerator, gf_inverse(denominator))])
+        secret = term if secret is None else _xor(secret, term)
+    return secret
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# Parallel implementation of the bulk Shamir secret sharing operations for multi-core hosts.
+# The secrets are divided in chunks that are shared or recovered by a pool of worker processes, the results are merged
+# in the same order as the input. Every chunk is sent to the workers as a single buffer of fixed width big-endian
+# values instead of a list of integers, so the pickling is a copy of one bytes object per chunk.
+
+# The program requires the next packages:
+    # os                    -> cpu_count is used as the default number of workers
+    # collections           -> deque is used to keep the submitted chunks in order
+    # itertools             -> chain is used to put back the first batch of points
+    # concurrent.futures    -> ProcessPoolExecutor runs the chunks in the worker processes
+    # shamir                -> shamir algorithm that calculates the share secret and recovers the secret from the points given.
+from os import cpu_count
+from collections import deque
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from shamir_secret_sharing import Shamir, Share, reconstruction_context
+
+DEFAULT_CHUNK_SIZE = 1024   # Number of secrets sent to a worker in every task
+
+def process_executor(workers=None):
+    # process_executor function used to create the pool of worker processes.
+    # Params:
+        # workers   -> an integer value with the number of processes, by default the number of CPUs
+    # Returns:
+        # ProcessPoolExecutor -> the pool of worker processes
+    return ProcessPoolExecutor(max_workers=workers or cpu_count())
+
+def ordered_map(function, tasks, executor=None, window=None):
+    # ordered_map function used to run a function over the tasks and get the results in the same order.
+    # Params:
+        # function  -> a module level function that will be called with the arguments of every task
+        # tasks     -> an iterable with a tuple of arguments for every task
+        # executor  -> an executor used to run the tasks, if it is None the tasks are run in the current process
+        # window    -> an integer value with the maximum tasks submitted at the same time, by default twice the CPUs
+    # Returns:
+        # generator -> the result of every task in the same order as the tasks
+    # Description:
+        # Only a window of tasks is submitted to the executor, so the tasks can be read from a stream without loading
+        # all of them in memory. The oldest task is always waited first to merge the results in order.
+    if executor is None:
+        for task in tasks:
+            yield function(*task)
+        return
+    window = window or 2 * cpu_count()
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(function, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def pack_values(values, width):
+    # pack_values function used to pack integer values into a single buffer of fixed width big-endian values.
+    # Params:
+        # values    -> an iterable with the non negative integer values
+        # width     -> an integer value with the number of bytes of every value
+    # Returns:
+        # bytes -> the packed values
+    return b"".join(value.to_bytes(width) for value in values)
+
+def unpack_values(buffer, width):
+    # unpack_values function used to read the integer values of a buffer of fixed width big-endian values.
+    # Params:
+        # buffer    -> a bytes-like object with the packed values
+        # width     -> an integer value with the number of bytes of every value
+    # Returns:
+        # list  -> the integer values
+    return [int.from_bytes(buffer[start:start + width]) for start in range(0, len(buffer), width)]
+
+def _split_task(packed_secrets, width, n_parts, k_parts, prime_number):
+    # _split_task function used by the workers to share a chunk of packed secrets.
+    # Params:
+        # packed_secrets    -> a bytes value with the packed secrets of the chunk
+        # width             -> an integer value with the number of bytes of every value
+        # n_parts           -> an integer value with the number of parts of every secret
+        # k_parts           -> an integer value with the minimum parts to recover every secret
+        # prime_number      -> an integer value with the prime number used for all the secrets
+    # Returns:
+        # bytes -> the packed y values, n values for every secret
+    shares = Shamir().split_many(unpack_values(packed_secrets, width), n_parts, k_parts, prime_number)
+    return pack_values((y for points in shares for _, y in points), width)
+
+def _reconstruct_task(packed_points, width, k_parts, p_number):
+    # _reconstruct_task function used by the workers to recover a chunk of packed secrets.
+    # Params:
+        # packed_points -> a bytes value with the packed x and y values of k points for every secret
+        # width         -> an integer value with the number of bytes of every value
+        # k_parts       -> an integer value with the number of points of every secret
+        # p_number      -> an integer value with the prime number used for all the secrets
+    # Returns:
+        # bytes -> the packed secrets
+    values = unpack_values(packed_points, width)
+    step = 2 * k_parts
+    secrets = []
+    for start in range(0, len(values), step):
+        x_shares, y_shares = values[start:start + step:2], values[start + 1:start + step:2]
+        secrets.append(reconstruction_context(tuple(x_shares), p_number).reconstruct(y_shares))
+    return pack_values(secrets, width)
+
+def _chunks(values, chunk_size):
+    # _chunks function used to divide an iterable in lists of a maximum size.
+    # Params:
+        # values        -> an iterable with the values
+        # chunk_size    -> an integer value with the maximum size of every list
+    # Returns:
+        # generator -> the lists of values
+    chunk = []
+    for value in values:
+        chunk.append(value)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _pack_secrets(chunk, width, prime_number):
+    # _pack_secrets function used to validate and pack a chunk of secrets before it is sent to a worker.
+    # Params:
+        # chunk         -> a list with the secrets of the chunk
+        # width         -> an integer value with the number of bytes of every value
+        # prime_number  -> an integer value with the prime number used for all the secrets
+    # Returns:
+        # bytes -> the packed secrets
+    # Description:
+        # The secrets are checked as in Shamir.split_many, so an invalid secret raises the same error instead of
+        # failing while it is packed.
+    if not all(isinstance(secret, int) for secret in chunk):
+        raise TypeError("The secrets and the parts that will be devided must be integer numbers")
+    if any(secret < 0 or secret >= prime_number for secret in chunk):
+        raise ValueError("The secret number is too large for the given prime number...")
+    return pack_values(chunk, width)
+
+def split_many(secrets, n_parts, k_parts, prime_number=Shamir._PRIME, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # split_many function used to calculate the shares of a batch of secrets with a pool of worker processes.
+    # Params:
+        # secrets       -> an iterable with the integer secrets that will be shared
+        # n_parts       -> an integer value with the number of parts that every secret will be divided
+        # k_parts       -> an integer value with the minimum parts to recover every secret
+        # prime_number  -> an integer value with the prime number used for all the secrets
+        # workers       -> an integer value with the number of processes, by default the number of CPUs
+        # chunk_size    -> an integer value with the number of secrets of every task
+    # Returns:
+        # list  -> a list with the Share points of every secret, in the same order as the secrets
+    # Description:
+        # The parameters are validated in the current process with an empty batch and the secrets of every chunk are
+        # validated before the chunk is packed and shared by a worker. The packed values of every chunk are unpacked in order.
+    Shamir().split_many([], n_parts, k_parts, prime_number)
+    width = (prime_number.bit_length() + 7) // 8
+    tasks = ((_pack_secrets(chunk, width, prime_number), width, n_parts, k_parts, prime_number) for chunk in _chunks(secrets, chunk_size))
+    x_positions = range(1, n_parts + 1)
+    shares = []
+    workers = workers or cpu_count()
+    with process_executor(workers) as executor:
+        for packed_shares in ordered_map(_split_task, tasks, executor, 2 * workers):
+            values = unpack_values(packed_shares, width)
+            for start in range(0, len(values), n_parts):
+                shares.append(list(map(Share, x_positions, values[start:start + n_parts])))
+    return shares
+
+def _pack_points(chunk, k_parts, width):
+    # _pack_points function used to pack the points of a chunk of secrets as x1, y1, x2, y2, ... for every secret.
+    # Params:
+        # chunk     -> a list with the points of every secret
+        # k_parts   -> an integer value with the number of points of every secret
+        # width     -> an integer value with the number of bytes of every value
+    # Returns:
+        # bytes -> the packed points sorted by the position
+    if any(len(points) != k_parts for points in chunk):
+        raise ValueError("All the secrets should be recovered with the same number of points")
+    return pack_values((value for points in chunk for point in sorted(points) for value in point), width)
+
+def reconstruct_many(points_batches, p_number, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # reconstruct_many function used to recover a batch of secrets with a pool of worker processes.
+    # Params:
+        # points_batches    -> an iterable with the list of points of every secret, all of them with k points
+        # p_number          -> an integer value with the prime number used in the secret sharing operation
+        # workers           -> an integer value with the number of processes, by default the number of CPUs
+        # chunk_size        -> an integer value with the number of secrets of every task
+    # Returns:
+        # list  -> the recovered secrets in the same order as the batches
+    # Description:
+        # The workers keep their own cache of reconstruction contexts, so the secrets with the same positions only
+        # calculate the lagrange basis once per worker.
+    points_batches = iter(points_batches)
+    first_points = next(points_batches, None)
+    if first_points is None:
+        return []
+    k_parts = len(first_points)
+    width = (p_number.bit_length() + 7) // 8
+    tasks = ((_pack_points(chunk, k_parts, width), width, k_parts, p_number)
+             for chunk in _chunks(chain([first_points], points_batches), chunk_size))
+    secrets = []
+    workers = workers or cpu_count()
+    with process_executor(workers) as executor:
+        for packed_secrets in ordered_map(_reconstruct_task, tasks, executor, 2 * workers):
+            secrets.extend(unpack_values(packed_secrets, width))
+    return secrets
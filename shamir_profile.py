@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# Optional instrumentation of the Shamir engine.
+# A Profiler replaces the functions and methods of the hot paths with measured versions while it is enabled and puts
+# back the original ones when it is disabled, so the engine does not check any flag and the instrumentation costs
+# nothing when it is not used. Only the calls made through the shamir_secret_sharing module are measured.
+#     with Profiler() as profiler:
+#         Shamir().get_values("1234", "5", "3")
+#     print(profiler.to_json())
+
+# The profiler records:
+    # phases            -> the exclusive wall time and the calls of every phase: prime_search, randomness, evaluation,
+    #                      inversion (lagrange basis and modular inversions) and reconstruction. The time of a nested
+    #                      phase is not added to the phase that called it.
+    # counters          -> modmul (modular multiplications of the evaluation and the lagrange code, calculated from the
+    #                      sizes of the arguments), inversions, urandom_bytes and prime_candidates (tested with Baillie-PSW)
+    # recursion_depth   -> the maximum depth of the nested calls of every function
+    # functions         -> the calls of every function
+# The engine calls of every thread are measured (the worker of the interface, the recovery server or the threads that
+# share a Shamir instance): every thread has its own stack of phases and the records are updated with a lock, so the
+# time of the phases is the sum of the time of all the threads.
+
+# The program requires the next packages:
+    # json          -> used to export the records
+    # time          -> perf_counter is used to measure the phases
+    # functools     -> wraps keeps the names of the measured functions
+    # threading     -> the stack of phases of every thread and the lock of the records
+    # shamir        -> shamir algorithm, the functions and methods that are measured.
+import json
+from time import perf_counter
+from functools import wraps
+from threading import local, Lock
+import shamir_secret_sharing
+from shamir_secret_sharing import Shamir, CoefficientSource, ReconstructionContext
+
+PHASES = ("prime_search", "randomness", "evaluation", "inversion", "reconstruction")
+COUNTERS = ("modmul", "inversions", "urandom_bytes", "prime_candidates")
+
+# Functions of the shamir_secret_sharing module and methods of its classes that are measured, with their phase and the
+# counters added after every call from the arguments and the result.
+_MODULE_FUNCTIONS = {
+    "search_prime": ("prime_search", lambda args, result: {"prime_candidates": result.candidates}),
+    "is_probable_prime": ("prime_search", None),
+    "horner_evaluation": ("evaluation", lambda args, result: {"modmul": len(args[0])}),
+    "batch_inverse": ("inversion", lambda args, result: {"modmul": max(3 * len(args[0]) - 2, 0)}),
+    "lagrange_weights": ("inversion", lambda args, result: {"modmul": len(args[0]) * (len(args[0]) + 3)}),
+    "invert": ("inversion", lambda args, result: {"inversions": 1}),
+    "urandom": ("randomness", lambda args, result: {"urandom_bytes": len(result)}),
+}
+_METHODS = {
+    Shamir: {
+        "generate_prime_number": ("prime_search", None),
+        "check_prime": ("prime_search", None),
+        "polynomial_construction": ("randomness", None),
+        "random_number_coeff_selection": ("randomness", None),
+        "points_generation": ("evaluation", None),
+        "split_many": ("evaluation", None),
+        "lagrange_basis_calculation": ("inversion", lambda args, result: {"modmul": 2 * len(args[1]) - 1}),
+        "reconstruct_secret_shamir": ("reconstruction", None),
+        "reconstruct_many": ("reconstruction", None),
+    },
+    CoefficientSource: {
+        "coefficients": ("randomness", None),
+        "coefficient_array": ("randomness", None),
+    },
+    ReconstructionContext: {
+        "reconstruct": ("reconstruction", lambda args, result: {"modmul": len(args[0].weights)}),
+        "reconstruct_many": ("reconstruction", lambda args, result: {"modmul": len(args[0].weights) * len(result)}),
+    },
+}
+
+_ACTIVE = None   # The enabled profiler, only one can be enabled at the same time
+
+class Profiler:
+    # Profiler class used to measure the phases and the operations of the Shamir engine.
+    #Variables:
+        # phases, counters, recursion_depth and functions -> the records (see the description of the module)
+    #Methods:
+        # enable    -> method that replaces the measured functions
+        # disable   -> method that puts back the original functions
+        # reset     -> method that clears the records
+        # as_dict   -> method that exports the records as a dictionary
+        # to_json   -> method that exports the records as JSON
+
+    def __init__(self):
+        # Profiler constructor method use to initialize the empty records.
+        self._originals = []
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        # reset method use to clear the records.
+        self.phases = {phase: {"calls": 0, "time_s": 0.0} for phase in PHASES}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.recursion_depth = {}
+        self.functions = {}
+        self._local = local()   # The stack of phases and the depth of the calls of every thread
+        self._elapsed = 0.0
+        self._enabled_at = None
+
+    def _thread_state(self):
+        # _thread_state method use to get the stack of phases and the depth of the calls of the current thread.
+        state = self._local
+        if not hasattr(state, "stack"):
+            state.stack, state.depth = [], {}
+        return state.stack, state.depth
+
+    def _enter(self, name, phase):
+        # _enter method use to start the time of a phase and to pause the phase of the caller in the same thread.
+        now = perf_counter()
+        stack, depths = self._thread_state()
+        depth = depths.get(name, 0) + 1
+        depths[name] = depth
+        with self._lock:
+            if stack:
+                caller_phase, started = stack[-1]
+                self.phases[caller_phase]["time_s"] += now - started
+            self.recursion_depth[name] = max(self.recursion_depth.get(name, 0), depth)
+            self.functions[name] = self.functions.get(name, 0) + 1
+            self.phases[phase]["calls"] += 1
+        stack.append((phase, now))
+
+    def _exit(self, name):
+        # _exit method use to stop the time of a phase and to resume the phase of the caller in the same thread.
+        now = perf_counter()
+        stack, depths = self._thread_state()
+        phase, started = stack.pop()
+        with self._lock:
+            self.phases[phase]["time_s"] += now - started
+        if stack:
+            stack[-1] = (stack[-1][0], now)
+        depths[name] -= 1
+
+    def _measured(self, function, name, phase, count):
+        # _measured method use to build the measured version of a function.
+        # Params:
+            # function  -> the original function
+            # name      -> a string value with the name of the records
+            # phase     -> a string value with the phase of the function
+            # count     -> a function that returns the counters of a call from the arguments and the result, or None
+        # Returns:
+            # function -> the measured function
+        @wraps(function)
+        def measured(*args, **kwargs):
+            self._enter(name, phase)
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                self._exit(name)
+            if count is not None:
+                counted = count(args, result)
+                with self._lock:
+                    for counter, value in counted.items():
+                        self.counters[counter] += value
+            return result
+        return measured
+
+    def enable(self):
+        # enable method use to replace the functions of the engine with the measured ones.
+        # Params:
+            # -
+        # Returns:
+            # Profiler -> the profiler
+        # Description:
+            # A RuntimeError is raised if another profiler is enabled. Changing the arithmetic backend while the
+            # profiler is enabled replaces the measured inversion.
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError("Another profiler is already enabled")
+        _ACTIVE = self
+        targets = [(shamir_secret_sharing, name, name, phase, count) for name, (phase, count) in _MODULE_FUNCTIONS.items()]
+        for owner, methods in _METHODS.items():
+            targets.extend((owner, name, owner.__name__ + "." + name, phase, count) for name, (phase, count) in methods.items())
+        for owner, attribute, name, phase, count in targets:
+            original = getattr(owner, attribute)
+            self._originals.append((owner, attribute, original))
+            setattr(owner, attribute, self._measured(original, name, phase, count))
+        self._enabled_at = perf_counter()
+        return self
+
+    def disable(self):
+        # disable method use to put back the original functions of the engine.
+        global _ACTIVE
+        if _ACTIVE is not self:
+            return
+        while self._originals:
+            owner, attribute, original = self._originals.pop()
+            setattr(owner, attribute, original)
+        self._elapsed += perf_counter() - self._enabled_at
+        self._enabled_at = None
+        _ACTIVE = None
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def as_dict(self):
+        # as_dict method use to export the records.
+        # Params:
+            # -
+        # Returns:
+            # dictionary -> the phases, the counters, the recursion depth, the calls of every function and the total
+            #               time the profiler was enabled
+        elapsed = self._elapsed + (perf_counter() - self._enabled_at if self._enabled_at is not None else 0.0)
+        with self._lock:
+            return {
+                "elapsed_s": elapsed,
+                "phases": {phase: dict(record) for phase, record in self.phases.items()},
+                "counters": dict(self.counters),
+                "recursion_depth": dict(self.recursion_depth),
+                "functions": dict(self.functions),
+            }
+
+    def to_json(self, indent=None):
+        # to_json method use to export the records as a JSON string.
+        return json.dumps(self.as_dict(), indent=indent)
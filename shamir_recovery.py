@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# Asynchronous recovery of a Shamir secret from shares that arrive over time.
+# A recovery session accepts the shares of the custodians concurrently, keeps the partial products of the lagrange basis
+# updated with every new share and recovers the secret as soon as k different shares have arrived.
+# The module also includes a local server and client that exchange the shares as JSON lines over TCP, they are meant
+# as a stand-in of the recovery service for testing:
+    # {"x": 1, "y": 1234, "prime": 5678}    -> request of the client with a share
+    # {"status": "accepted", "received": 1, "k": 3, "complete": false}  -> response of the server
+
+# The program requires the next packages:
+    # asyncio   -> used to accept the shares concurrently and to serve them over TCP
+    # json      -> used to encode the requests and responses of the server
+    # shamir    -> shamir algorithm, the batch inversion is used to recover the secret.
+import asyncio
+import json
+from shamir_secret_sharing import Shamir, batch_inverse
+
+# Status of a submitted share.
+ACCEPTED = "accepted"       # The share was added to the session
+DUPLICATE = "duplicate"     # The same share was already received
+COMPLETE = "complete"       # The secret was already recovered, the share is not needed
+
+class RecoverySession:
+    # RecoverySession class used to collect the shares of a secret and recover it once k shares are received.
+    #Variables:
+        # k_parts       -> the minimum number of shares to recover the secret
+        # prime_number  -> the prime number used in the secret sharing operation
+        # shares        -> a dictionary with the value of every received position
+    #Methods:
+        # add_share     -> coroutine that validates and adds a share, the secret is recovered with the k-th share
+        # wait          -> coroutine that waits until the secret is recovered and returns it
+        # done          -> method that indicates if the secret has been recovered
+        # missing       -> method that returns the number of shares still needed
+
+    def __init__(self, k_parts, prime_number=Shamir._PRIME):
+        # RecoverySession constructor method use to initialize the empty session.
+        # Params:
+            # k_parts       -> an integer value with the minimum number of shares to recover the secret
+            # prime_number  -> an integer value with the prime number used in the secret sharing operation
+        # Returns:
+            # -
+        # Description:
+            # For the received positions x_1 ... x_i the session keeps the product of the positions and, for every
+            # position, the product of its differences with the other positions. A new share updates them with i
+            # multiplications, so the lagrange basis in x = 0 are never recalculated from the beginning.
+        if not isinstance(k_parts, int) or k_parts < 1:
+            raise ValueError("The minimum number of shares should be a positive integer")
+        self.k_parts = k_parts
+        self.prime_number = prime_number
+        self.shares = {}
+        self._positions_product = 1     # Product of all the received positions
+        self._denominators = {}         # Product of (x_j - x_m) for the other received positions of every x_j
+        self._lock = asyncio.Lock()
+        self._recovered = asyncio.Event()
+        self._secret = None
+
+    async def add_share(self, x, y, prime_number=None):
+        # add_share method use to validate and add a share to the session.
+        # Params:
+            # x             -> an integer value with the position of the share
+            # y             -> an integer value with the value of the share
+            # prime_number  -> an integer value with the prime number of the share, by default the one of the session
+        # Returns:
+            # string -> ACCEPTED, DUPLICATE or COMPLETE
+        # Description:
+            # A ValueError is raised if the prime number is different, if the share is out of the field or if the
+            # position was already received with a different value.
+        if prime_number is not None and prime_number != self.prime_number:
+            raise ValueError("The share was generated with a different prime number")
+        if not isinstance(x, int) or not isinstance(y, int) or not 0 < x < self.prime_number or not 0 <= y < self.prime_number:
+            raise ValueError("The share is not valid for the prime number")
+        async with self._lock:
+            if x in self.shares:
+                if self.shares[x] != y:
+                    raise ValueError("The position {} was already received with a different value".format(x))
+                return DUPLICATE
+            if self._secret is not None:
+                return COMPLETE
+            p_number = self.prime_number
+            new_denominator = 1
+            for x_m in self.shares:
+                self._denominators[x_m] = self._denominators[x_m] * (x_m - x) % p_number
+                new_denominator = new_denominator * (x - x_m) % p_number
+            self._denominators[x] = new_denominator
+            self._positions_product = self._positions_product * x % p_number
+            self.shares[x] = y
+            if len(self.shares) == self.k_parts:
+                self._secret = self._recover()
+                self._recovered.set()
+            return ACCEPTED
+
+    def _recover(self):
+        # _recover method use to calculate the secret with the partial products of the received shares.
+        # Params:
+            # -
+        # Returns:
+            # integer -> secret
+        # Description:
+            # The lagrange basis of x_j in 0 is the product of -x_m for the other positions over the denominator of x_j,
+            # that is (-1)^(k-1) * (product of the positions) / (x_j * denominator). The k inverses are calculated with
+            # a single inversion.
+        p_number = self.prime_number
+        positions = list(self.shares)
+        inverses = batch_inverse([x_j * self._denominators[x_j] % p_number for x_j in positions], p_number)
+        total = sum(self.shares[x_j] * inverse for x_j, inverse in zip(positions, inverses)) % p_number
+        sign = -1 if (self.k_parts - 1) % 2 else 1
+        return int(sign * self._positions_product * total % p_number)
+
+    async def wait(self):
+        # wait method use to wait until the secret has been recovered.
+        # Params:
+            # -
+        # Returns:
+            # integer -> secret
+        await self._recovered.wait()
+        return self._secret
+
+    def done(self):
+        return self._secret is not None
+
+    def missing(self):
+        return max(self.k_parts - len(self.shares), 0)
+
+class RecoveryServer:
+    # RecoveryServer class used to receive the shares of a recovery session over TCP with JSON lines.
+    #Variables:
+        # session   -> the recovery session that receives the shares
+        # port      -> the port where the server listens once it is started
+    #Methods:
+        # start     -> coroutine that starts listening
+        # close     -> coroutine that stops the server
+
+    def __init__(self, session):
+        # RecoveryServer constructor method use to set the session of the server.
+        # Params:
+            # session   -> a RecoverySession object
+        # Returns:
+            # -
+        self.session = session
+        self.port = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        # start method use to start listening, by default in a free local port.
+        # Params:
+            # host  -> a string value with the address of the server
+            # port  -> an integer value with the port, 0 selects a free port
+        # Returns:
+            # integer -> the port of the server
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def _handle(self, reader, writer):
+        # _handle method use to answer every share request of a connection.
+        # Params:
+            # reader    -> the stream of the requests
+            # writer    -> the stream of the responses
+        # Returns:
+            # -
+        try:
+            async for line in reader:
+                try:
+                    request = json.loads(line)
+                    status = await self.session.add_share(request["x"], request["y"], request.get("prime"))
+                    response = {"status": status}
+                except (ValueError, KeyError, TypeError) as error:
+                    response = {"status": "error", "error": str(error)}
+                response.update(received=len(self.session.shares), k=self.session.k_parts, complete=self.session.done())
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+async def submit_shares(host, port, shares, prime_number):
+    # submit_shares function used by a client to send shares to a recovery server.
+    # Params:
+        # host          -> a string value with the address of the server
+        # port          -> an integer value with the port of the server
+        # shares        -> an iterable with the (x, y) shares
+        # prime_number  -> an integer value with the prime number of the shares
+    # Returns:
+        # list  -> the response of the server for every share
+    reader, writer = await asyncio.open_connection(host, port)
+    responses = []
+    try:
+        for x, y in shares:
+            writer.write(json.dumps({"x": x, "y": y, "prime": prime_number}).encode() + b"\n")
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return responses
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Proactive refresh and resharing of Shamir shares without recovering the secrets.
+# The refresh adds to the shares of every secret the values of a random polynomial with a zero independent term, the
+# secret does not change but the old shares can not be combined with the new ones.
+# The resharing converts k-of-n shares into k'-of-n' shares: every old holder shares its own value with a new random
+# polynomial of k' coefficients (the sub-shares) and every new holder combines the sub-shares it receives with the
+# lagrange basis of the old positions. The new shares are points of the polynomial sum of lambda_j * g_j, whose
+# independent term is the secret, but the secret itself is never calculated.
+# All the operations work on batches of secrets, so a whole store of shares is rotated in one pass.
+
+# The program requires the next packages:
+    # shamir    -> shamir algorithm, the coefficient source, the evaluation of the consecutive positions and the
+    #              reconstruction contexts with the lagrange basis.
+from shamir_secret_sharing import COEFFICIENT_SOURCE, horner_evaluation, consecutive_evaluation, reconstruction_context, field_reducer, Share
+
+def _validate_parts(n_parts, k_parts, p_number):
+    # _validate_parts function used to validate the number of parts of the new shares.
+    # Params:
+        # n_parts   -> an integer value with the number of shares
+        # k_parts   -> an integer value with the minimum shares to recover the secret
+        # p_number  -> an integer value with the prime number of the field
+    # Returns:
+        # -
+    if not isinstance(n_parts, int) or not isinstance(k_parts, int):
+        raise TypeError("The parts that will be devided must be integer numbers")
+    if k_parts > n_parts or k_parts <= 1:
+        raise ArithmeticError("The minimum number to recover must be lower or equal than the nummber of pieces and should be greater than 1")
+    if n_parts >= p_number:
+        raise ValueError("The number of parts should be smaller than the prime number...")
+
+def refresh_many(points_batches, k_parts, p_number):
+    # refresh_many function used to refresh the shares of a batch of secrets.
+    # Params:
+        # points_batches    -> an iterable with the list of (x, y) shares of every secret
+        # k_parts           -> an integer value with the minimum parts to recover every secret
+        # p_number          -> an integer value with the prime number used in the secret sharing operation
+    # Returns:
+        # list  -> the refreshed shares of every secret, with the same positions and in the same order
+    # Description:
+        # The k - 1 random coefficients of the update polynomials of all the secrets are taken from a single read of
+        # the coefficient source. Every share is added the value of the update polynomial in its position.
+    points_batches = [list(points) for points in points_batches]
+    if k_parts <= 1:
+        raise ArithmeticError("The minimum number to recover should be greater than 1")
+    degree = k_parts - 1
+    random_coefficients = COEFFICIENT_SOURCE.coefficients(len(points_batches) * degree, p_number)
+    refreshed = []
+    for position, points in enumerate(points_batches):
+        update = [0] + random_coefficients[position * degree:(position + 1) * degree]
+        refreshed.append([Share(x, (y + horner_evaluation(update, x, p_number)) % p_number) for x, y in points])
+    return refreshed
+
+def refresh(points, k_parts, p_number):
+    # refresh function used to refresh the shares of a single secret (see refresh_many).
+    return refresh_many([points], k_parts, p_number)[0]
+
+def subshares(y_share, new_k, new_n, p_number, coefficients=None):
+    # subshares function used by an old holder to share its value with the new holders.
+    # Params:
+        # y_share       -> an integer value with the value of the old share
+        # new_k         -> an integer value with the minimum parts to recover the secret after the resharing
+        # new_n         -> an integer value with the number of new shares
+        # p_number      -> an integer value with the prime number of the field
+        # coefficients  -> a list with the new_k - 1 random coefficients, by default they are taken from the source
+    # Returns:
+        # list  -> the sub-share of every new position from 1 to new_n
+    if coefficients is None:
+        coefficients = COEFFICIENT_SOURCE.coefficients(new_k - 1, p_number)
+    return list(consecutive_evaluation([y_share] + coefficients, new_n, p_number))
+
+def combine_subshares(x_shares, subshare_rows, p_number):
+    # combine_subshares function used to calculate the new shares from the sub-shares of the old holders.
+    # Params:
+        # x_shares      -> a list with the positions of the old holders
+        # subshare_rows -> a list with the sub-shares of every old holder, in the same order as the positions
+        # p_number      -> an integer value with the prime number of the field
+    # Returns:
+        # list  -> the new shares with the positions from 1 to the number of sub-shares
+    # Description:
+        # The lagrange basis of the old positions are taken from the cached reconstruction contexts, so all the secrets
+        # that were reshared from the same positions calculate them once.
+    context = reconstruction_context(tuple(x_shares), p_number)
+    reduce = field_reducer(p_number)
+    totals = [0] * len(subshare_rows[0])
+    for weight, row in zip(context.weights, subshare_rows):
+        for position, value in enumerate(row):
+            totals[position] += weight * value
+    return [Share(x, int(reduce(total))) for x, total in enumerate(totals, 1)]
+
+def reshare_many(points_batches, new_k, new_n, p_number):
+    # reshare_many function used to convert the shares of a batch of secrets to a new threshold and number of shares.
+    # Params:
+        # points_batches    -> an iterable with at least k old (x, y) shares of every secret
+        # new_k             -> an integer value with the minimum parts to recover every secret after the resharing
+        # new_n             -> an integer value with the number of new shares of every secret
+        # p_number          -> an integer value with the prime number used in the secret sharing operation
+    # Returns:
+        # list  -> the new_n new shares of every secret, in the same order as the batches
+    # Description:
+        # The random coefficients of the sub-shares of all the holders and secrets are taken from a single read of the
+        # coefficient source. The old shares are combined in the order of their positions.
+    _validate_parts(new_n, new_k, p_number)
+    points_batches = [sorted(points) for points in points_batches]
+    degree = new_k - 1
+    random_coefficients = COEFFICIENT_SOURCE.coefficients(sum(len(points) for points in points_batches) * degree, p_number)
+    offset = 0
+    reshared = []
+    for points in points_batches:
+        rows = []
+        for _, y in points:
+            rows.append(subshares(y, new_k, new_n, p_number, random_coefficients[offset:offset + degree]))
+            offset += degree
+        reshared.append(combine_subshares([x for x, _ in points], rows, p_number))
+    return reshared
+
+def reshare(points, new_k, new_n, p_number):
+    # reshare function used to convert the shares of a single secret (see reshare_many).
+    return reshare_many([points], new_k, new_n, p_number)[0]
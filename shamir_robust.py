@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# Error-correcting recovery of a Shamir secret with the Gao decoder for Reed-Solomon codes.
+# The n shares of a secret are the evaluations of a polynomial of degree k - 1, that is a Reed-Solomon codeword, so
+# from m >= k shares the polynomial can be recovered even if up to (m - k) / 2 of them are corrupted, without trying
+# every subset of k shares. The decoder interpolates all the shares, runs a partial extended Euclidean algorithm with
+# the vanishing polynomial of the positions and divides by the error locator.
+# The polynomials are lists of coefficients modulo the prime number, starting with the independent term.
+
+# The program requires the next packages:
+    # shamir    -> shamir algorithm, the batch inversion, the Horner evaluation and the arithmetic backend.
+import shamir_secret_sharing
+from shamir_secret_sharing import batch_inverse, horner_evaluation
+
+def _trim(polynomial):
+    # _trim function used to remove the zero coefficients of the highest degrees.
+    while polynomial and polynomial[-1] == 0:
+        polynomial.pop()
+    return polynomial
+
+def _degree(polynomial):
+    # _degree function used to get the degree of a trimmed polynomial, -1 for the zero polynomial.
+    return len(polynomial) - 1
+
+def _subtract(a, b, p_number):
+    # _subtract function used to calculate a - b.
+    result = list(a) + [0] * (len(b) - len(a))
+    for power, coeff in enumerate(b):
+        result[power] = (result[power] - coeff) % p_number
+    return _trim(result)
+
+def _multiply(a, b, p_number):
+    # _multiply function used to calculate a * b.
+    if not a or not b:
+        return []
+    result = [0] * (len(a) + len(b) - 1)
+    for i, coeff_a in enumerate(a):
+        for j, coeff_b in enumerate(b):
+            result[i + j] += coeff_a * coeff_b
+    return _trim([coeff % p_number for coeff in result])
+
+def _divmod(a, b, p_number):
+    # _divmod function used to calculate the quotient and the remainder of a / b.
+    # Params:
+        # a         -> a list with the coefficients of the dividend
+        # b         -> a list with the coefficients of the divisor, it can not be the zero polynomial
+        # p_number  -> an integer value with the prime number of the field
+    # Returns:
+        # tuple -> the quotient and the remainder
+    remainder = list(a)
+    if len(remainder) < len(b):
+        return [], _trim(remainder)
+    leading_inverse = shamir_secret_sharing.invert(b[-1], p_number)
+    quotient = [0] * (len(remainder) - len(b) + 1)
+    for shift in range(len(quotient) - 1, -1, -1):
+        coeff = remainder[shift + len(b) - 1] * leading_inverse % p_number
+        quotient[shift] = coeff
+        if coeff:
+            for power, coeff_b in enumerate(b):
+                remainder[shift + power] = (remainder[shift + power] - coeff * coeff_b) % p_number
+    return _trim(quotient), _trim(remainder[:len(b) - 1])
+
+def _vanishing_polynomial(x_shares, p_number):
+    # _vanishing_polynomial function used to calculate the product of (X - x_i) for all the positions.
+    polynomial = [1]
+    for x in x_shares:
+        # Multiplication by (X - x): every coefficient is shifted one degree and the previous one times -x is added
+        polynomial = [(low - x * high) % p_number for low, high in zip([0] + polynomial, polynomial + [0])]
+    return polynomial
+
+def interpolate(x_shares, y_shares, p_number):
+    # interpolate function used to calculate the polynomial of degree m - 1 that passes through m points.
+    # Params:
+        # x_shares  -> a list with the different positions
+        # y_shares  -> a list with the values in the same order
+        # p_number  -> an integer value with the prime number of the field
+    # Returns:
+        # list  -> the coefficients of the polynomial
+    # Description:
+        # Lagrange interpolation: the basis of x_j is V(X) / (X - x_j) divided by the product of (x_j - x_m), where V is
+        # the vanishing polynomial of the positions. The quotients are calculated with a synthetic division and the
+        # denominators with a single batch inversion.
+    vanishing = _vanishing_polynomial(x_shares, p_number)
+    denominators = []
+    for x_j in x_shares:
+        denominator = 1
+        for x_m in x_shares:
+            if x_m != x_j:
+                denominator = denominator * (x_j - x_m) % p_number
+        denominators.append(denominator)
+    result = [0] * len(x_shares)
+    for x_j, y_j, inverse in zip(x_shares, y_shares, batch_inverse(denominators, p_number)):
+        factor = y_j * inverse % p_number
+        quotient_coeff = 0
+        # Synthetic division of the vanishing polynomial by (X - x_j), from the highest degree
+        for power in range(len(vanishing) - 1, 0, -1):
+            quotient_coeff = (vanishing[power] + quotient_coeff * x_j) % p_number
+            result[power - 1] += factor * quotient_coeff
+    return _trim([coeff % p_number for coeff in result])
+
+def gao_decode(points, k_parts, p_number):
+    # gao_decode function used to recover the polynomial of degree k - 1 from shares with errors.
+    # Params:
+        # points    -> a list with the (x, y) shares, at least k with different positions
+        # k_parts   -> an integer value with the number of coefficients of the polynomial
+        # p_number  -> an integer value with the prime number of the field
+    # Returns:
+        # list  -> the coefficients of the polynomial, padded with zeros up to k coefficients
+    # Description:
+        # Gao algorithm: g0 is the vanishing polynomial of the positions and g1 interpolates all the shares. The extended
+        # Euclidean algorithm of g0 and g1 is stopped when the remainder g has a degree lower than (m + k) / 2, then the
+        # polynomial is g / v, where v is the coefficient of g1 (the error locator). A ValueError is raised if the
+        # division is not exact, which means that there are more than (m - k) / 2 errors.
+    x_shares = [x for x, _ in points]
+    if len(set(x % p_number for x in x_shares)) != len(x_shares) or any(x % p_number == 0 for x in x_shares):
+        raise ValueError("The point positions should be different and not zero to recover the secret")
+    if len(points) < k_parts:
+        raise ValueError("At least {} shares are needed to recover the secret".format(k_parts))
+    p_number = shamir_secret_sharing.field_int(p_number)
+    m_shares = len(points)
+    remainder_previous = _vanishing_polynomial(x_shares, p_number)
+    remainder = interpolate(x_shares, [y % p_number for _, y in points], p_number)
+    locator_previous, locator = [], [1]
+    while 2 * _degree(remainder) >= m_shares + k_parts:
+        quotient, next_remainder = _divmod(remainder_previous, remainder, p_number)
+        remainder_previous, remainder = remainder, next_remainder
+        locator_previous, locator = locator, _subtract(locator_previous, _multiply(quotient, locator, p_number), p_number)
+    polynomial, rest = _divmod(remainder, locator, p_number)
+    if rest or len(polynomial) > k_parts:
+        raise ValueError("There are too many corrupted shares to recover the secret")
+    return [int(coeff) for coeff in polynomial] + [0] * (k_parts - len(polynomial))
+
+def robust_reconstruct(points, k_parts, p_number):
+    # robust_reconstruct function used to recover a secret and find the corrupted shares.
+    # Params:
+        # points    -> a list with the (x, y) shares, at least k with different positions
+        # k_parts   -> an integer value with the minimum parts to recover the secret
+        # p_number  -> an integer value with the prime number used in the secret sharing operation
+    # Returns:
+        # tuple -> the secret and a list with the indexes of the corrupted shares in the points list
+    # Description:
+        # Up to (m - k) / 2 corrupted shares are corrected for m shares, a ValueError is raised if there are more.
+    polynomial = gao_decode(points, k_parts, p_number)
+    faulty = [index for index, (x, y) in enumerate(points) if horner_evaluation(polynomial, x, p_number) != y % p_number]
+    if 2 * len(faulty) > len(points) - k_parts:
+        raise ValueError("There are too many corrupted shares to recover the secret")
+    return polynomial[0], faulty
@@ -8,26 +8,878 @@
 #The program requires the next packages:
     # os
     # math
+    # functools
+    # bisect
+    # collections
+    # threading
+    # time
+    # numpy (optional) -> used to evaluate batches of polynomials over small prime fields, it is imported the first time
+    #                     it is needed (see numpy_module)
+    # gmpy2 (optional) -> GMP integers used for the modular arithmetic, the SHAMIR_BACKEND environment variable can be
+    #                     set to "python-int" to use the builtin integers even if it is installed
 # The program uses the urandom package to generate random numbers directly from the OS.
-# The sqrt function is used during the prime number verification.
-from os import urandom
-from math import sqrt
+# The gcd and isqrt functions are used during the prime number verification.
+from os import urandom, environ, getpid
+from math import gcd, isqrt
+# The lru_cache decorator keeps the most recent reconstruction contexts.
+from functools import lru_cache
+# The bisect_right function looks up the registered primes by size.
+from bisect import bisect_right
+# The namedtuple factory creates the share objects without a dictionary per instance.
+from collections import namedtuple
+# The lock avoids searching the same field prime from several threads at the same time.
+from threading import Lock
+# The perf_counter function measures the time of the prime searches.
+from time import perf_counter
+
+_NUMPY = False   # The numpy module once it has been imported, None if it is not installed
+_GMPY2 = False   # The gmpy2 module once it has been imported, None if it is not installed
+
+def numpy_module():
+    # numpy_module function used to import numpy the first time it is needed.
+    # Params:
+        # -
+    # Returns:
+        # module -> the numpy module, None if it is not installed
+    # Description:
+        # Importing numpy takes longer than importing the rest of the program, so the command line tools that never use
+        # the word sized fields do not pay for it. The module is also available as shamir_secret_sharing.np.
+    global _NUMPY
+    if _NUMPY is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY = numpy
+    return _NUMPY
+
+def gmpy2_module():
+    # gmpy2_module function used to import gmpy2 the first time the gmpy2 backend is selected.
+    # Params:
+        # -
+    # Returns:
+        # module -> the gmpy2 module, None if it is not installed
+    global _GMPY2
+    if _GMPY2 is False:
+        try:
+            import gmpy2
+        except ImportError:
+            gmpy2 = None
+        _GMPY2 = gmpy2
+    return _GMPY2
+
+def __getattr__(name):
+    if name == "np":
+        return numpy_module()
+    if name == "gmpy2":
+        return gmpy2_module()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+# Names of the arithmetic backends, gmpy2 is preferred when it is installed.
+BACKEND_GMPY2 = "gmpy2"
+BACKEND_PYTHON = "python-int"
+
+def _int_invert(value, prime_number):
+    return pow(value, -1, prime_number)
+
+def _gmpy2_invert(value, prime_number):
+    # The same exception as pow(value, -1, prime_number) is raised when there is no inverse.
+    try:
+        return _GMPY2.invert(value, prime_number)
+    except ZeroDivisionError:
+        raise ValueError("base is not invertible for the given modulus")
+
+def _backend_functions(name=None):
+    # _backend_functions function used to get the arithmetic functions of a backend.
+    # Params:
+        # name  -> a string value with the backend name, by default gmpy2 if it is installed
+    # Returns:
+        # tuple -> the name, the integer type, the modular exponentiation and the modular inversion of the backend
+    # Description:
+        # gmpy2 is only imported when its backend is selected, so the builtin integers backend does not import it.
+    gmpy2 = gmpy2_module() if name in (None, BACKEND_GMPY2) else None
+    if name is None:
+        name = BACKEND_GMPY2 if gmpy2 is not None else BACKEND_PYTHON
+    if name == BACKEND_GMPY2:
+        if gmpy2 is None:
+            raise ImportError("The gmpy2 backend requires the gmpy2 package")
+        return name, gmpy2.mpz, gmpy2.powmod, _gmpy2_invert
+    if name == BACKEND_PYTHON:
+        return name, int, pow, _int_invert
+    raise ValueError("Unknown arithmetic backend {}".format(name))
+
+# Active arithmetic backend, selected at import time (see use_backend to change it):
+    # BACKEND   -> the name of the backend
+    # field_int -> converts an integer to the integer type of the backend (mpz or int)
+    # powmod    -> modular exponentiation
+    # invert    -> modular inversion, a ValueError is raised if the value is not invertible
+BACKEND, field_int, powmod, invert = _backend_functions(environ.get("SHAMIR_BACKEND") or None)
+
+def _small_primes_sieve(limit):
+    # _small_primes_sieve function used to list the prime numbers below a limit with the sieve of Eratosthenes.
+    # Params:
+        # limit -> an integer value with the largest number that will be sieved
+    # Returns:
+        # list  -> the prime numbers smaller or equal than the limit
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0] = sieve[1] = 0
+    for i in range(2, isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit + 1, i)))
+    return [i for i, is_prime in enumerate(sieve) if is_prime]
+
+# Small primes used as a pre-filter before the probabilistic tests and to sieve the candidates of the prime generator.
+_SMALL_PRIMES = _small_primes_sieve(8192)
+_SMALL_PRIMES_PRODUCT = 1
+for _small_prime in _SMALL_PRIMES:
+    _SMALL_PRIMES_PRODUCT *= _small_prime
+del _small_prime
+_DEEP_SIEVE_LIMIT = 1 << 18   # Largest prime used to sieve the windows of the largest prime searches
+
+@lru_cache(maxsize=8)
+def _sieve_primes(bits):
+    # _sieve_primes function used to get the odd primes that sieve the window of a prime search.
+    # Params:
+        # bits  -> an integer value with the bit length of the searched prime
+    # Returns:
+        # list  -> the odd primes up to bits^2 / 64, between 8192 and _DEEP_SIEVE_LIMIT
+    # Description:
+        # The candidates that survive the sieve are proportional to 1 / ln(limit) and every Baillie-PSW test costs
+        # O(bits^3), so the largest searches use a deeper sieve: for 4096 bits the primes up to 2^18 leave 9.1% of
+        # the window instead of 12.4% with the primes up to 8192 (a quarter less tests) and the sieve costs milliseconds.
+    limit = min(_DEEP_SIEVE_LIMIT, max(_SMALL_PRIMES[-1], bits * bits // 64))
+    if limit <= _SMALL_PRIMES[-1]:
+        return _SMALL_PRIMES[1:]
+    return _small_primes_sieve(limit)[1:]
+
+# Cache with the vetted field primes generated per bit size, the primes are public values so they can be reused.
+_FIELD_PRIME_CACHE = {}
+_FIELD_PRIME_LOCK = Lock()
+
+# Maximum number of (positions, prime) reconstruction contexts kept in the cache.
+_RECONSTRUCTION_CACHE_SIZE = 128
+# Maximum number of reduction functions kept in the cache, one for every prime number in use.
+_REDUCER_CACHE_SIZE = 64
+
+def _miller_rabin(p, base):
+    # _miller_rabin function used to perform a strong probable prime test of p to the given base.
+    # Params:
+        # p     -> an odd integer greater than 3 that will be tested
+        # base  -> an integer value used as the witness of the test
+    # Returns:
+        # boolean -> False if p is composite, True if p is a strong probable prime
+    d = p - 1
+    s = (d & -d).bit_length() - 1   # Number of times two divides p - 1
+    d >>= s
+    x = powmod(base, d, p)
+    if x == 1 or x == p - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % p
+        if x == p - 1:
+            return True
+    return False
+
+def _jacobi(a, n):
+    # _jacobi function used to calculate the Jacobi symbol (a/n) for an odd positive n.
+    # Params:
+        # a -> an integer value
+        # n -> an odd positive integer value
+    # Returns:
+        # integer -> 1, -1 or 0
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+def _strong_lucas(p):
+    # _strong_lucas function used to perform a strong Lucas probable prime test with the Selfridge parameters.
+    # Params:
+        # p -> an odd integer that is not a perfect square and without small factors
+    # Returns:
+        # boolean -> False if p is composite, True if p is a strong Lucas probable prime
+    # Description:
+        # D is the first value of 5, -7, 9, -11, ... with Jacobi symbol (D/p) = -1, then P = 1 and Q = (1 - D) / 4.
+        # The sequences U and V are calculated for the odd part of p + 1 with a binary ladder.
+    D = 5
+    while True:
+        jacobi = _jacobi(D, p)
+        if jacobi == -1:
+            break
+        if jacobi == 0 and abs(D) != p:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    Q = (1 - D) // 4
+    d = p + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    U, V, Q_k = 1, 1, Q % p   # Values of U_1, V_1 and Q^1 with P = 1
+    for bit in bin(d)[3:]:
+        # Doubling step: k -> 2k
+        U = U * V % p
+        V = (V * V - 2 * Q_k) % p
+        Q_k = Q_k * Q_k % p
+        if bit == '1':
+            # Increment step: k -> k + 1, the divisions by two are done adding p when the value is odd.
+            U, V = U + V, D * U + V
+            if U % 2:
+                U += p
+            if V % 2:
+                V += p
+            U, V = (U // 2) % p, (V // 2) % p
+            Q_k = Q_k * Q % p
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Q_k) % p
+        if V == 0:
+            return True
+        Q_k = Q_k * Q_k % p
+    return False
+
+def is_probable_prime(p):
+    # is_probable_prime function used to verify if the p parameter is a prime number with the Baillie-PSW test.
+    # Params:
+        # p -> an integer value that will be verified
+    # Returns:
+        # boolean -> True if p is prime (no Baillie-PSW pseudoprime is known), False if it is composite
+    # Description:
+        # The small factors are discarded with a single gcd against the product of the small primes, then a strong
+        # Miller-Rabin test to base 2 and a strong Lucas test are applied.
+    if p < 2:
+        return False
+    if gcd(p, _SMALL_PRIMES_PRODUCT) != 1:
+        return p <= _SMALL_PRIMES[-1] and p in _SMALL_PRIMES
+    if p < _SMALL_PRIMES[-1] ** 2:
+        return True
+    return _baillie_psw(p)
+
+def _baillie_psw(p):
+    # _baillie_psw function used to apply the Baillie-PSW test to an odd number without small factors.
+    # Params:
+        # p -> an odd integer greater than 3 that will be tested
+    # Returns:
+        # boolean -> False if p is composite, True if p is a probable prime
+    # Description:
+        # With the gmpy2 backend the test is done by GMP, otherwise a strong Miller-Rabin test to base 2, the perfect
+        # square check and a strong Lucas test are applied.
+    if BACKEND == BACKEND_GMPY2:
+        return _GMPY2.is_strong_bpsw_prp(p)
+    return _miller_rabin(p, 2) and isqrt(p) ** 2 != p and _strong_lucas(p)
+
+# Result of a prime search with the prime, its bit size, where it was taken from ("registry", "search", "cache",
+# "large_prime" or "group"), the number of candidates tested with the Baillie-PSW test and the elapsed time in seconds.
+PrimeSearch = namedtuple("PrimeSearch", ["prime", "bits", "source", "candidates", "elapsed"])
+
+# Minimum bit size of the generated field primes and default time budget in seconds of a prime search.
+_MIN_FIELD_BITS = 40
+_PRIME_SEARCH_BUDGET = 2.0
+
+def search_prime(bits, time_budget=None):
+    # search_prime function used to search a random prime number with an exact bit length.
+    # Params:
+        # bits          -> an integer value with the bit length of the prime, it should be at least 2
+        # time_budget   -> a number with the maximum seconds of the search, by default there is no limit
+    # Returns:
+        # PrimeSearch -> the prime number with the candidates tested and the elapsed time of the search
+    # Description:
+        # The search is iterative: a random odd starting point is selected and a window of the following odd numbers
+        # is sieved with the small primes (a wheel that discards the multiples of every small prime), only the candidates
+        # that survive the sieve are tested with the Baillie-PSW test. When the window has no prime a new starting point
+        # is selected. A TimeoutError is raised if the time budget is exceeded.
+        # The cost grows quickly with the size, every test is O(bits^3) and about bits / 32 candidates are tested: a
+        # search of 2048 bits takes about a second and one of 4096 bits took 60 to 88 seconds with the builtin integers
+        # (1 to 5 seconds with gmpy2). The large fields should use a prime of PRIME_REGISTRY or the gmpy2 backend
+        # instead of a new search.
+    if bits < 2:
+        raise ValueError("The prime number should have at least 2 bits")
+    start_time = perf_counter()
+    deadline = None if time_budget is None else start_time + time_budget
+    candidates = 0
+    if bits <= 16:
+        # Small fields are searched directly, the sieve would discard the primes themselves.
+        while True:
+            candidate = int.from_bytes(urandom(2)) % (1 << (bits - 1)) + (1 << (bits - 1))
+            candidates += 1
+            if is_probable_prime(candidate):
+                return PrimeSearch(candidate, bits, "search", candidates, perf_counter() - start_time)
+    width = max(64, 2 * bits)   # Number of odd candidates sieved after every starting point
+    sieve_primes = _sieve_primes(bits)
+    while True:
+        start = int.from_bytes(urandom((bits + 7) // 8)) % (1 << bits) | (1 << (bits - 1)) | 1
+        window = bytearray([1]) * width   # The position i represents the candidate start + 2 * i
+        for small_prime in sieve_primes:
+            # start + 2 * i is divisible when i = -start / 2 (mod small_prime)
+            first = (-start * ((small_prime + 1) // 2)) % small_prime
+            window[first::small_prime] = bytes(len(range(first, width, small_prime)))
+        position = window.find(1)
+        while position != -1:
+            candidate = start + 2 * position
+            if candidate.bit_length() != bits:
+                break
+            candidates += 1
+            if _baillie_psw(candidate):
+                return PrimeSearch(candidate, bits, "search", candidates, perf_counter() - start_time)
+            if deadline is not None and perf_counter() > deadline:
+                raise TimeoutError("The prime search of {} bits exceeded the time budget".format(bits))
+            position = window.find(1, position + 1)
+
+def random_prime(bits, time_budget=None):
+    # random_prime function used to generate a random prime number with an exact bit length.
+    # Params:
+        # bits          -> an integer value with the bit length of the prime, it should be at least 2
+        # time_budget   -> a number with the maximum seconds of the search, by default there is no limit
+    # Returns:
+        # integer -> prime number with the given bit length
+    return search_prime(bits, time_budget).prime
+
+def field_prime_search(bits, time_budget=None):
+    # field_prime_search function used to get a vetted prime number of the given bit size from the cache.
+    # Params:
+        # bits          -> an integer value with the bit length of the prime
+        # time_budget   -> a number with the maximum seconds of the search, by default there is no limit
+    # Returns:
+        # PrimeSearch -> the prime number, the source is "cache" if no search was needed
+    # Description:
+        # The first request of every bit size generates a new prime, the next requests reuse the cached value.
+        # The search is done holding a lock, so concurrent threads wait for the same prime instead of searching again.
+    start_time = perf_counter()
+    prime_number = _FIELD_PRIME_CACHE.get(bits)
+    if prime_number is None:
+        with _FIELD_PRIME_LOCK:
+            prime_number = _FIELD_PRIME_CACHE.get(bits)
+            if prime_number is None:
+                search = search_prime(bits, time_budget)
+                _FIELD_PRIME_CACHE[bits] = search.prime
+                return search
+    return PrimeSearch(prime_number, bits, "cache", 0, perf_counter() - start_time)
+
+def field_prime(bits, time_budget=None):
+    # field_prime function used to get a vetted prime number of the given bit size from the cache.
+    # Params:
+        # bits          -> an integer value with the bit length of the prime
+        # time_budget   -> a number with the maximum seconds of the search, by default there is no limit
+    # Returns:
+        # integer -> prime number with the given bit length
+    return field_prime_search(bits, time_budget).prime
+
+def field_bits(secret, min_bits=_MIN_FIELD_BITS):
+    # field_bits function used to calculate the smallest field size for a secret.
+    # Params:
+        # secret    -> an integer value with the secret
+        # min_bits  -> an integer value with the minimum bit size of the field
+    # Returns:
+        # integer -> a multiple of 8 bits greater than the bit length of the secret, every prime of that size is larger
+        # than the secret because the generated primes have the highest bit set
+    bits = max(min_bits, secret.bit_length() + 1)
+    return bits + (-bits % 8)
+
+# Registry of vetted primes of the form 2**bits - offset keyed by their bit size: the Mersenne primes (offset 1), the
+# Curve25519 prime 2**255 - 19 and the largest prime below every standard size from 64 to 4096 bits. All of them pass
+# the Baillie-PSW test and their small offset allows the reduction without a division (see field_reducer).
+PRIME_REGISTRY = {
+    61: 2**61 - 1,
+    64: 2**64 - 59,
+    89: 2**89 - 1,
+    107: 2**107 - 1,
+    127: 2**127 - 1,
+    128: 2**128 - 159,
+    192: 2**192 - 237,
+    255: 2**255 - 19,
+    256: 2**256 - 189,
+    384: 2**384 - 317,
+    512: 2**512 - 569,
+    521: 2**521 - 1,
+    607: 2**607 - 1,
+    768: 2**768 - 825,
+    1024: 2**1024 - 105,
+    1279: 2**1279 - 1,
+    1536: 2**1536 - 3453,
+    2048: 2**2048 - 1557,
+    3072: 2**3072 - 47,
+    4096: 2**4096 - 2549,
+}
+_REGISTRY_PRIMES = sorted(PRIME_REGISTRY.values())
+
+# Minimum bit size of the primes reduced with shifts and additions, below it the % operator is faster (measured with
+# the builtin integers on products of two field values: % is faster at 256 bits and similar at 384 bits, the folding is
+# 2x faster at 512 bits and 18x at 4096 bits).
+_FAST_REDUCTION_BITS = 512
+
+def registered_prime(secret, min_bits=0):
+    # registered_prime function used to look up the smallest registered prime that fits a secret.
+    # Params:
+        # secret    -> an integer value with the secret
+        # min_bits  -> an integer value with the minimum bit size of the prime
+    # Returns:
+        # integer -> the smallest registered prime greater than the secret, None if the secret is too large
+    for prime_number in _REGISTRY_PRIMES[bisect_right(_REGISTRY_PRIMES, secret):]:
+        if prime_number.bit_length() >= min_bits:
+            return prime_number
+    return None
+
+@lru_cache(maxsize=_REDUCER_CACHE_SIZE)
+def field_reducer(prime_number):
+    # field_reducer function used to get the fastest reduction function for a prime number.
+    # Params:
+        # prime_number  -> an integer value with the prime number of the field
+    # Returns:
+        # function -> a function that returns its integer argument modulo the prime number
+    # Description:
+        # For a registered prime p = 2**bits - offset the high part of a value is worth offset times its low part
+        # (2**bits = offset mod p), so the value is folded with a shift, a mask and a small multiplication until it fits in
+        # bits and a final subtraction, which is linear in the size of the value instead of a long division. The other
+        # primes, the registered primes smaller than _FAST_REDUCTION_BITS and the gmpy2 backend use the % operator.
+    bits = prime_number.bit_length()
+    if BACKEND == BACKEND_GMPY2 or PRIME_REGISTRY.get(bits) != prime_number or bits < _FAST_REDUCTION_BITS:
+        return field_int(prime_number).__rmod__
+    offset, mask = (1 << bits) - prime_number, (1 << bits) - 1
+    def reduce(value):
+        if value < 0:
+            return value % prime_number
+        while value >> bits:
+            value = (value >> bits) * offset + (value & mask)
+        return value - prime_number if value >= prime_number else value
+    return reduce
+
+def select_field_prime(secret, large_prime, min_bits=_MIN_FIELD_BITS, time_budget=_PRIME_SEARCH_BUDGET, registry=True):
+    # select_field_prime function used to select the smallest field prime for a secret.
+    # Params:
+        # secret        -> an integer value with the secret
+        # large_prime   -> an integer value with the prime used when the field would be as large as it
+        # min_bits      -> an integer value with the minimum bit size of the field
+        # time_budget   -> a number with the maximum seconds of the prime search, None for no limit
+        # registry      -> a boolean value, if it is True the registered primes are preferred to the searched ones
+    # Returns:
+        # PrimeSearch -> the selected prime number with the source and the elapsed time of the selection
+    # Description:
+        # The smallest registered prime that fits the secret is used if it is smaller than the large prime. Otherwise the
+        # field size is the smallest multiple of 8 bits that fits the secret. When that size is not smaller than the
+        # large prime, or the search exceeds the time budget, the large prime is used. A ValueError is raised if the
+        # secret is not smaller than the large prime.
+    start_time = perf_counter()
+    if secret >= large_prime:
+        raise ValueError("The secret number is too large for the given prime number...")
+    prime_number = registered_prime(secret, min_bits) if registry else None
+    if prime_number is not None and prime_number < large_prime:
+        return PrimeSearch(prime_number, prime_number.bit_length(), "registry", 0, perf_counter() - start_time)
+    bits = field_bits(secret, min_bits)
+    if bits < large_prime.bit_length():
+        try:
+            search = field_prime_search(bits, time_budget)
+            return search._replace(elapsed=perf_counter() - start_time)
+        except TimeoutError:
+            pass
+    return PrimeSearch(large_prime, large_prime.bit_length(), "large_prime", 0, perf_counter() - start_time)
+
+# Share object with the position (x) and the value (y) of a point, it behaves as a (x, y) tuple and has empty __slots__.
+Share = namedtuple("Share", ["x", "y"])
+
+class CoefficientSource:
+    # CoefficientSource class used to generate the random coefficients of the polynomials from buffered OS randomness.
+    #Variables:
+        # block_size    -> minimum number of bytes requested to the OS every time the buffer is refilled
+        # bytes_drawn   -> number of random bytes requested to the OS
+        # reads         -> number of times the OS was called
+        # values        -> number of coefficients returned
+        # rejections    -> number of random values rejected to keep the coefficients uniformly distributed
+    #Methods:
+        # coefficients      -> method that returns a list of random coefficients for a prime field
+        # coefficient_array -> method that returns a numpy array of random coefficients for a word sized prime field
+        # stats             -> method that returns the counters as a dictionary
+        # reset_stats       -> method that sets the counters to zero
+
+    def __init__(self, block_size=1 << 16):
+        # CoefficientSource constructor method use to initialize the empty buffer and the counters.
+        # Params:
+            # block_size    -> an integer value with the minimum size of every read from the OS
+        # Returns:
+            # -
+        self.block_size = block_size
+        self._drop_buffer()
+        self.reset_stats()
+
+    def _drop_buffer(self):
+        # _drop_buffer method use to empty the buffer and to take it for the current process.
+        # Description:
+            # A forked worker process inherits a copy of the unread bytes, so the buffer is dropped the first time the
+            # worker uses it, otherwise the parent and every worker would generate the same coefficients. The lock is
+            # replaced too, it may have been copied while another thread of the parent was holding it.
+        self._buffer = b""
+        self._position = 0
+        self._lock = Lock()
+        self._pid = getpid()
+
+    def _acquire(self, count):
+        # _acquire method use to validate the number of coefficients and to get the lock of the buffer of the process.
+        # Params:
+            # count -> an integer value with the number of coefficients
+        # Returns:
+            # Lock  -> the lock of the buffer
+        if count < 0:
+            raise ValueError("The number of coefficients can not be negative")
+        if self._pid != getpid():
+            self._drop_buffer()
+        return self._lock
+
+    def reset_stats(self):
+        # reset_stats method use to set the counters to zero.
+        self.bytes_drawn = self.reads = self.values = self.rejections = 0
+
+    def stats(self):
+        # stats method use to get the counters of the source.
+        # Returns:
+            # dictionary -> the bytes drawn, the reads, the values returned and the rejections
+        return {"bytes_drawn": self.bytes_drawn, "reads": self.reads, "values": self.values, "rejections": self.rejections}
+
+    def _take(self, size):
+        # _take method use to get random bytes from the buffer, it should be called holding the lock.
+        # Params:
+            # size  -> an integer value with the number of bytes
+        # Returns:
+            # bytes -> the random bytes
+        # Description:
+            # When the buffer does not have enough bytes a single read of at least block_size bytes is done.
+        if self._position + size > len(self._buffer):
+            remaining = self._buffer[self._position:]
+            new_bytes = urandom(max(self.block_size, size - len(remaining)))
+            self.bytes_drawn += len(new_bytes)
+            self.reads += 1
+            self._buffer, self._position = remaining + new_bytes, 0
+        data = self._buffer[self._position:self._position + size]
+        self._position += size
+        return data
+
+    def coefficients(self, count, prime_number):
+        # coefficients method use to generate uniformly distributed random coefficients between 1 and prime_number - 1.
+        # Params:
+            # count         -> an integer value with the number of coefficients, all the polynomials of a batch can be filled
+            # prime_number  -> an integer value with the prime number of the field
+        # Returns:
+            # list -> the random coefficients
+        # Description:
+            # Every value uses 64 more bits than the prime number, the values greater or equal than the largest multiple
+            # of prime_number - 1 are rejected and the rest are reduced, so the coefficients are uniform and almost no
+            # value is rejected. The bytes of all the coefficients are taken from the buffer at the same time.
+        field_size = prime_number - 1
+        size = (field_size.bit_length() + 64 + 7) // 8
+        limit = (1 << (8 * size)) // field_size * field_size
+        result = []
+        with self._acquire(count):
+            while len(result) < count:
+                missing = count - len(result)
+                data = self._take(missing * size)
+                for start in range(0, len(data), size):
+                    value = int.from_bytes(data[start:start + size])
+                    if value < limit:
+                        result.append(value % field_size + 1)
+                    else:
+                        self.rejections += 1
+            self.values += count
+        return result
+
+    def coefficient_array(self, count, prime_number):
+        # coefficient_array method use to generate the random coefficients of a word sized prime field as a numpy array.
+        # Params:
+            # count         -> an integer value with the number of coefficients
+            # prime_number  -> an integer value with a prime number smaller than 2**32
+        # Returns:
+            # array -> numpy uint64 array with the random coefficients between 1 and prime_number - 1
+        # Description:
+            # The random bytes are read as 64 bits values and the rejection and reduction are done for the whole array.
+        np = numpy_module()
+        field_size = np.uint64(prime_number - 1)
+        limit = np.uint64((1 << 64) // (prime_number - 1) * (prime_number - 1) - 1)
+        parts = []
+        missing = count
+        with self._acquire(count):
+            while missing:
+                values = np.frombuffer(self._take(8 * missing), dtype=">u8").astype(np.uint64)
+                accepted = values[values <= limit]
+                self.rejections += len(values) - len(accepted)
+                parts.append(accepted % field_size + np.uint64(1))
+                missing -= len(accepted)
+            self.values += count
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64)
+
+# Coefficient source shared by all the secret sharing operations, its counters show the cost of the randomness.
+COEFFICIENT_SOURCE = CoefficientSource()
+
+def random_below(prime_number):
+    # random_below function used to generate a uniformly distributed random coefficient for the given prime field.
+    # Params:
+        # prime_number  -> an integer value with the prime number of the field
+    # Returns:
+        # integer -> random value between 1 and prime_number - 1
+    return COEFFICIENT_SOURCE.coefficients(1, prime_number)[0]
+
+def horner_evaluation(polynomial, x, prime_number):
+    # horner_evaluation function used to evaluate a polynomial in a point with the Horner method.
+    # Params:
+        # polynomial    -> a list with the coefficients, starting with the independent term
+        # x             -> an integer value with the point that will be evaluated
+        # prime_number  -> an integer value with the prime number of the field
+    # Returns:
+        # integer -> value of the polynomial in x modulo the prime number
+    result = 0
+    for coeff in reversed(polynomial):
+        result = (result * x + coeff) % prime_number
+    return result
+
+def consecutive_evaluation(polynomial, n_parts, prime_number):
+    # consecutive_evaluation function used to evaluate a polynomial in the consecutive positions 1, 2, ..., n_parts.
+    # Params:
+        # polynomial    -> a list with the coefficients, starting with the independent term
+        # n_parts       -> an integer value with the number of positions
+        # prime_number  -> an integer value with the prime number of the field
+    # Returns:
+        # generator -> the value of the polynomial in every position modulo the prime number, in order
+    # Description:
+        # The forward differences of a polynomial of degree d are constant after d steps, so once the differences in
+        # x = 1 are known (from the first d + 1 values) every next value only needs d modular additions instead of
+        # d multiplications and reductions. The values are generated lazily; for a few positions the Horner method is used.
+    degree = len(polynomial) - 1
+    if n_parts <= 2 * (degree + 1):
+        for x in range(1, n_parts + 1):
+            yield horner_evaluation(polynomial, x, prime_number)
+        return
+    differences = [horner_evaluation(polynomial, x, prime_number) for x in range(1, degree + 2)]
+    for order in range(1, degree + 1):
+        for position in range(degree, order - 1, -1):
+            differences[position] = (differences[position] - differences[position - 1]) % prime_number
+    yield differences[0]
+    for _ in range(n_parts - 1):
+        # Every difference moves one position with the next order difference of the previous position
+        for order in range(degree):
+            value = differences[order] + differences[order + 1]
+            differences[order] = value - prime_number if value >= prime_number else value
+        yield differences[0]
+
+def _numpy_field(k_parts, prime_number):
+    # _numpy_field function used to verify if a batch can be evaluated with numpy without overflowing 64 bits.
+    # Params:
+        # k_parts       -> an integer value with the number of coefficients of every polynomial
+        # prime_number  -> an integer value with the prime number of the field
+    # Returns:
+        # boolean -> True if the sum of k_parts products modulo prime_number fits in an unsigned 64 bit integer
+    return k_parts * (prime_number - 1) ** 2 < 2**64 and numpy_module() is not None
+
+def _split_many_numpy(secrets, n_parts, k_parts, prime_number):
+    # _split_many_numpy function used to calculate the shares of a batch of secrets with a single matrix product.
+    # Params:
+        # secrets       -> a list with the integer secrets
+        # n_parts       -> an integer value with the number of shares of every secret
+        # k_parts       -> an integer value with the minimum shares to recover every secret
+        # prime_number  -> an integer value with a word sized prime number
+    # Returns:
+        # list -> a list with the points of every secret
+    # Description:
+        # The (batch x k) coefficient matrix is multiplied by the (k x n) Vandermonde matrix of the positions 1..n,
+        # every power in the Vandermonde matrix is already reduced modulo the prime number.
+    np = numpy_module()
+    coefficients = np.empty((len(secrets), k_parts), dtype=np.uint64)
+    coefficients[:, 0] = secrets
+    coefficients[:, 1:] = COEFFICIENT_SOURCE.coefficient_array(len(secrets) * (k_parts - 1), prime_number).reshape(len(secrets), k_parts - 1)
+    positions = np.arange(1, n_parts + 1, dtype=np.uint64) % np.uint64(prime_number)
+    vandermonde = np.empty((k_parts, n_parts), dtype=np.uint64)
+    vandermonde[0] = 1
+    for power in range(1, k_parts):
+        vandermonde[power] = vandermonde[power - 1] * positions % np.uint64(prime_number)
+    values = (coefficients @ vandermonde) % np.uint64(prime_number)
+    x_positions = range(1, n_parts + 1)
+    return [list(map(Share, x_positions, row)) for row in values.tolist()]
+
+def batch_inverse(values, p_number):
+    # batch_inverse function used to calculate the modular inverse of many values with a single inversion.
+    # Params:
+        # values    -> a list with the integer values that will be inverted, none of them can be a multiple of p_number
+        # p_number  -> an integer value with the prime number of the field
+    # Returns:
+        # list  -> the inverse of every value modulo p_number in the same order, as integers of the active backend
+    # Description:
+        # Montgomery trick: the prefix products of the values are accumulated, only the last product is inverted and
+        # then every inverse is recovered going backwards with two multiplications per value.
+    reduce = field_reducer(p_number)
+    prefix_products = []
+    accumulated = 1
+    for value in values:
+        accumulated = reduce(accumulated * value)
+        prefix_products.append(accumulated)
+    inverse = invert(accumulated, p_number)   # The only modular inversion
+    inverses = [0] * len(values)
+    for position in range(len(values) - 1, 0, -1):
+        inverses[position] = reduce(inverse * prefix_products[position - 1])
+        inverse = reduce(inverse * values[position])
+    if values:
+        inverses[0] = inverse
+    return inverses
+
+def lagrange_weights(x_shares, p_number, progress=None):
+    # lagrange_weights function used to calculate the lagrange basis of every position evaluated in x = 0.
+    # Params:
+        # x_shares  -> a list with the different point positions
+        # p_number  -> an integer value with the prime number used during the secret sharing
+        # progress  -> a function called with the positions done and the total after every denominator, it can raise
+        #              an exception to stop the calculation
+    # Returns:
+        # list  -> the lagrange basis of every position in the same order, as integers of the active backend
+    # Description:
+        # The numerator of every basis is the product of -x_m for the other positions, calculated with prefix and suffix
+        # products. The denominators are accumulated per basis and all of them are inverted with a batch inversion.
+    p_number = field_int(p_number)
+    k_shares = len(x_shares)
+    suffix_products = [1] * (k_shares + 1)
+    for position in range(k_shares - 1, -1, -1):
+        suffix_products[position] = suffix_products[position + 1] * -x_shares[position] % p_number
+    numerators, denominators = [], []
+    prefix_product = 1
+    for position, x_j in enumerate(x_shares):
+        numerators.append(prefix_product * suffix_products[position + 1] % p_number)
+        prefix_product = prefix_product * -x_j % p_number
+        denominator = 1
+        for x_m in x_shares:
+            if x_m != x_j:
+                denominator = denominator * (x_j - x_m) % p_number
+        denominators.append(denominator)
+        if progress is not None:
+            progress(position + 1, k_shares)
+    return [numerator * inverse % p_number for numerator, inverse in zip(numerators, batch_inverse(denominators, p_number))]
+
+class ReconstructionContext:
+    # ReconstructionContext class used to recover many secrets shared with the same positions and prime number.
+    #Variables:
+        # x_shares  -> tuple with the positions of the points, the y values should be given in the same order
+        # p_number  -> the prime number used during the secret sharing
+        # weights   -> tuple with the lagrange basis of every position evaluated in x = 0
+    #Methods:
+        # reconstruct       -> method that recovers a secret from the y values of the points
+        # reconstruct_many  -> method that recovers a batch of secrets from their y values
+
+    def __init__(self, x_shares, p_number, progress=None):
+        # ReconstructionContext constructor method use to precompute the lagrange basis of the positions.
+        # Params:
+            # x_shares  -> an iterable with the point positions that were chosen to recover the secrets
+            # p_number  -> an integer value with the prime number used during the secret sharing
+            # progress  -> a function that receives the progress of the lagrange basis (see lagrange_weights)
+        # Returns:
+            # -
+        # Description:
+            # The lagrange basis only depends on the positions and the prime number, so they are calculated once (with a
+            # single modular inversion) and every reconstruction becomes a sum of k products.
+        self.x_shares = tuple(x_shares)
+        self.p_number = p_number
+        if len({x % p_number for x in self.x_shares}) != len(self.x_shares) or any(x % p_number == 0 for x in self.x_shares):
+            raise ValueError("The point positions should be different and not zero to recover the secret")
+        weights = lagrange_weights(self.x_shares, p_number, progress)
+        self.weights = tuple(weights)
+
+    def reconstruct(self, y_shares):
+        # reconstruct method use to recover a secret with the precomputed lagrange basis.
+        # Params:
+            # y_shares  -> an iterable with the point values in the same order as the positions
+        # Returns:
+            # integer   -> secret
+        return int(field_reducer(self.p_number)(sum(weight * y for weight, y in zip(self.weights, y_shares))))
+
+    def reconstruct_many(self, y_batches):
+        # reconstruct_many method use to recover a batch of secrets with the precomputed lagrange basis.
+        # Params:
+            # y_batches -> an iterable with the point values of every secret in the same order as the positions
+        # Returns:
+            # list  -> the recovered secrets in the same order
+        weights, reduce = self.weights, field_reducer(self.p_number)
+        return [int(reduce(sum(weight * y for weight, y in zip(weights, y_shares)))) for y_shares in y_batches]
+
+@lru_cache(maxsize=_RECONSTRUCTION_CACHE_SIZE)
+def reconstruction_context(x_shares, p_number):
+    # reconstruction_context function used to get the reconstruction context of the positions from a bounded LRU cache.
+    # Params:
+        # x_shares  -> a tuple with the point positions
+        # p_number  -> an integer value with the prime number used during the secret sharing
+    # Returns:
+        # ReconstructionContext -> context with the precomputed lagrange basis
+    return ReconstructionContext(x_shares, p_number)
+
+class ActiveBackend(str):
+    # ActiveBackend class used as the name returned by use_backend, it can also restore the previous backend.
+    #Variables:
+        # previous  -> the name of the backend that was active before
+    # It is a string, so it is compared and printed as the name. As a context manager the previous backend is selected
+    # again when the block ends:
+        # with use_backend(BACKEND_PYTHON):
+        #     ...
+
+    def __new__(cls, name, previous):
+        active = super().__new__(cls, name)
+        active.previous = previous
+        return active
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        use_backend(self.previous)
+
+def use_backend(name=None):
+    # use_backend function used to change the active arithmetic backend.
+    # Params:
+        # name  -> a string value with the backend name (BACKEND_GMPY2 or BACKEND_PYTHON), by default the fastest installed
+    # Returns:
+        # ActiveBackend -> the name of the active backend, used in a with statement it restores the previous backend
+    # Description:
+        # The cached reducers and reconstruction contexts hold integers of the previous backend, so they are discarded.
+    global BACKEND, field_int, powmod, invert
+    previous = BACKEND
+    BACKEND, field_int, powmod, invert = _backend_functions(name)
+    field_reducer.cache_clear()
+    reconstruction_context.cache_clear()
+    return ActiveBackend(BACKEND, previous)
+
+def _sorted_points(points):
+    # _sorted_points function used to split the points in positions and values sorted by the position.
+    # Params:
+        # points    -> an iterable with the (position, value) points
+    # Returns:
+        # tuple -> a tuple with the positions and a tuple with the values
+    # Description:
+        # Sorting the points makes the same positions given in any order share the same cached context.
+    return tuple(zip(*sorted(points, key=lambda point: point[0])))
 
 class Shamir:
     # Shamir class used to perform the secret sharing and secret recovery.
+    # Every value is stored in the instance (the class values are never modified), so different instances can be used
+    # from different threads at the same time.
     #Variables:
         # _PRIME an large prime number used in case of a large secret number is set
+        # large_prime   -> the prime number of the instance used in case of a large secret number is set
+        # _PRIME_SEARCH_BUDGET -> maximum seconds of the search of a new field prime
+        # secret, n_parts, k_parts, prime_number, polynomial and points -> values of the last secret sharing operation
+        # prime_search  -> the PrimeSearch result with the source and the elapsed time of the last prime selection
+        # commitments   -> the Feldman commitments of the polynomial when a commitment group is used (see shamir_vss)
     #Methods:
         # get_values -> method to set the values to calculate the secret sharing opeartions.
         # generate_prime_number         ->  method to generate a prime number used for the secret sharing operations.
         # check_prime -> method         -> method that validates if the number given is a valid prime number.
         # polynomial_construction       -> method that generates the polynomial function for the secret sharing operaitons.
-        # random_number_coeff_selection -> method used to randomly choose a coefficient for the secret sharing operaitons.
+        # random_number_coeff_selection -> method used to randomly choose a coefficient for the secret sharing operaitons (the polynomial now uses COEFFICIENT_SOURCE).
         # points_generation             -> method that calculates the shares based on the polinomial constructed.
+        # iter_points                   -> method that generates the shares lazily without storing them.
         # lagrange_basis_calculation    -> method that calculate the lagrange basis to generate the values to recover the secret.
         # reconstruct_secret_shamir     -> method that recovers the secret based on the values given
+        # split_many                    -> method that calculates the shares of a batch of secrets in a single call
+        # reconstruct_many              -> method that recovers a batch of secrets reusing the lagrange basis
     
     _PRIME = 2**4096 + 1761
+    _PRIME_SEARCH_BUDGET = _PRIME_SEARCH_BUDGET
+    __slots__ = ("large_prime", "secret", "n_parts", "k_parts", "prime_number", "polynomial", "points", "prime_search", "commitments")
 
     def __init__(self):
         # Shamir constructor method use to initialize the class with empty values.
@@ -36,91 +888,87 @@ class Shamir:
         # Returns:
             # -
         # Description:
-            # This method sets empty lists to the points and polynomial variables. This is done to avoid problems if the class is instanced multiple times.
-        Shamir.points = []
-        Shamir.polynomial = []
+            # This method sets empty lists to the points and polynomial variables of the instance. This is done to avoid problems if the class is instanced multiple times.
+        self.points = []
+        self.polynomial = []
+        self.large_prime = Shamir._PRIME
+        self.secret = self.n_parts = self.k_parts = self.prime_number = self.prime_search = self.commitments = None
 
-    def get_values(self, secret, n_parts, k_parts, prime_number = _PRIME):
+    def get_values(self, secret, n_parts, k_parts, prime_number = _PRIME, group = None, points = True):
         # get_values method use to set the values for the secret sharing operation.
         # Params:
             # secret        -> a string value that will be used as the secret that wanted to be shared
             # n_parts       -> a string value that will be used as the number of parts that the secret will be divided 
             # k_parts       -> a string value that will be used as the minimum parts to recover the secret
-            # prime_number  -> an integer value that will set a prime value in case the value is too large
+            # prime_number  -> an integer value that will set a prime value for this instance in case the value is too large
+            # group         -> a commitment group (see shamir_vss.feldman_group), if it is given its order is used as the
+            #                  prime number and the polynomial is committed so every share can be verified
+            # points        -> a boolean value, if it is False the points are not generated (they can be generated one by
+            #                  one with iter_points)
         # Returns:
             #  boolean  -> True
         # Description:
             # It validates that the parameters are digits and that the number of parts are smaller that the required numbers to recover.
             # After the validation and setting the correct values 
-        if prime_number != Shamir._PRIME:
-            Shamir._PRIME = prime_number
+        self.large_prime = prime_number
         if secret.isdigit() and n_parts.isdigit() and k_parts.isdigit():
-            Shamir.secret, Shamir.n_parts, k_parts = int(secret), int(n_parts), int(k_parts)
-            Shamir.prime_number = Shamir.generate_prime_number(self,5)
+            self.secret, self.n_parts, k_parts = int(secret), int(n_parts), int(k_parts)
+            if group is None:
+                self.prime_number = self.generate_prime_number(5)
+            elif self.secret < group.order:
+                self.prime_number = group.order
+                self.prime_search = PrimeSearch(group.order, group.order.bit_length(), "group", 0, 0.0)
+            else:
+                raise ValueError("The secret number is too large for the order of the commitment group...")
         else:
             raise TypeError("The secret and the parts that will be devided must be integer numbers")
-        if k_parts > Shamir.n_parts or k_parts == 1:
+        if k_parts > self.n_parts or k_parts == 1:
             raise ArithmeticError("The minimum number to recover must be lower or equal than the nummber of pieces and should be greater than 1")
         else:
-            Shamir.k_parts = k_parts
+            self.k_parts = k_parts
         # Generating the polynomial
-        Shamir.polynomial_construction(self)
+        self.polynomial_construction(group)
         # Generating the points from the constructed polynomial
-        Shamir.points_generation(self)
+        if points:
+            self.points_generation()
         return True
         
     def generate_prime_number(self, size):
         # generate_prime_number method use to generate a valid prime number for the operations.
         # Params:
-            # size  -> an ineger value used to 
+            # size  -> an ineger value used as the minimum size in bytes of the prime number
         # Returns:
             #  integer  -> valid_prime_number
         # Description:
-            # It validates if the size of the number is too large to be calculated, if it does it will use a static prime value or use a manually 
-            # set large prime number. In case is not large enough it will raise a ValueError exception.
-        if size == 7:
-            # If the number is too large to be generated the program will use a given large prime number.
-            if Shamir.secret < Shamir._PRIME:
-                return Shamir._PRIME
-            else:
-                raise ValueError("The secret number is too large for the given prime number...")
-        valid_prime_number = int.from_bytes(urandom(size))
-        if valid_prime_number < Shamir.secret and size:
-            # If the number is too large, we will try with a new big random number.
-            return Shamir.generate_prime_number(self, size + 1)
-        if not Shamir.check_prime(self, valid_prime_number):
-            return Shamir.generate_prime_number(self, size)
-        return valid_prime_number
+            # The smallest field (a multiple of 8 bits) larger than the secret is selected from the cache of field primes, the
+            # search of a new prime is iterative and limited by the _PRIME_SEARCH_BUDGET seconds. If the field would be as large
+            # as the large prime or the search takes too long, the large prime is used. In case the secret is not smaller than the
+            # large prime it will raise a ValueError exception. The result of the search is kept in prime_search.
+        self.prime_search = select_field_prime(self.secret, self.large_prime, size * 8, Shamir._PRIME_SEARCH_BUDGET)
+        return self.prime_search.prime
 
     def check_prime(self, p):
     #check_prime function used for verifying if the p parameter is actually a prime number
     #Parameters:
         # p -> It's an integer that will be verified if it's prime or not
     #Description:
-        # If p is even it can't be a primer number.
-        # If p is 2 or 3 it is a prime number, no calculations needed.
-        # If p is even it can't be a primer number.
-        # The iterations are shortened by using the integer value of the sqrt of the number plus one and checking only odd numbers.
-        # If there is another number that has a zero module then it is not a prime number, since it is divisible by another number than itself.
-
-        if p==2 or p==3: return True
-        if p%2==0: return False 
-        for i in range(3, int(sqrt(p))+1, 2): 
-            if p%i==0: 
-                return False
-        return True
+        # The small factors are discarded first with the small primes, then the Baillie-PSW test is applied
+        # (a strong Miller-Rabin test to base 2 and a strong Lucas test), which works for numbers of any size.
+        return is_probable_prime(p)
 
-    def polynomial_construction(self):
+    def polynomial_construction(self, group = None):
         # polynomial_construction method use to generate a polynomial function with the correct structure and size to calculate the shares and recover the secret
         # with the given parameters
         # Params:
-            # -
+            # group -> a commitment group whose order is the prime number, if it is given the commitments are calculated
         # Returns:
             # -
         # Description:
             #  The method uses the secret as the first parameters of the polynomial, then makes k_parts - 1 parts with random coefficients 
-            # smaller that the prime number
-        Shamir.polynomial = [Shamir.secret] + [ Shamir.random_number_coeff_selection(self, 5, 1) for _ in range(Shamir.k_parts - 1) ]
+            # smaller that the prime number. All the coefficients are uniformly distributed in the field and are taken from
+            # a single read of the buffered coefficient source.
+        self.polynomial = [self.secret] + COEFFICIENT_SOURCE.coefficients(self.k_parts - 1, self.prime_number)
+        self.commitments = group.commit(self.polynomial) if group is not None else None
     
     def random_number_coeff_selection(self, size, iteration):
         # random_number_coeff_selection method use to generate a random coefficient with a valid size
@@ -135,15 +983,15 @@ class Shamir:
             # if it does a new value will be calculated.
         random_coeff = int.from_bytes(urandom(size))
         if random_coeff == 0:
-            return Shamir.random_number_coeff_selection(self, size, iteration+1)
-        if random_coeff < (Shamir.prime_number - 1):
+            return self.random_number_coeff_selection(size, iteration+1)
+        if random_coeff < (self.prime_number - 1):
             return random_coeff
         else:
             # If after five iterations the size is still too big the random parameter will be reduced.
             if iteration % 5 != 0 or size == 1:
-                return Shamir.random_number_coeff_selection(self, size, iteration+1)
+                return self.random_number_coeff_selection(size, iteration+1)
             else:
-                return Shamir.random_number_coeff_selection(self, size-1, iteration+1)
+                return self.random_number_coeff_selection(size-1, iteration+1)
 
     def points_generation(self):
         # points_generation method use to generate the points or the parts of the secret that will be shared.
@@ -154,14 +1002,19 @@ class Shamir:
             # -
         # Description:
             # Each part is evaluated with the generated coefficients and the positon in which it is calculated.
-        for n in range(1, Shamir.n_parts + 1):
-            result=0
-            for power, coeff in enumerate(Shamir.polynomial):
-                # The operations should retrun the sum of all of the coefficients evaluated in their positon
-                # Then the module of the prime should also be applied to the result sum
-                result = (result + coeff * pow(n, power)) % Shamir.prime_number
-            # The points are stored as a tuple with the postion and the value.
-            Shamir.points.append((n,result))
+            # The positions are consecutive, so the values are calculated with the forward differences (see iter_points).
+        self.points = list(self.iter_points())
+
+    def iter_points(self):
+        # iter_points method use to generate the points of the secret one by one.
+        # Params:
+            # -
+        # Returns:
+            # generator -> the shares with the postion and the value, from the position 1 to n_parts
+        # Description:
+            # The points are not stored in the instance, so millions of shares can be written or sent without keeping
+            # them in memory.
+        return map(Share, range(1, self.n_parts + 1), consecutive_evaluation(self.polynomial, self.n_parts, self.prime_number))
 
     def lagrange_basis_calculation(self, x_shares, iter_position, p_number):
         # lagrange_basis_calculation method use to calculate the lagrange basis polynomial using the given parameters
@@ -175,22 +1028,20 @@ class Shamir:
             # The lagrange basis calculation is calculated using the polinomial postions and a multiplication series
             # of the postion evaluated in a x = 0. The calculation uses the module of the prime number for more accuracy 
             # in the operation, specially for big numbers.   
-        lagrange_base = 1   # The multiplication base is intialized in 1
+        numerator, denominator = 1, 1   # The multiplication series are intialized in 1
         x_j = x_shares[iter_position]   # The current position is selected from the points recovered
         for m, x_m in enumerate(x_shares):
             # The multiplication is only applied when the position is different from the one in the current iteration.
             if m != iter_position:
                 # The numerator operation should be x - x_m, consider that the operation is evaluated 
                 # when x = 0, then the module is applied for more security on the operations.
-                numerator = (0 - x_m) % p_number
+                numerator = (numerator * (0 - x_m)) % p_number
                 # The denominator should be diference between the current position and the positions 
                 # in the points recovered a module is also applied for security in the operations.
-                denominator = (x_j - x_m) % p_number
-                # The lagrange basis is the multiplication series of the division between the calculated numerator and 
-                # the denominator. In this case the denominator is calculated by making the inverse of the denominator
-                # value, then a module of the prime number is also applied for security measures.
-                lagrange_base = (lagrange_base * numerator * pow(denominator, -1, p_number)) % p_number
-        return lagrange_base
+                denominator = (denominator * (x_j - x_m)) % p_number
+        # The lagrange basis is the division between the accumulated numerator and denominator. The division is
+        # calculated with a single inverse of the denominator instead of one inverse for every position.
+        return int((numerator * invert(denominator, p_number)) % p_number)
 
     def reconstruct_secret_shamir(self, min_points, p_number):
         # reconstruct_secret_shamir method use to calculate the secret with the given points and prime number.
@@ -201,11 +1052,58 @@ class Shamir:
             # integer   ->  secret
         # Description:
             # This method perfomrs the sum series using the lagrange base and the points value.
-        x_shares, y_shares = zip(*min_points) # The points are splited between the positions (x_shares) and the values (y_shares)
-        secret = 0  # The secret is initialized as zero for the sum series that will be performed later
-        # The series will be applied for every point, if less points are used or if invalid points 
-        # are used the secret will not be recovered
-        for position in range(len(min_points)):
-            lagrange_base = Shamir.lagrange_basis_calculation(self, x_shares, position, p_number) # The lagrange value is calcualted for every point
-            secret = (secret + y_shares[position] * lagrange_base) % p_number # The sum of the value of the point times the current lagrange base.
-        return secret
\ No newline at end of file
+            # The lagrange basis are taken from the reconstruction context cache, so recovering many secrets with the
+            # same positions only calculates them once.
+        x_shares, y_shares = _sorted_points(min_points) # The points are splited between the positions (x_shares) and the values (y_shares)
+        return reconstruction_context(x_shares, p_number).reconstruct(y_shares)
+
+    def split_many(self, secrets, n_parts, k_parts, prime_number = _PRIME):
+        # split_many method use to calculate the shares of a batch of secrets with the same parameters.
+        # Params:
+            # secrets       -> an iterable with the integer secrets that will be shared
+            # n_parts       -> an integer value with the number of parts that every secret will be divided
+            # k_parts       -> an integer value with the minimum parts to recover every secret
+            # prime_number  -> an integer value with the prime number used for all the secrets
+        # Returns:
+            # list  -> a list with the points of every secret, in the same order as the secrets
+        # Description:
+            # Every secret gets its own random polynomial. For word sized primes (when numpy is installed) the whole
+            # batch is evaluated with a single product against the Vandermonde matrix of the positions, otherwise
+            # every polynomial is evaluated with the Horner method. The instance values are not modified.
+        secrets = list(secrets)
+        if not all(isinstance(secret, int) for secret in secrets) or not isinstance(n_parts, int) or not isinstance(k_parts, int):
+            raise TypeError("The secrets and the parts that will be devided must be integer numbers")
+        if k_parts > n_parts or k_parts <= 1:
+            raise ArithmeticError("The minimum number to recover must be lower or equal than the nummber of pieces and should be greater than 1")
+        if n_parts >= prime_number:
+            raise ValueError("The number of parts should be smaller than the prime number...")
+        if any(secret < 0 or secret >= prime_number for secret in secrets):
+            raise ValueError("The secret number is too large for the given prime number...")
+        if not secrets:
+            return []
+        if _numpy_field(k_parts, prime_number):
+            return _split_many_numpy(secrets, n_parts, k_parts, prime_number)
+        x_positions = range(1, n_parts + 1)
+        # The coefficients of all the polynomials of the batch are generated at the same time.
+        random_coefficients = COEFFICIENT_SOURCE.coefficients(len(secrets) * (k_parts - 1), prime_number)
+        shares = []
+        for position, secret in enumerate(secrets):
+            polynomial = [secret] + random_coefficients[position * (k_parts - 1):(position + 1) * (k_parts - 1)]
+            shares.append(list(map(Share, x_positions, consecutive_evaluation(polynomial, n_parts, prime_number))))
+        return shares
+
+    def reconstruct_many(self, points_batches, p_number):
+        # reconstruct_many method use to recover a batch of secrets shared with the same prime number.
+        # Params:
+            # points_batches    -> an iterable with the list of points of every secret
+            # p_number          -> an integer value with the prime number used in the secret sharing operation
+        # Returns:
+            # list  -> the recovered secrets in the same order as the batches
+        # Description:
+            # The batches with the same positions reuse the cached reconstruction context, then every secret is
+            # recovered with a sum of k products.
+        secrets = []
+        for points in points_batches:
+            x_shares, y_shares = _sorted_points(points)
+            secrets.append(reconstruction_context(x_shares, p_number).reconstruct(y_shares))
+        return secrets
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# Compact binary container for Shamir shares.
+# The prime number is written once in the header and every share is a fixed width record, so a file can hold millions
+# of shares and be read with a memory map without converting the values through decimal strings.
+
+# The share files have the next layout (big-endian):
+    # magic         -> 4 bytes with the value b"SHMC"
+    # version       -> 1 byte with the format version
+    # flags         -> 1 byte, the bit 0 indicates that the file ends with a checksum
+    # width         -> 2 bytes with the size in bytes of the prime number and of every y value
+    # prime_number  -> width bytes with the prime number
+    # records       -> 2 bytes with the position (x) and width bytes with the value (y) of every share
+    # checksum      -> 4 bytes with the CRC-32 of all the previous bytes (only if the flag is set)
+
+# The program requires the next packages:
+    # os            -> used to detect when a path is given instead of a stream
+    # struct        -> used to pack and unpack the header of the share files
+    # mmap          -> used to read the share files without loading them in memory
+    # zlib          -> crc32 is used as the checksum of the share files
+    # contextlib    -> used to open the share files when a path is given
+    # shamir        -> shamir algorithm, the shares are returned as Share objects.
+import os
+import struct
+import mmap
+from zlib import crc32
+from contextlib import ExitStack
+from shamir_secret_sharing import Share
+
+_MAGIC = b"SHMC"
+_VERSION = 1
+_FLAG_CHECKSUM = 0x01
+_HEADER = struct.Struct(">4sBBH")
+_X_SIZE = 2
+_CHECKSUM = struct.Struct(">I")
+_RECORDS_PER_WRITE = 4096   # Number of records packed and written with a single write call
+
+def _record_size(width):
+    # _record_size function used to calculate the size of a share record.
+    # Params:
+        # width -> an integer value with the size of the y values in bytes
+    # Returns:
+        # integer -> the size of the record in bytes
+    return _X_SIZE + width
+
+def write_shares(file, shares, prime_number, checksum=True):
+    # write_shares function used to write shares into a binary share file.
+    # Params:
+        # file          -> a path or a binary stream opened for writing
+        # shares        -> an iterable with the (x, y) shares, it can be a generator with millions of shares
+        # prime_number  -> an integer value with the prime number used for the shares
+        # checksum      -> a boolean value, if it is True a CRC-32 of the file is written at the end
+    # Returns:
+        # integer -> the number of shares written
+    # Description:
+        # The records are packed in blocks and written with a single call for every block, the checksum is updated
+        # with every block so the shares are never kept in memory.
+    width = (prime_number.bit_length() + 7) // 8
+    with ExitStack() as stack:
+        stream = stack.enter_context(open(file, "wb")) if isinstance(file, (str, os.PathLike)) else file
+        data = _HEADER.pack(_MAGIC, _VERSION, _FLAG_CHECKSUM if checksum else 0, width) + prime_number.to_bytes(width)
+        running_checksum = crc32(data)
+        stream.write(data)
+        count = 0
+        block = []
+        for x, y in shares:
+            if not 0 < x <= 0xFFFF or not 0 <= y < prime_number:
+                raise ValueError("The share ({}, ...) is not valid for the prime number".format(x))
+            block.append(x.to_bytes(_X_SIZE) + y.to_bytes(width))
+            if len(block) == _RECORDS_PER_WRITE:
+                data = b"".join(block)
+                running_checksum = crc32(data, running_checksum)
+                stream.write(data)
+                count += len(block)
+                block = []
+        data = b"".join(block)
+        running_checksum = crc32(data, running_checksum)
+        stream.write(data)
+        count += len(block)
+        if checksum:
+            stream.write(_CHECKSUM.pack(running_checksum))
+    return count
+
+class ShareFile:
+    # ShareFile class used to read a binary share file with a memory map.
+    #Variables:
+        # prime_number  -> the prime number of the shares
+        # width         -> the size of the y values in bytes
+    #Methods:
+        # __len__       -> method that returns the number of shares
+        # __getitem__   -> method that returns the share in a position of the file
+        # __iter__      -> method that yields every share of the file
+        # y_view        -> method that returns the bytes of the y value of a share without copying them
+        # verify        -> method that validates the checksum of the file
+        # close         -> method that releases the memory map
+
+    def __init__(self, path, verify=True):
+        # ShareFile constructor method use to open the share file and read the header.
+        # Params:
+            # path      -> a string value with the path of the share file
+            # verify    -> a boolean value, if it is True the checksum is validated when the file is opened
+        # Returns:
+            # -
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("The file is not a valid share file")
+        self._view = memoryview(self._map)
+        try:
+            self._read_header(verify)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_header(self, verify):
+        # _read_header method use to validate the header and the size of the records.
+        # Params:
+            # verify    -> a boolean value, if it is True the checksum is validated
+        # Returns:
+            # -
+        if len(self._view) < _HEADER.size:
+            raise ValueError("The file is not a valid share file")
+        magic, version, flags, self.width = _HEADER.unpack(self._view[:_HEADER.size])
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("The file is not a valid share file")
+        self._start = _HEADER.size + self.width
+        self._record = _record_size(self.width)
+        self._checksum = bool(flags & _FLAG_CHECKSUM)
+        self._end = len(self._view) - (_CHECKSUM.size if self._checksum else 0)
+        if self._end < self._start or (self._end - self._start) % self._record:
+            raise ValueError("The share file is truncated")
+        self.prime_number = int.from_bytes(self._view[_HEADER.size:self._start])
+        if verify and not self.verify():
+            raise ValueError("The checksum of the share file is not valid")
+
+    def verify(self):
+        # verify method use to validate the checksum of the file.
+        # Params:
+            # -
+        # Returns:
+            # boolean -> True if the checksum is valid or the file does not have a checksum
+        if not self._checksum:
+            return True
+        return crc32(self._view[:self._end]) == _CHECKSUM.unpack(self._view[self._end:])[0]
+
+    def __len__(self):
+        return (self._end - self._start) // self._record
+
+    def __getitem__(self, index):
+        # __getitem__ method use to read the share in a position of the file.
+        # Params:
+            # index -> an integer value with the position of the share in the file
+        # Returns:
+            # Share -> the share with the position and the value
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("The share index is out of range")
+        offset = self._start + index * self._record
+        return Share(int.from_bytes(self._view[offset:offset + _X_SIZE]), int.from_bytes(self._view[offset + _X_SIZE:offset + self._record]))
+
+    def __iter__(self):
+        # __iter__ method use to read all the shares of the file in order.
+        # Params:
+            # -
+        # Returns:
+            # generator -> the shares with the position and the value
+        view, record = self._view, self._record
+        for offset in range(self._start, self._end, record):
+            yield Share(int.from_bytes(view[offset:offset + _X_SIZE]), int.from_bytes(view[offset + _X_SIZE:offset + record]))
+
+    def y_view(self, index):
+        # y_view method use to get the bytes of the y value of a share without copying them.
+        # Params:
+            # index -> an integer value with the position of the share in the file
+        # Returns:
+            # memoryview -> the big-endian bytes of the value, it should be released before closing the file
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("The share index is out of range")
+        offset = self._start + index * self._record + _X_SIZE
+        return self._view[offset:offset + self.width]
+
+    def close(self):
+        # close method use to release the memory map and close the file.
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_shares(path):
+    # read_shares function used to read all the shares of a share file.
+    # Params:
+        # path  -> a string value with the path of the share file
+    # Returns:
+        # tuple -> the prime number and a list with the shares
+    with ShareFile(path) as share_file:
+        return share_file.prime_number, list(share_file)
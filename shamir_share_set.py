@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Compact in-memory storage of the shares of a secret.
+# A list of (x, y) tuples keeps a tuple and an integer object for every share (more than 600 bytes per share with the
+# 4096 bits prime). A ShareSet keeps all the positions in an array('H') and all the values in a single buffer of fixed
+# width big-endian values, the same layout as the records of the share files (see shamir_share_file), so a share costs
+# 2 + width bytes. The values are converted to integers only when a share is read or the secret is recovered.
+# The slices and the subsets of a ShareSet are views of the same buffers, only the indexes of the shares are stored.
+#     share_set = ShareSet.from_points(shamir_instance.iter_points(), shamir_instance.prime_number)
+#     secret = share_set.select([0, 4, 7]).reconstruct()
+
+# The program requires the next packages:
+    # array     -> the positions are stored as unsigned 16 bits values and the selected indexes as unsigned values
+    # shamir    -> shamir algorithm, the shares are returned as Share objects and the secrets are recovered with the
+    #              cached reconstruction contexts.
+from array import array
+from shamir_secret_sharing import Share, reconstruction_context
+
+_MAX_POSITION = 0xFFFF   # The positions are stored in 2 bytes, as in the share files
+
+class ShareSet:
+    # ShareSet class used to store the shares of a secret with a fixed width buffer.
+    #Variables:
+        # prime_number  -> the prime number used in the secret sharing operation
+        # width         -> the size in bytes of every value
+    #Methods:
+        # from_points   -> class method that packs an iterable of (x, y) shares
+        # positions     -> method that returns the positions of the shares
+        # y_values      -> method that converts the values of the shares to integers
+        # y_view        -> method that returns the bytes of a value without copying them
+        # select        -> method that returns a view with a subset of the shares
+        # reconstruct   -> method that recovers the secret with the shares of the set
+        # nbytes        -> method that returns the size of the stored positions, values and indexes
+    # The shares are read with len(), the [] operator (an index returns a Share, a slice returns a ShareSet view) and
+    # iteration, so a ShareSet can be used where a list of shares is expected.
+
+    __slots__ = ("prime_number", "width", "_x", "_y", "_indexes")
+
+    def __init__(self, prime_number, x_positions, y_buffer, indexes=None):
+        # ShareSet constructor method use to set the buffers of the shares.
+        # Params:
+            # prime_number  -> an integer value with the prime number of the shares
+            # x_positions   -> an array('H') with the positions
+            # y_buffer      -> a bytes-like object with the big-endian values, width bytes for every position
+            # indexes       -> a range or an array with the indexes of the shares of the set, by default all of them
+        # Returns:
+            # -
+        # Description:
+            # The buffers are not copied, every view of the set shares them.
+        self.prime_number = prime_number
+        self.width = (prime_number.bit_length() + 7) // 8
+        if len(y_buffer) != len(x_positions) * self.width:
+            raise ValueError("The size of the values does not match the number of positions")
+        self._x = x_positions
+        self._y = memoryview(y_buffer).cast("B")
+        self._indexes = range(len(x_positions)) if indexes is None else indexes
+
+    @classmethod
+    def from_points(cls, points, prime_number):
+        # from_points method use to pack the shares of a secret.
+        # Params:
+            # points        -> an iterable with the (x, y) shares, it can be a generator (see Shamir.iter_points)
+            # prime_number  -> an integer value with the prime number of the shares
+        # Returns:
+            # ShareSet -> the packed shares
+        # Description:
+            # The shares are packed one by one, so the list of shares is never created. A ValueError is raised if a
+            # position is not between 1 and 65535 or a value is not in the field.
+        width = (prime_number.bit_length() + 7) // 8
+        x_positions, y_buffer = array("H"), bytearray()
+        for x, y in points:
+            if not 0 < x <= _MAX_POSITION or not 0 <= y < prime_number:
+                raise ValueError("The share ({}, {}) is not valid for the prime number".format(x, y))
+            x_positions.append(x)
+            y_buffer += y.to_bytes(width)
+        # The buffer is copied once to drop the spare capacity of the bytearray
+        return cls(prime_number, x_positions, bytes(y_buffer))
+
+    def _view(self, indexes):
+        # _view method use to create a set with other indexes of the same buffers.
+        view = ShareSet.__new__(ShareSet)
+        view.prime_number, view.width, view._x, view._y, view._indexes = self.prime_number, self.width, self._x, self._y, indexes
+        return view
+
+    def _value(self, index):
+        # _value method use to convert the value of a position of the buffers to an integer.
+        start = index * self.width
+        return int.from_bytes(self._y[start:start + self.width])
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __getitem__(self, item):
+        # __getitem__ method use to read a share or a slice of the set.
+        # Params:
+            # item  -> an integer value with the index of the share or a slice
+        # Returns:
+            # Share -> the share of the index
+            # ShareSet -> a view with the shares of the slice
+        if isinstance(item, slice):
+            return self._view(self._indexes[item])
+        index = self._indexes[item]
+        return Share(self._x[index], self._value(index))
+
+    def __iter__(self):
+        for index in self._indexes:
+            yield Share(self._x[index], self._value(index))
+
+    def positions(self):
+        # positions method use to get the positions of the shares of the set.
+        # Params:
+            # -
+        # Returns:
+            # array -> the positions in the order of the set, the positions of the contiguous sets are sliced from the
+            #          stored ones
+        if isinstance(self._indexes, range) and self._indexes.step > 0:
+            return self._x[self._indexes.start:self._indexes.stop:self._indexes.step]
+        return array("H", (self._x[index] for index in self._indexes))
+
+    def y_values(self):
+        # y_values method use to convert the values of the shares of the set to integers.
+        # Params:
+            # -
+        # Returns:
+            # list  -> the integer values in the order of the set
+        return [self._value(index) for index in self._indexes]
+
+    def y_view(self, item):
+        # y_view method use to get the bytes of the value of a share without copying them.
+        # Params:
+            # item  -> an integer value with the index of the share in the set
+        # Returns:
+            # memoryview -> the big-endian bytes of the value
+        start = self._indexes[item] * self.width
+        return self._y[start:start + self.width]
+
+    def select(self, items):
+        # select method use to get a view with a subset of the shares.
+        # Params:
+            # items -> an iterable with the indexes of the shares in the set
+        # Returns:
+            # ShareSet -> a view of the same buffers with the selected shares in the given order
+        # Description:
+            # Only the indexes are stored (4 or 8 bytes per share), the positions and the values are not copied.
+        indexes = self._indexes
+        return self._view(array("L", (indexes[item] for item in items)))
+
+    def reconstruct(self):
+        # reconstruct method use to recover the secret with the shares of the set.
+        # Params:
+            # -
+        # Returns:
+            # integer -> secret
+        # Description:
+            # The shares are sorted by the position, so the same positions in any order reuse the cached reconstruction
+            # context, and only the values of the set are converted to integers.
+        order = sorted(self._indexes, key=self._x.__getitem__)
+        x_shares = tuple(self._x[index] for index in order)
+        return reconstruction_context(x_shares, self.prime_number).reconstruct([self._value(index) for index in order])
+
+    def nbytes(self):
+        # nbytes method use to get the memory used by the data of the set.
+        # Params:
+            # -
+        # Returns:
+            # integer -> the bytes of the positions, the values and the selected indexes (the buffers are shared by
+            #            all the views, a slice only adds its indexes)
+        indexes = self._indexes.itemsize * len(self._indexes) if isinstance(self._indexes, array) else 0
+        return self._x.itemsize * len(self._x) + self._y.nbytes + indexes
+
+    def __repr__(self):
+        return "ShareSet({} shares, {} bytes values)".format(len(self), self.width)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# Streaming implementation of the Shamir secret sharing algorithm for byte strings and files.
+# The secret is read in chunks smaller than the prime number, every chunk is shared as an independent secret and the
+# values of every share are written incrementally into n share streams, so the memory used does not depend on the size
+# of the secret. The secret is recovered reading the chunks of k share streams.
+
+# Every share stream starts with a header with the next values (big-endian):
+    # magic         -> 4 bytes with the value b"SHMS"
+    # version       -> 1 byte with the format version
+    # x             -> 2 bytes with the position of the share
+    # k_parts       -> 2 bytes with the minimum shares needed to recover the secret
+    # prime_length  -> 2 bytes with the size of the prime number in bytes
+    # prime_number  -> prime_length bytes with the prime number
+# Then the value of every chunk is written with a fixed width of prime_length bytes.
+# The last chunk of the secret is padded with a 0x80 byte followed by zero bytes (ISO/IEC 7816-4 padding).
+# The shares of the GF(2^8) engine use a prime_length of zero, the header is followed by the share bytes without padding.
+
+# The program requires the next packages:
+    # struct        -> used to pack and unpack the header of the share streams
+    # io            -> used to share and recover byte strings in memory
+    # contextlib    -> used to open all the share files at the same time
+    # shamir        -> shamir algorithm that calculates the share secret and recovers the secret from the points given.
+    # shamir_gf256  -> shamir algorithm over GF(2^8) used by the gf256 engine.
+    # shamir_parallel -> pool of worker processes used to share and recover the batches in parallel.
+import struct
+from io import BytesIO
+from contextlib import ExitStack
+from shamir_secret_sharing import Shamir, reconstruction_context
+import shamir_gf256
+from shamir_parallel import process_executor, ordered_map
+
+_MAGIC = b"SHMS"
+_VERSION = 1
+_HEADER = struct.Struct(">4sBHHH")
+_PADDING = b"\x80"
+_CHUNKS_PER_BATCH = 256     # Number of chunks that are shared or recovered with a single batch call
+_GF256_BLOCK = 1 << 16      # Number of bytes that are shared or recovered at the same time with the gf256 engine
+
+# Engines that can be selected to share the secrets.
+ENGINE_PRIME = "prime"      # Big prime field, the secret is divided in chunks smaller than the prime number
+ENGINE_GF256 = "gf256"      # GF(2^8) field, every share has the size of the secret
+
+def chunk_size(prime_number):
+    # chunk_size function used to calculate the number of secret bytes that fit in a chunk for the given prime.
+    # Params:
+        # prime_number  -> an integer value with the prime number used for the secret sharing
+    # Returns:
+        # integer -> the number of bytes of every chunk, every chunk value is smaller than the prime number
+    size = (prime_number.bit_length() - 1) // 8
+    if size < 1:
+        raise ValueError("The prime number is too small to share bytes...")
+    return size
+
+def _read_exact(stream, size):
+    # _read_exact function used to read a number of bytes from a stream that can return partial reads.
+    # Params:
+        # stream    -> a binary stream opened for reading
+        # size      -> an integer value with the number of bytes to read
+    # Returns:
+        # bytes -> the bytes read, it is shorter than size only when the end of the stream is reached
+    data = stream.read(size)
+    if len(data) == size or not data:
+        return data
+    parts = [data]
+    remaining = size - len(data)
+    while remaining:
+        data = stream.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+def _split_stream_gf256(source, share_streams, k_parts):
+    # _split_stream_gf256 function used to share the content of a binary stream with the GF(2^8) engine.
+    # Params:
+        # source            -> a binary stream opened for reading with the secret
+        # share_streams     -> a list with the binary streams opened for writing, the share i gets the position i + 1
+        # k_parts           -> an integer value with the minimum shares to recover the secret
+    # Returns:
+        # integer -> the number of bytes of the secret
+    shamir_gf256.split_bytes(b"", len(share_streams), k_parts)   # The parameters are validated before writing the headers
+    for x, stream in enumerate(share_streams, start=1):
+        stream.write(_HEADER.pack(_MAGIC, _VERSION, x, k_parts, 0))
+    total = 0
+    while True:
+        block = _read_exact(source, _GF256_BLOCK)
+        if not block:
+            return total
+        total += len(block)
+        for (_, share), stream in zip(shamir_gf256.split_bytes(block, len(share_streams), k_parts), share_streams):
+            stream.write(share)
+
+def _padded_batches(source, batch_size, size, lengths):
+    # _padded_batches function used to read the secret in batches of chunks and pad the last batch.
+    # Params:
+        # source        -> a binary stream opened for reading with the secret
+        # batch_size    -> an integer value with the number of bytes of every batch, a multiple of the chunk size
+        # size          -> an integer value with the number of bytes of every chunk
+        # lengths       -> a list where the number of secret bytes of every batch is appended
+    # Returns:
+        # generator -> the batches, the last one gets the padding (a full padding chunk if the secret fills the chunk)
+    batch = _read_exact(source, batch_size)
+    while True:
+        next_batch = _read_exact(source, batch_size)
+        lengths.append(len(batch))
+        if not next_batch:
+            yield batch + _PADDING + bytes(size - 1 - len(batch) % size)
+            return
+        yield batch
+        batch = next_batch
+
+def _split_batch(batch, n_parts, k_parts, prime_number):
+    # _split_batch function used to share a batch of chunks, it is also run by the worker processes.
+    # Params:
+        # batch         -> a bytes value with the chunks, its size is a multiple of the chunk size
+        # n_parts       -> an integer value with the number of shares
+        # k_parts       -> an integer value with the minimum shares to recover the secret
+        # prime_number  -> an integer value with the prime number used for every chunk
+    # Returns:
+        # list  -> a bytes value for every share with the fixed width values of the chunks
+    size = chunk_size(prime_number)
+    width = (prime_number.bit_length() + 7) // 8
+    secrets = [int.from_bytes(batch[start:start + size]) for start in range(0, len(batch), size)]
+    shares = Shamir().split_many(secrets, n_parts, k_parts, prime_number)
+    return [b"".join(points[position][1].to_bytes(width) for points in shares) for position in range(n_parts)]
+
+def split_stream(source, share_streams, k_parts, prime_number=Shamir._PRIME, chunks_per_batch=_CHUNKS_PER_BATCH, engine=ENGINE_PRIME, workers=None):
+    # split_stream function used to share the content of a binary stream into n share streams.
+    # Params:
+        # source            -> a binary stream opened for reading with the secret
+        # share_streams     -> a list with the n binary streams opened for writing, the share i gets the position i + 1
+        # k_parts           -> an integer value with the minimum shares to recover the secret
+        # prime_number      -> an integer value with the prime number used for every chunk
+        # chunks_per_batch  -> an integer value with the number of chunks read and shared at the same time
+        # engine            -> a string value with the engine used, ENGINE_PRIME or ENGINE_GF256 (the prime is ignored)
+        # workers           -> an integer value with the number of worker processes, by default the current process
+    # Returns:
+        # integer -> the number of bytes of the secret
+    # Description:
+        # The secret is read in batches of chunks, the batch is shared with split_many and the values of every share
+        # are written with a single write call. The batch is only padded when the end of the source is reached.
+        # With workers the batches are shared by a pool of processes and written in the same order.
+    n_parts = len(share_streams)
+    if n_parts > 0xFFFF:
+        raise ValueError("The number of shares should be smaller than 65536")
+    if engine == ENGINE_GF256:
+        return _split_stream_gf256(source, share_streams, k_parts)
+    if engine != ENGINE_PRIME:
+        raise ValueError("The engine should be {} or {}".format(ENGINE_PRIME, ENGINE_GF256))
+    size = chunk_size(prime_number)
+    width = (prime_number.bit_length() + 7) // 8
+    Shamir().split_many([], n_parts, k_parts, prime_number)   # The parameters are validated before writing the headers
+    prime_bytes = prime_number.to_bytes(width)
+    for x, stream in enumerate(share_streams, start=1):
+        stream.write(_HEADER.pack(_MAGIC, _VERSION, x, k_parts, width) + prime_bytes)
+    lengths = []
+    tasks = ((batch, n_parts, k_parts, prime_number) for batch in _padded_batches(source, size * chunks_per_batch, size, lengths))
+    with ExitStack() as stack:
+        executor = stack.enter_context(process_executor(workers)) if workers else None
+        for share_blocks in ordered_map(_split_batch, tasks, executor, 2 * workers if workers else None):
+            for block, stream in zip(share_blocks, share_streams):
+                stream.write(block)
+    return sum(lengths)
+
+def _read_header(stream):
+    # _read_header function used to read and validate the header of a share stream.
+    # Params:
+        # stream    -> a binary stream opened for reading at the beginning of a share
+    # Returns:
+        # tuple -> the position, the minimum shares and the prime number of the share (None for the gf256 engine)
+    header = _read_exact(stream, _HEADER.size)
+    if len(header) != _HEADER.size:
+        raise ValueError("The share stream is too short")
+    magic, version, x, k_parts, width = _HEADER.unpack(header)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("The stream is not a valid share")
+    if width == 0:
+        return x, k_parts, None
+    prime_bytes = _read_exact(stream, width)
+    if len(prime_bytes) != width:
+        raise ValueError("The share stream is too short")
+    return x, k_parts, int.from_bytes(prime_bytes)
+
+def _recover_stream_gf256(share_streams, x_shares, destination):
+    # _recover_stream_gf256 function used to recover a secret shared with the GF(2^8) engine.
+    # Params:
+        # share_streams     -> a list with k binary share streams opened for reading after the header
+        # x_shares          -> a list with the position of every share stream
+        # destination       -> a binary stream opened for writing where the secret will be written
+    # Returns:
+        # integer -> the number of bytes of the secret
+    total = 0
+    while True:
+        blocks = [_read_exact(stream, _GF256_BLOCK) for stream in share_streams]
+        if len({len(block) for block in blocks}) != 1:
+            raise ValueError("The share streams have different lengths")
+        if not blocks[0]:
+            return total
+        destination.write(shamir_gf256.recover_bytes(list(zip(x_shares, blocks))))
+        total += len(blocks[0])
+
+def _share_blocks(streams, block_size, x_shares, prime_number):
+    # _share_blocks function used to read the same number of values from every share stream.
+    # Params:
+        # streams       -> a list with the k binary share streams opened for reading after the header
+        # block_size    -> an integer value with the number of bytes read from every stream
+        # x_shares      -> a tuple with the position of every share stream
+        # prime_number  -> an integer value with the prime number of the shares
+    # Returns:
+        # generator -> a tuple with the blocks, the positions and the prime number for every batch
+    width = (prime_number.bit_length() + 7) // 8
+    while True:
+        blocks = [_read_exact(stream, block_size) for stream in streams]
+        if len({len(block) for block in blocks}) != 1 or len(blocks[0]) % width:
+            raise ValueError("The share streams have different lengths")
+        if not blocks[0]:
+            return
+        yield blocks, x_shares, prime_number
+
+def _recover_batch(blocks, x_shares, prime_number):
+    # _recover_batch function used to recover a batch of chunks, it is also run by the worker processes.
+    # Params:
+        # blocks        -> a list with the bytes read from every share stream
+        # x_shares      -> a tuple with the position of every share stream
+        # prime_number  -> an integer value with the prime number of the shares
+    # Returns:
+        # bytes -> the recovered chunks, including the padding
+    size = chunk_size(prime_number)
+    width = (prime_number.bit_length() + 7) // 8
+    context = reconstruction_context(x_shares, prime_number)
+    y_batches = zip(*([int.from_bytes(block[start:start + width]) for start in range(0, len(block), width)] for block in blocks))
+    return b"".join(secret.to_bytes(size) for secret in context.reconstruct_many(y_batches))
+
+def recover_stream(share_streams, destination, chunks_per_batch=_CHUNKS_PER_BATCH, workers=None):
+    # recover_stream function used to recover a secret from the share streams and write it into a binary stream.
+    # Params:
+        # share_streams     -> a list with the binary share streams opened for reading, at least k of them are needed
+        # destination       -> a binary stream opened for writing where the secret will be written
+        # chunks_per_batch  -> an integer value with the number of chunks recovered at the same time
+        # workers           -> an integer value with the number of worker processes, by default the current process
+    # Returns:
+        # integer -> the number of bytes of the secret
+    # Description:
+        # The headers are validated to use the same prime number and minimum shares, then the first k shares are read
+        # in batches and recovered with the cached reconstruction context. The last chunk is kept until the end of the
+        # streams is reached to remove the padding. The engine is selected from the header of the shares.
+    headers = [_read_header(stream) for stream in share_streams]
+    if len({(k_parts, prime_number) for _, k_parts, prime_number in headers}) != 1:
+        raise ValueError("The shares should use the same prime number and minimum parts to recover")
+    _, k_parts, prime_number = headers[0]
+    if len(headers) < k_parts:
+        raise ValueError("At least {} shares are needed to recover the secret".format(k_parts))
+    streams = share_streams[:k_parts]
+    x_shares = tuple(x for x, _, _ in headers[:k_parts])
+    if prime_number is None:
+        return _recover_stream_gf256(streams, x_shares, destination)
+    size = chunk_size(prime_number)
+    width = (prime_number.bit_length() + 7) // 8
+    tasks = _share_blocks(streams, width * chunks_per_batch, x_shares, prime_number)
+    total = 0
+    last_chunk = b""
+    with ExitStack() as stack:
+        executor = stack.enter_context(process_executor(workers)) if workers else None
+        for chunks in ordered_map(_recover_batch, tasks, executor, 2 * workers if workers else None):
+            data = last_chunk + chunks
+            destination.write(data[:-size])
+            total += len(data) - size
+            last_chunk = data[-size:]
+    if not last_chunk:
+        raise ValueError("The share streams do not have any value")
+    data = last_chunk.rstrip(b"\x00")
+    if not data.endswith(_PADDING):
+        raise ValueError("The secret could not be recovered, the padding is not valid")
+    destination.write(data[:-1])
+    return total + len(data) - 1
+
+def split_bytes(secret, n_parts, k_parts, prime_number=Shamir._PRIME, engine=ENGINE_PRIME):
+    # split_bytes function used to share a byte string secret.
+    # Params:
+        # secret        -> a bytes value with the secret
+        # n_parts       -> an integer value with the number of shares
+        # k_parts       -> an integer value with the minimum shares to recover the secret
+        # prime_number  -> an integer value with the prime number used for every chunk
+        # engine        -> a string value with the engine used, ENGINE_PRIME or ENGINE_GF256
+    # Returns:
+        # list  -> a bytes value for every share
+    share_streams = [BytesIO() for _ in range(n_parts)]
+    split_stream(BytesIO(secret), share_streams, k_parts, prime_number, engine=engine)
+    return [stream.getvalue() for stream in share_streams]
+
+def recover_bytes(shares):
+    # recover_bytes function used to recover a byte string secret from its shares.
+    # Params:
+        # shares    -> a list with the bytes value of at least k shares
+    # Returns:
+        # bytes -> the secret
+    destination = BytesIO()
+    recover_stream([BytesIO(share) for share in shares], destination)
+    return destination.getvalue()
+
+def split_file(secret_path, share_paths, k_parts, prime_number=Shamir._PRIME, engine=ENGINE_PRIME, workers=None):
+    # split_file function used to share the content of a file into n share files.
+    # Params:
+        # secret_path   -> a string value with the path of the secret file
+        # share_paths   -> a list with the paths of the n share files that will be written
+        # k_parts       -> an integer value with the minimum shares to recover the secret
+        # prime_number  -> an integer value with the prime number used for every chunk
+        # engine        -> a string value with the engine used, ENGINE_PRIME or ENGINE_GF256
+        # workers       -> an integer value with the number of worker processes, by default the current process
+    # Returns:
+        # integer -> the number of bytes of the secret
+    with ExitStack() as stack:
+        source = stack.enter_context(open(secret_path, "rb"))
+        share_streams = [stack.enter_context(open(path, "wb")) for path in share_paths]
+        return split_stream(source, share_streams, k_parts, prime_number, engine=engine, workers=workers)
+
+def recover_file(share_paths, secret_path, workers=None):
+    # recover_file function used to recover a secret file from the share files.
+    # Params:
+        # share_paths   -> a list with the paths of at least k share files
+        # secret_path   -> a string value with the path where the secret will be written
+        # workers       -> an integer value with the number of worker processes, by default the current process
+    # Returns:
+        # integer -> the number of bytes of the secret
+    with ExitStack() as stack:
+        share_streams = [stack.enter_context(open(path, "rb")) for path in share_paths]
+        destination = stack.enter_context(open(secret_path, "wb"))
+        return recover_stream(share_streams, destination, workers=workers)
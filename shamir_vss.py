@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# Verifiable secret sharing with Feldman and Pedersen commitments.
+# The dealer publishes a commitment g^a_j (mod P) of every coefficient of the polynomial, where g generates a subgroup of
+# prime order q of the integers modulo the prime P and q is the prime number of the shares. A share (x, y) is valid when
+# g^y = C_0 * C_1^x * ... * C_(k-1)^(x^(k-1)) (mod P), so every share can be checked on its own without recovering the
+# secret. The Feldman commitment C_0 = g^secret is public: recovering the secret from it is a discrete logarithm only
+# when the secret is a uniformly random value of the field (a key). A low entropy secret (a PIN, a password, a small
+# number) is found offline by computing g^guess for every candidate, so the Feldman commitments only hide high entropy
+# secrets.
+# The Pedersen commitments g^a_j * h^b_j add a random blinding polynomial b with a second generator h whose discrete
+# logarithm to the base g is unknown (it is derived from a hash of the group), so the commitments do not reveal
+# anything about any secret. Every holder keeps the blinding value z = b(x) with its share, (x, y, z) is valid when
+# g^y * h^z = C_0 * C_1^x * ... * C_(k-1)^(x^(k-1)) (mod P), and the secret is recovered from the (x, y) values as usual.
+# Many shares are verified together with a random linear combination of the share equations, that is a single
+# exponentiation of g (and h) and a multi-exponentiation of the k commitments instead of an exponentiation per share.
+
+# The program requires the next packages:
+    # functools     -> lru_cache keeps the groups of the field primes
+    # hashlib       -> sha256 derives the second generator of the Pedersen groups
+    # collections   -> namedtuple is used for the Pedersen shares
+    # shamir        -> shamir algorithm, the primality test, the arithmetic backend and the coefficient source.
+from functools import lru_cache
+from hashlib import sha256
+from collections import namedtuple
+import shamir_secret_sharing
+from shamir_secret_sharing import Shamir, PRIME_REGISTRY, COEFFICIENT_SOURCE, is_probable_prime, consecutive_evaluation
+
+DEFAULT_GROUP_BITS = 2048   # Minimum size of the group prime P
+_PEDERSEN_SEED = b"shamir_vss pedersen generator"   # Prefix of the hash that derives the second generator h
+_MULTI_EXPONENTIATION_WIDTH = 4   # Number of bases combined in the tables of the multi-exponentiation
+
+# Offset of the cofactor of the group prime P = 2 * r * q + 1 of the registered primes and the default prime with the
+# default group size, r = 2^(2048 - bits(q) - 1) + offset (or 1 + offset for the primes of 2048 bits or more). They
+# are the first primes of the search of feldman_group and save the search (several seconds for the largest primes).
+_GROUP_OFFSETS = {
+    PRIME_REGISTRY[61]: 1676,
+    PRIME_REGISTRY[64]: 2462,
+    PRIME_REGISTRY[89]: 1177,
+    PRIME_REGISTRY[107]: 367,
+    PRIME_REGISTRY[127]: 11,
+    PRIME_REGISTRY[128]: 912,
+    PRIME_REGISTRY[192]: 292,
+    PRIME_REGISTRY[255]: 215,
+    PRIME_REGISTRY[256]: 451,
+    PRIME_REGISTRY[384]: 299,
+    PRIME_REGISTRY[512]: 94,
+    PRIME_REGISTRY[521]: 674,
+    PRIME_REGISTRY[607]: 778,
+    PRIME_REGISTRY[768]: 63,
+    PRIME_REGISTRY[1024]: 1015,
+    PRIME_REGISTRY[1279]: 1291,
+    PRIME_REGISTRY[1536]: 97,
+    PRIME_REGISTRY[2048]: 148,
+    PRIME_REGISTRY[3072]: 318,
+    PRIME_REGISTRY[4096]: 4241,
+    Shamir._PRIME: 2014,
+}
+
+def multi_exponentiation(bases, exponents, modulus):
+    # multi_exponentiation function used to calculate the product of several powers with shared squarings.
+    # Params:
+        # bases     -> a list with the integer bases
+        # exponents -> a list with the non negative integer exponents, in the same order as the bases
+        # modulus   -> an integer value with the modulus
+    # Returns:
+        # integer -> the product of base^exponent for all the bases modulo the modulus
+    # Description:
+        # Straus method: the bases are combined in groups of _MULTI_EXPONENTIATION_WIDTH with a table of the products
+        # of every subset of the group, then the bits of the exponents are read together from the most significant one,
+        # so there is one squaring per bit for the whole group instead of one per bit and base.
+    modulus = shamir_secret_sharing.field_int(modulus)
+    result = 1
+    for start in range(0, len(bases), _MULTI_EXPONENTIATION_WIDTH):
+        group_bases = bases[start:start + _MULTI_EXPONENTIATION_WIDTH]
+        group_exponents = exponents[start:start + _MULTI_EXPONENTIATION_WIDTH]
+        table = [1] * (1 << len(group_bases))
+        for mask in range(1, len(table)):
+            lowest = mask & -mask
+            table[mask] = table[mask ^ lowest] * group_bases[lowest.bit_length() - 1] % modulus
+        accumulated = 1
+        for bit in range(max(exponent.bit_length() for exponent in group_exponents) - 1, -1, -1):
+            accumulated = accumulated * accumulated % modulus
+            mask = 0
+            for position, exponent in enumerate(group_exponents):
+                if exponent >> bit & 1:
+                    mask |= 1 << position
+            if mask:
+                accumulated = accumulated * table[mask] % modulus
+        result = result * accumulated % modulus
+    return int(result)
+
+class FeldmanGroup:
+    # FeldmanGroup class used to commit the polynomials of a field and to verify its shares.
+    #Variables:
+        # modulus   -> the prime number P of the group
+        # order     -> the prime number q of the subgroup, it is the prime number of the shares
+        # generator -> the generator g of the subgroup of order q
+    #Methods:
+        # commit            -> method that calculates the commitments of a polynomial
+        # verify_share      -> method that verifies a share with the commitments
+        # verify_shares     -> method that verifies many shares with a random linear combination
+        # invalid_shares    -> method that finds the positions of the invalid shares
+
+    def __init__(self, modulus, order, generator):
+        # FeldmanGroup constructor method use to set and validate the parameters of the group.
+        # Params:
+            # modulus   -> an integer value with the prime number P
+            # order     -> an integer value with the prime number q, it should divide P - 1
+            # generator -> an integer value with an element of order q
+        # Returns:
+            # -
+        if (modulus - 1) % order or not 1 < generator < modulus or pow(generator, order, modulus) != 1:
+            raise ValueError("The generator does not generate a subgroup of the given order")
+        self.modulus, self.order, self.generator = modulus, order, generator
+
+    def commit(self, polynomial):
+        # commit method use to calculate the commitments of the coefficients of a polynomial.
+        # Params:
+            # polynomial    -> a list with the coefficients, starting with the secret
+        # Returns:
+            # list  -> the commitment g^coefficient of every coefficient
+        modulus = shamir_secret_sharing.field_int(self.modulus)
+        return [int(shamir_secret_sharing.powmod(self.generator, coeff, modulus)) for coeff in polynomial]
+
+    def _share_commitment(self, x, commitments):
+        # _share_commitment method use to calculate the commitment of the value of a position.
+        # Params:
+            # x             -> an integer value with the position
+            # commitments   -> a list with the commitments of the polynomial
+        # Returns:
+            # integer -> the product of C_j^(x^j), calculated with the Horner method in the exponents
+        modulus = shamir_secret_sharing.field_int(self.modulus)
+        result = 1
+        for commitment in reversed(commitments):
+            result = shamir_secret_sharing.powmod(result, x, modulus) * commitment % modulus
+        return result
+
+    def verify_share(self, share, commitments):
+        # verify_share method use to verify a single share.
+        # Params:
+            # share         -> a (x, y) share
+            # commitments   -> a list with the commitments of the polynomial
+        # Returns:
+            # boolean -> True if the share is a point of the committed polynomial
+        x, y = share
+        modulus = shamir_secret_sharing.field_int(self.modulus)
+        return shamir_secret_sharing.powmod(self.generator, y % self.order, modulus) == self._share_commitment(x, commitments)
+
+    def verify_shares(self, shares, commitments):
+        # verify_shares method use to verify many shares with a single multi-exponentiation.
+        # Params:
+            # shares        -> a list with the (x, y) shares
+            # commitments   -> a list with the commitments of the polynomial
+        # Returns:
+            # boolean -> True if all the shares are valid, an invalid share is accepted with probability 1 / q
+        # Description:
+            # The equations g^y_i = prod C_j^(x_i^j) are raised to random factors r_i and multiplied, so the shares are
+            # valid if g^(sum r_i * y_i) = prod C_j^(sum r_i * x_i^j), the exponents are reduced modulo q.
+        if not shares:
+            return True
+        order, k_parts = self.order, len(commitments)
+        factors = COEFFICIENT_SOURCE.coefficients(len(shares), order)
+        value_exponent = 0
+        exponents = [0] * k_parts
+        for factor, (x, y) in zip(factors, shares):
+            value_exponent += factor * y
+            power = factor
+            for j in range(k_parts):
+                exponents[j] += power
+                power = power * x % order
+        exponents = [exponent % order for exponent in exponents]
+        modulus = shamir_secret_sharing.field_int(self.modulus)
+        left = shamir_secret_sharing.powmod(self.generator, value_exponent % order, modulus)
+        return left == multi_exponentiation(commitments, exponents, self.modulus)
+
+    def invalid_shares(self, shares, commitments):
+        # invalid_shares method use to find the invalid shares of a list.
+        # Params:
+            # shares        -> a list with the (x, y) shares
+            # commitments   -> a list with the commitments of the polynomial
+        # Returns:
+            # list  -> the indexes of the invalid shares in the list
+        # Description:
+            # The groups of shares that fail the batch verification are divided in halves, so a few invalid shares
+            # are found with a logarithmic number of batch verifications.
+        invalid = []
+        pending = [(0, len(shares))]
+        while pending:
+            start, end = pending.pop()
+            if end - start == 1:
+                if not self.verify_share(shares[start], commitments):
+                    invalid.append(start)
+            elif end > start and not self.verify_shares(shares[start:end], commitments):
+                middle = (start + end) // 2
+                pending.extend(((middle, end), (start, middle)))
+        return invalid
+
+@lru_cache(maxsize=None)
+def feldman_group(order, group_bits=DEFAULT_GROUP_BITS):
+    # feldman_group function used to get the commitment group of a field prime.
+    # Params:
+        # order         -> an integer value with the prime number of the shares
+        # group_bits    -> an integer value with the minimum bit size of the group prime P
+    # Returns:
+        # FeldmanGroup -> the group with P = 2 * r * q + 1 and the generator 2^(2r) (or the next base that is not 1)
+    # Description:
+        # The cofactor r is searched from 2^(group_bits - bits(q) - 1), so the result is always the same group for the
+        # same prime. The offsets of the known primes are taken from _GROUP_OFFSETS.
+    cofactor = 1 << max(group_bits - order.bit_length() - 1, 0)
+    if group_bits == DEFAULT_GROUP_BITS and order in _GROUP_OFFSETS:
+        cofactor += _GROUP_OFFSETS[order]
+    else:
+        while not is_probable_prime(2 * cofactor * order + 1):
+            cofactor += 1
+    modulus = 2 * cofactor * order + 1
+    base = 2
+    while pow(base, 2 * cofactor, modulus) == 1:
+        base += 1
+    return FeldmanGroup(modulus, order, pow(base, 2 * cofactor, modulus))
+
+# Share of a Pedersen verifiable secret sharing, the blinding value is only needed to verify the share.
+PedersenShare = namedtuple("PedersenShare", ["x", "y", "blinding"])
+
+class PedersenGroup(FeldmanGroup):
+    # PedersenGroup class used to commit the polynomials of a field with hiding commitments and to verify its shares.
+    #Variables:
+        # modulus               -> the prime number P of the group
+        # order                 -> the prime number q of the subgroup, it is the prime number of the shares
+        # generator             -> the generator g of the subgroup of order q
+        # blinding_generator    -> the generator h of the subgroup, its discrete logarithm to the base g is unknown
+    #Methods:
+        # commit            -> method that calculates the commitments of a polynomial and its blinding polynomial
+        # share             -> method that shares a secret and commits the polynomials
+        # verify_share      -> method that verifies a (x, y, blinding) share with the commitments
+        # verify_shares     -> method that verifies many shares with a random linear combination
+        # invalid_shares    -> method that finds the positions of the invalid shares (see FeldmanGroup)
+
+    def __init__(self, modulus, order, generator, blinding_generator):
+        # PedersenGroup constructor method use to set and validate the parameters of the group.
+        # Params:
+            # modulus               -> an integer value with the prime number P
+            # order                 -> an integer value with the prime number q, it should divide P - 1
+            # generator             -> an integer value with an element of order q
+            # blinding_generator    -> an integer value with another element of order q
+        # Returns:
+            # -
+        super().__init__(modulus, order, generator)
+        if blinding_generator == generator or not 1 < blinding_generator < modulus or pow(blinding_generator, order, modulus) != 1:
+            raise ValueError("The blinding generator does not generate a subgroup of the given order")
+        self.blinding_generator = blinding_generator
+
+    def commit(self, polynomial, blinding):
+        # commit method use to calculate the commitments of the coefficients of a polynomial.
+        # Params:
+            # polynomial    -> a list with the coefficients, starting with the secret
+            # blinding      -> a list with the coefficients of the blinding polynomial, of the same size
+        # Returns:
+            # list  -> the commitment g^coefficient * h^blinding of every coefficient
+        return [multi_exponentiation([self.generator, self.blinding_generator], [coeff, blind], self.modulus)
+                for coeff, blind in zip(polynomial, blinding)]
+
+    def share(self, secret, n_parts, k_parts):
+        # share method use to share a secret with the commitments of its polynomials.
+        # Params:
+            # secret    -> an integer value with the secret, smaller than the order of the group
+            # n_parts   -> an integer value with the number of shares
+            # k_parts   -> an integer value with the minimum shares to recover the secret
+        # Returns:
+            # tuple -> a list with the PedersenShare of the positions 1 to n_parts and the list of commitments
+        # Description:
+            # The parameters are validated as in Shamir.split_many. The blinding polynomial has random coefficients,
+            # the independent term included, so the commitment of the secret is a random element of the group.
+        Shamir().split_many([secret], n_parts, k_parts, self.order)   # Validation of the secret and the parts
+        polynomial = [secret] + COEFFICIENT_SOURCE.coefficients(k_parts - 1, self.order)
+        blinding = COEFFICIENT_SOURCE.coefficients(k_parts, self.order)
+        values = consecutive_evaluation(polynomial, n_parts, self.order)
+        blinding_values = consecutive_evaluation(blinding, n_parts, self.order)
+        shares = [PedersenShare(x, y, z) for x, y, z in zip(range(1, n_parts + 1), values, blinding_values)]
+        return shares, self.commit(polynomial, blinding)
+
+    def verify_share(self, share, commitments):
+        # verify_share method use to verify a single share.
+        # Params:
+            # share         -> a (x, y, blinding) share
+            # commitments   -> a list with the commitments of the polynomial
+        # Returns:
+            # boolean -> True if the share is a point of the committed polynomials
+        x, y, blinding = share
+        exponents = [y % self.order, blinding % self.order]
+        left = multi_exponentiation([self.generator, self.blinding_generator], exponents, self.modulus)
+        return left == self._share_commitment(x, commitments)
+
+    def verify_shares(self, shares, commitments):
+        # verify_shares method use to verify many shares with a single multi-exponentiation.
+        # Params:
+            # shares        -> a list with the (x, y, blinding) shares
+            # commitments   -> a list with the commitments of the polynomial
+        # Returns:
+            # boolean -> True if all the shares are valid, an invalid share is accepted with probability 1 / q
+        # Description:
+            # As in FeldmanGroup.verify_shares, the shares are valid if
+            # g^(sum r_i * y_i) * h^(sum r_i * z_i) = prod C_j^(sum r_i * x_i^j).
+        if not shares:
+            return True
+        order, k_parts = self.order, len(commitments)
+        factors = COEFFICIENT_SOURCE.coefficients(len(shares), order)
+        value_exponent = blinding_exponent = 0
+        exponents = [0] * k_parts
+        for factor, (x, y, blinding) in zip(factors, shares):
+            value_exponent += factor * y
+            blinding_exponent += factor * blinding
+            power = factor
+            for j in range(k_parts):
+                exponents[j] += power
+                power = power * x % order
+        exponents = [exponent % order for exponent in exponents]
+        left = multi_exponentiation([self.generator, self.blinding_generator], [value_exponent % order, blinding_exponent % order], self.modulus)
+        return left == multi_exponentiation(commitments, exponents, self.modulus)
+
+@lru_cache(maxsize=None)
+def pedersen_group(order, group_bits=DEFAULT_GROUP_BITS):
+    # pedersen_group function used to get the hiding commitment group of a field prime.
+    # Params:
+        # order         -> an integer value with the prime number of the shares
+        # group_bits    -> an integer value with the minimum bit size of the group prime P
+    # Returns:
+        # PedersenGroup -> the group of feldman_group with the second generator h
+    # Description:
+        # h = t^((P - 1) / q) where t is the sha256 expansion of the seed and the group prime, so anybody can derive the
+        # same h and nobody knows its discrete logarithm to the base g.
+    group = feldman_group(order, group_bits)
+    modulus = group.modulus
+    width = (modulus.bit_length() + 7) // 8 + 16
+    counter = 0
+    while True:
+        seed = _PEDERSEN_SEED + modulus.to_bytes(width - 16) + counter.to_bytes(4)
+        digest = b"".join(sha256(seed + block.to_bytes(4)).digest() for block in range((width + 31) // 32))
+        blinding_generator = pow(int.from_bytes(digest[:width]) % modulus, (modulus - 1) // order, modulus)
+        if blinding_generator not in (0, 1, group.generator):
+            return PedersenGroup(modulus, order, group.generator, blinding_generator)
+        counter += 1
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Background execution of the Shamir operations for the graphical interface.
+# A BackgroundTask runs an operation in a worker thread and sends its progress and partial results as events through a
+# queue, so the interface only reads the queue from its own event loop (tkinter is not thread-safe) and never waits
+# for the calculation. The task can be cancelled, the operation stops the next time it reports its progress.
+
+# The events of the queue are tuples with the kind and the values:
+    # ("progress", done, total) -> the operation has calculated done of total steps
+    # ("prime", prime_number)   -> the prime number selected for the shares
+    # ("shares", shares)        -> a batch of new shares of the secret sharing operation
+    # ("result", value)         -> the operation finished with the value
+    # ("error", exception)      -> the operation failed with the exception
+    # ("cancelled",)            -> the operation was cancelled
+
+# The program requires the next packages:
+    # threading -> the operations run in a daemon thread and the cancellation is an Event
+    # queue     -> the events are sent to the interface through a thread-safe queue
+    # itertools -> islice divides the generated shares in batches
+    # shamir    -> shamir algorithm that calculates the share secret and recovers the secret from the points given.
+from threading import Thread, Event
+from queue import SimpleQueue, Empty
+from itertools import islice
+from shamir_secret_sharing import Shamir, ReconstructionContext
+
+SHARES_PER_EVENT = 100   # Number of shares sent in every shares event
+
+class Cancelled(Exception):
+    # Cancelled exception raised inside an operation when its task is cancelled.
+    pass
+
+class BackgroundTask:
+    # BackgroundTask class used to run an operation in a worker thread.
+    #Variables:
+        # events    -> the queue with the events of the operation
+    #Methods:
+        # start     -> method that starts the worker thread
+        # cancel    -> method that asks the operation to stop
+        # cancelled -> method that indicates if the task was cancelled
+        # done      -> method that indicates if the operation has finished
+        # join      -> method that waits until the operation has finished
+        # report    -> method used by the operation to send an event, it raises Cancelled if the task was cancelled
+        # poll      -> method used by the interface to read the pending events
+
+    def __init__(self, operation, *args):
+        # BackgroundTask constructor method use to set the operation of the task.
+        # Params:
+            # operation -> a function that receives the task and the arguments, it reports its events with task.report
+            #              and its return value is sent as the result event
+            # args      -> the arguments of the operation
+        # Returns:
+            # -
+        self.events = SimpleQueue()
+        self._cancel = Event()
+        self._thread = Thread(target=self._run, args=(operation, args), daemon=True)
+
+    def _run(self, operation, args):
+        # _run method use to run the operation in the worker thread and send its last event.
+        try:
+            self.events.put(("result", operation(self, *args)))
+        except Cancelled:
+            self.events.put(("cancelled",))
+        except Exception as error:
+            self.events.put(("error", error))
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def join(self, timeout=None):
+        # join method use to wait for the operation, the interface should poll the events instead of waiting.
+        # Params:
+            # timeout   -> a number with the maximum seconds to wait, by default it waits until the operation finishes
+        # Returns:
+            # boolean -> True if the operation has finished
+        self._thread.join(timeout)
+        return self.done()
+
+    def report(self, kind, *values):
+        # report method use to send an event of the operation.
+        # Params:
+            # kind      -> a string value with the kind of the event
+            # values    -> the values of the event
+        # Returns:
+            # -
+        # Description:
+            # The operations call this method regularly, so it is the point where a cancelled operation stops.
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.events.put((kind,) + values)
+
+    def poll(self, limit=None):
+        # poll method use to read the pending events without waiting.
+        # Params:
+            # limit -> an integer value with the maximum number of events, by default all the pending events
+        # Returns:
+            # list  -> the events in the order they were sent
+        events = []
+        while limit is None or len(events) < limit:
+            try:
+                events.append(self.events.get_nowait())
+            except Empty:
+                break
+        return events
+
+def split_secret(task, secret, n_parts, k_parts):
+    # split_secret function used as the operation that shares a secret.
+    # Params:
+        # task      -> the BackgroundTask of the operation
+        # secret    -> a string value with the secret number
+        # n_parts   -> a string value with the number of shares
+        # k_parts   -> a string value with the minimum shares to recover the secret
+    # Returns:
+        # integer -> the prime number of the shares
+    # Description:
+        # The prime number and the polynomial are calculated first, then the shares are generated lazily and sent in
+        # batches of SHARES_PER_EVENT, so the interface shows them while the next ones are calculated.
+    shamir_instance = Shamir()
+    shamir_instance.get_values(secret, n_parts, k_parts, points=False)
+    task.report("prime", shamir_instance.prime_number)
+    points = shamir_instance.iter_points()
+    done = 0
+    while True:
+        batch = list(islice(points, SHARES_PER_EVENT))
+        if not batch:
+            return shamir_instance.prime_number
+        done += len(batch)
+        task.report("shares", batch)
+        task.report("progress", done, shamir_instance.n_parts)
+
+def recover_secret(task, points, prime_number):
+    # recover_secret function used as the operation that recovers a secret.
+    # Params:
+        # task          -> the BackgroundTask of the operation
+        # points        -> a list with the (x, y) shares
+        # prime_number  -> an integer value with the prime number of the shares
+    # Returns:
+        # integer -> the secret
+    # Description:
+        # The lagrange basis is the longest part for many shares, its progress is checked after every denominator
+        # (so a cancelled recovery stops without finishing the basis) and reported for every percent.
+    x_shares, y_shares = zip(*sorted(points))
+    def progress(done, total):
+        if task.cancelled():
+            raise Cancelled()
+        if done * 100 // total != (done - 1) * 100 // total:
+            task.report("progress", done, total)
+    context = ReconstructionContext(x_shares, prime_number, progress)
+    return context.reconstruct(y_shares)
@@ -4,8 +4,32 @@
 # The unittest package is used to performed the test on the Shamir class and its different methods.
 import unittest
 import time
+import threading
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import os
+import tempfile
 from random import sample
-from shamir_secret_sharing import Shamir
+from itertools import islice
+from io import BytesIO
+from shamir_stream import split_bytes, recover_bytes, split_file, recover_file, chunk_size, ENGINE_GF256, split_stream, recover_stream
+import shamir_gf256
+import shamir_parallel
+import shamir_cli
+import shamir_worker
+import subprocess
+from shamir_share_file import write_shares, read_shares, ShareFile
+from shamir_share_set import ShareSet
+import json
+import benchmark_shamir
+import asyncio
+from shamir_profile import Profiler
+from shamir_refresh import refresh, refresh_many, reshare, reshare_many
+from shamir_robust import interpolate, robust_reconstruct
+from shamir_vss import FeldmanGroup, feldman_group, multi_exponentiation, PedersenGroup, pedersen_group
+from shamir_recovery import RecoverySession, RecoveryServer, submit_shares, ACCEPTED, DUPLICATE, COMPLETE
+import shamir_secret_sharing
+from shamir_secret_sharing import Shamir, Share, is_probable_prime, random_prime, field_prime, search_prime, select_field_prime, PRIME_REGISTRY, registered_prime, field_reducer, horner_evaluation, consecutive_evaluation, np, gmpy2, use_backend, BACKEND_GMPY2, BACKEND_PYTHON, reconstruction_context, batch_inverse, lagrange_weights, CoefficientSource
 
 class TestShamir(unittest.TestCase):
 
@@ -136,5 +160,1005 @@ class TestShamir(unittest.TestCase):
         time.sleep(2)
         self.assertTrue(result)
 
+class TestPrimality(unittest.TestCase):
+
+    def test_known_primes(self):
+        """
+        Test of the Baillie-PSW test with small and large known primes
+        """
+        for p in [2, 3, 5, 7919, 2**31 - 1, 2**127 - 1, 2**521 - 1, 2**3072 + 813, Shamir._PRIME]:
+            self.assertTrue(is_probable_prime(p))
+
+    def test_known_composites(self):
+        """
+        Test of the Baillie-PSW test with Carmichael numbers and strong pseudoprimes to several bases
+        """
+        for c in [0, 1, 4, 561, 41041, 2047, 3215031751, 3825123056546413051, (2**127 - 1) * (2**89 - 1)]:
+            self.assertFalse(is_probable_prime(c))
+
+    def test_random_prime_bit_length(self):
+        """
+        Test of the prime generator returning primes with the exact bit length
+        """
+        for bits in [8, 16, 40, 256, 512]:
+            p = random_prime(bits)
+            self.assertEqual(p.bit_length(), bits)
+            self.assertTrue(is_probable_prime(p))
+
+    def test_field_prime_cache(self):
+        """
+        Test of the field prime cache reusing the same prime for a bit size
+        """
+        self.assertEqual(field_prime(256), field_prime(256))
+        shamir_instance = Shamir()
+        self.assertEqual(select_field_prime(65, Shamir._PRIME, registry=False).prime, field_prime(40))
+        shamir_instance.get_values('65','4','2')
+        self.assertEqual(shamir_instance.reconstruct_secret_shamir(sample(shamir_instance.points,2), shamir_instance.prime_number), 65)
+
+    def test_smallest_field_selection(self):
+        """
+        Test of the field size following the bit length of the secret instead of the 4096 bits prime
+        """
+        for secret, bits in [(1, 40), (2**40, 48), (2**100 + 7, 104), (2**1000, 1008)]:
+            search = select_field_prime(secret, Shamir._PRIME, registry=False)
+            self.assertEqual(search.bits, bits)
+            self.assertIn(search.source, ("search", "cache"))
+        shamir_instance = Shamir()
+        for secret, bits in [(1, 61), (2**61, 64), (2**100 + 7, 107), (2**1000, 1024), (2**4095, 4096)]:
+            shamir_instance.get_values(str(secret), '5', '3')
+            self.assertEqual(shamir_instance.prime_number, PRIME_REGISTRY[bits])
+            self.assertEqual(shamir_instance.prime_search.source, "registry")
+            self.assertEqual(shamir_instance.reconstruct_secret_shamir(sample(shamir_instance.points, 3), shamir_instance.prime_number), secret)
+        shamir_instance.get_values(str(2**4096 - 1000), '5', '3')
+        self.assertEqual(shamir_instance.prime_search.source, "large_prime")
+        self.assertEqual(shamir_instance.prime_number, Shamir._PRIME)
+        with self.assertRaises(ValueError):
+            shamir_instance.get_values(str(Shamir._PRIME), '5', '3')
+
+    def test_prime_search_time_budget(self):
+        """
+        Test of the prime search reporting its time and falling back to the large prime when the budget is exceeded
+        """
+        search = search_prime(128)
+        self.assertEqual(search.prime.bit_length(), 128)
+        self.assertGreaterEqual(search.candidates, 1)
+        self.assertGreaterEqual(search.elapsed, 0)
+        search = search_prime(1100)   # The window is sieved with the primes up to 18906
+        self.assertEqual(search.prime.bit_length(), 1100)
+        self.assertTrue(is_probable_prime(search.prime))
+        with self.assertRaises(TimeoutError):
+            search_prime(4000, time_budget=0)
+        self.assertEqual(select_field_prime(2**3990, Shamir._PRIME, time_budget=0, registry=False).source, "large_prime")
+
+    def test_prime_registry(self):
+        """
+        Test of the registered primes and of the reduction without division for the pseudo-Mersenne primes
+        """
+        for bits, prime_number in PRIME_REGISTRY.items():
+            self.assertEqual(prime_number.bit_length(), bits)
+            self.assertTrue(is_probable_prime(prime_number))
+        self.assertEqual(registered_prime(2**127 - 2), 2**127 - 1)
+        self.assertEqual(registered_prime(2**127 - 1), 2**128 - 159)
+        self.assertEqual(registered_prime(5, min_bits=100), 2**107 - 1)
+        self.assertIsNone(registered_prime(2**4096))
+        for prime_number in [PRIME_REGISTRY[521], PRIME_REGISTRY[4096], Shamir._PRIME]:
+            reduce = field_reducer(prime_number)
+            for value in [0, 1, prime_number - 1, prime_number, prime_number**2 - 1, 123 * prime_number**3 + 45, -7]:
+                self.assertEqual(reduce(value), value % prime_number)
+        self.assertEqual(field_reducer.cache_info().maxsize, shamir_secret_sharing._REDUCER_CACHE_SIZE)
+
+class TestSplitMany(unittest.TestCase):
+
+    def test_split_many_big_prime(self):
+        """
+        Test of the batch split with the default prime and recovering every secret
+        """
+        shamir_instance = Shamir()
+        secrets = [0, 65, 9876543211234561231313123789, 2**4000]
+        shares = shamir_instance.split_many(secrets, 5, 3)
+        self.assertEqual(len(shares), len(secrets))
+        for secret, points in zip(secrets, shares):
+            self.assertEqual([x for x, _ in points], [1, 2, 3, 4, 5])
+            self.assertEqual(shamir_instance.reconstruct_secret_shamir(sample(points, 3), Shamir._PRIME), secret)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_split_many_word_prime(self):
+        """
+        Test of the batch split with a word sized prime evaluated with the Vandermonde matrix
+        """
+        shamir_instance = Shamir()
+        prime_number = 2**31 - 1
+        shares = shamir_instance.split_many(range(200), 7, 4, prime_number)
+        for secret, points in enumerate(shares):
+            self.assertEqual(shamir_instance.reconstruct_secret_shamir(sample(points, 4), prime_number), secret)
+
+    def test_split_many_invalid_values(self):
+        """
+        Test of the batch split rejecting secrets outside of the field and invalid parts
+        """
+        shamir_instance = Shamir()
+        self.assertRaises(ValueError, shamir_instance.split_many, [2**31], 4, 2, 2**31 - 1)
+        self.assertRaises(ArithmeticError, shamir_instance.split_many, [65], 4, 5, 2**31 - 1)
+        self.assertRaises(TypeError, shamir_instance.split_many, ['65'], 4, 2, 2**31 - 1)
+
+class TestConsecutiveEvaluation(unittest.TestCase):
+
+    def test_consecutive_evaluation(self):
+        """
+        Test of the forward differences evaluation against the Horner method for different degrees and share counts
+        """
+        for prime_number in [PRIME_REGISTRY[61], Shamir._PRIME]:
+            for k_parts, n_parts in [(1, 5), (2, 1), (2, 50), (5, 10), (5, 11), (20, 300)]:
+                polynomial = [prime_number - 1 - coeff for coeff in range(k_parts)]
+                self.assertEqual(list(consecutive_evaluation(polynomial, n_parts, prime_number)),
+                                 [horner_evaluation(polynomial, x, prime_number) for x in range(1, n_parts + 1)])
+
+    def test_iter_points_lazy(self):
+        """
+        Test of the lazy generation of the points of a million shares
+        """
+        shamir_instance = Shamir()
+        shamir_instance.get_values('123456789', '5', '3')
+        shamir_instance.n_parts = 10**6
+        points = list(islice(shamir_instance.iter_points(), 1000))
+        self.assertEqual(len(shamir_instance.points), 5)
+        self.assertEqual(points[:5], shamir_instance.points)
+        self.assertEqual(points[999], (1000, horner_evaluation(shamir_instance.polynomial, 1000, shamir_instance.prime_number)))
+        self.assertEqual(shamir_instance.reconstruct_secret_shamir(points[-3:], shamir_instance.prime_number), 123456789)
+
+class TestReconstructionContext(unittest.TestCase):
+
+    def test_reconstruct_many(self):
+        """
+        Test of the bulk recovery of secrets shared with the same positions
+        """
+        shamir_instance = Shamir()
+        secrets = list(range(1000, 1050))
+        shares = shamir_instance.split_many(secrets, 6, 3)
+        recovered = shamir_instance.reconstruct_many([[points[4], points[1], points[2]] for points in shares], Shamir._PRIME)
+        self.assertEqual(recovered, secrets)
+
+    def test_context_cache(self):
+        """
+        Test of the reconstruction context being reused for the same positions in any order
+        """
+        shamir_instance = Shamir()
+        prime_number = field_prime(128)
+        shares = shamir_instance.split_many([11, 22], 5, 3, prime_number)
+        hits = reconstruction_context.cache_info().hits
+        self.assertEqual(shamir_instance.reconstruct_secret_shamir([shares[0][0], shares[0][2], shares[0][4]], prime_number), 11)
+        self.assertEqual(shamir_instance.reconstruct_secret_shamir([shares[1][4], shares[1][0], shares[1][2]], prime_number), 22)
+        self.assertEqual(reconstruction_context.cache_info().hits, hits + 1)
+
+    def test_repeated_positions(self):
+        """
+        Test of the recovery rejecting points with repeated positions
+        """
+        shamir_instance = Shamir()
+        self.assertRaises(ValueError, shamir_instance.reconstruct_secret_shamir, [(1, 5), (1, 7)], 2**31 - 1)
+
+    def test_batch_inverse(self):
+        """
+        Test of the batch inversion against the modular inverse of every value
+        """
+        values = [3, 5, 7, 2**100, Shamir._PRIME - 1]
+        self.assertEqual(batch_inverse(values, Shamir._PRIME), [pow(value, -1, Shamir._PRIME) for value in values])
+
+    def test_lagrange_weights(self):
+        """
+        Test of the batch lagrange basis against the basis calculated for every position
+        """
+        shamir_instance = Shamir()
+        x_shares = [2, 5, 9, 11, 12]
+        self.assertEqual(lagrange_weights(x_shares, Shamir._PRIME),
+                         [shamir_instance.lagrange_basis_calculation(x_shares, position, Shamir._PRIME) for position in range(len(x_shares))])
+
+class TestStream(unittest.TestCase):
+
+    def test_split_bytes(self):
+        """
+        Test of sharing byte strings of different sizes around the chunk size and recovering them
+        """
+        prime_number = field_prime(128)
+        size = chunk_size(prime_number)
+        for length in [0, 1, size - 1, size, size + 1, 300 * size + 7]:
+            secret = os.urandom(length)
+            shares = split_bytes(secret, 5, 3, prime_number)
+            self.assertEqual(recover_bytes(sample(shares, 3)), secret)
+
+    def test_split_file(self):
+        """
+        Test of sharing a file into share files and recovering it with the default prime
+        """
+        secret = os.urandom(5000)
+        with tempfile.TemporaryDirectory() as directory:
+            secret_path = os.path.join(directory, "secret.bin")
+            share_paths = [os.path.join(directory, "share{}.bin".format(x)) for x in range(1, 5)]
+            with open(secret_path, "wb") as file:
+                file.write(secret)
+            self.assertEqual(split_file(secret_path, share_paths, 2), len(secret))
+            recovered_path = os.path.join(directory, "recovered.bin")
+            self.assertEqual(recover_file(share_paths[2:], recovered_path), len(secret))
+            with open(recovered_path, "rb") as file:
+                self.assertEqual(file.read(), secret)
+
+    def test_recover_bytes_invalid_shares(self):
+        """
+        Test of the recovery rejecting too few shares and shares with different primes
+        """
+        shares = split_bytes(b"secret", 4, 3, field_prime(128))
+        self.assertRaises(ValueError, recover_bytes, shares[:2])
+        other_shares = split_bytes(b"secret", 4, 3, field_prime(256))
+        self.assertRaises(ValueError, recover_bytes, shares[:2] + other_shares[:1])
+
+class TestGF256(unittest.TestCase):
+
+    def test_field_inverse(self):
+        """
+        Test of the GF(2^8) tables giving the inverse of every element
+        """
+        for a in range(1, 256):
+            self.assertEqual(shamir_gf256.gf_mul(a, shamir_gf256.gf_inverse(a)), 1)
+
+    def test_split_bytes_gf256(self):
+        """
+        Test of the GF(2^8) shares having the size of the secret and recovering it with any k shares
+        """
+        secret = os.urandom(1000)
+        shares = shamir_gf256.split_bytes(secret, 7, 4)
+        self.assertTrue(all(len(share) == len(secret) for _, share in shares))
+        self.assertEqual(shamir_gf256.recover_bytes(sample(shares, 4)), secret)
+        self.assertNotEqual(shamir_gf256.recover_bytes(sample(shares, 3)), secret)
+
+    def test_stream_engine_gf256(self):
+        """
+        Test of selecting the GF(2^8) engine for the streaming split and recovery
+        """
+        secret = os.urandom(100000)
+        shares = split_bytes(secret, 5, 3, engine=ENGINE_GF256)
+        self.assertEqual(recover_bytes(sample(shares, 3)), secret)
+
+    def test_stream_gf256_validation(self):
+        """
+        Test of the GF(2^8) streaming split validating the parts before writing the headers
+        """
+        for secret, k_parts, n_parts in ((b"", 5, 3), (b"secret", 5, 3), (b"secret", 1, 3), (b"secret", 2, 256)):
+            share_streams = [BytesIO() for _ in range(n_parts)]
+            with self.assertRaises((ArithmeticError, ValueError)):
+                split_stream(BytesIO(secret), share_streams, k_parts, engine=ENGINE_GF256)
+            self.assertTrue(all(stream.getvalue() == b"" for stream in share_streams))
+
+class TestParallel(unittest.TestCase):
+
+    def test_parallel_split_reconstruct(self):
+        """
+        Test of sharing and recovering a batch of secrets with worker processes keeping the order
+        """
+        secrets = list(range(2000, 2300))
+        shares = shamir_parallel.split_many(secrets, 5, 3, workers=2, chunk_size=64)
+        self.assertEqual(len(shares), len(secrets))
+        recovered = shamir_parallel.reconstruct_many(([points[3], points[0], points[4]] for points in shares), Shamir._PRIME, workers=2, chunk_size=64)
+        self.assertEqual(recovered, secrets)
+
+    def test_parallel_stream(self):
+        """
+        Test of sharing and recovering a large payload with the batches in worker processes
+        """
+        secret = os.urandom(200000)
+        share_streams = [BytesIO() for _ in range(4)]
+        self.assertEqual(split_stream(BytesIO(secret), share_streams, 3, chunks_per_batch=32, workers=2), len(secret))
+        destination = BytesIO()
+        recover_stream([BytesIO(stream.getvalue()) for stream in share_streams[1:]], destination, chunks_per_batch=32, workers=2)
+        self.assertEqual(destination.getvalue(), secret)
+
+    def test_parallel_shares_and_errors(self):
+        """
+        Test of the parallel shares being Share points and the errors of the invalid secrets
+        """
+        prime_number = 2**127 - 1
+        shares = shamir_parallel.split_many([5, 6], 3, 2, prime_number, workers=2)
+        self.assertEqual(shares[0][2].x, 3)
+        self.assertTrue(all(isinstance(point, Share) for points in shares for point in points))
+        self.assertEqual(Shamir().reconstruct_many([points[1:] for points in shares], prime_number), [5, 6])
+        self.assertRaises(ValueError, shamir_parallel.split_many, [1, -1], 3, 2, prime_number, workers=2)
+        self.assertRaises(ValueError, shamir_parallel.split_many, [2**128], 3, 2, prime_number, workers=2)
+        self.assertRaises(TypeError, shamir_parallel.split_many, ['x'], 3, 2, prime_number, workers=2)
+
+    def test_parallel_fresh_coefficients(self):
+        """
+        Test of the workers using different coefficients after the parent process has buffered random bytes
+        """
+        prime_number = 2**127 - 1
+        shamir_secret_sharing.COEFFICIENT_SOURCE.coefficients(1, prime_number)   # The parent buffer is not empty
+        shares = shamir_parallel.split_many([0] * 8, 3, 2, prime_number, workers=4, chunk_size=1)
+        self.assertEqual(len({point.y for points in shares for point in points}), 8 * 3)
+        shamir_secret_sharing.COEFFICIENT_SOURCE.coefficients(1, prime_number)
+        share_streams = [BytesIO() for _ in range(3)]
+        split_stream(BytesIO(bytes(15 * 8)), share_streams, 2, prime_number, chunks_per_batch=1, workers=4)
+        values = share_streams[0].getvalue()[11 + 16:]
+        self.assertEqual(len({values[start:start + 16] for start in range(0, len(values), 16)}), 9)   # 8 chunks and the padding
+
+class TestConcurrency(unittest.TestCase):
+
+    def test_concurrent_split_recover(self):
+        """
+        Test of many threads sharing and recovering different secrets with different primes at the same time
+        """
+        def split_and_recover(secret):
+            shamir_instance = Shamir()
+            large_prime = 2**3072 + 813 if secret % 2 else Shamir._PRIME
+            shamir_instance.get_values(str(secret), '6', '3', large_prime)
+            time.sleep(0)   # Gives the other threads the chance to run between the split and the recovery
+            recovered = shamir_instance.reconstruct_secret_shamir(sample(shamir_instance.points, 3), shamir_instance.prime_number)
+            return recovered == secret and len(shamir_instance.points) == 6 and shamir_instance.large_prime == large_prime
+
+        secrets = [secret * 7919 + (secret % 3) * 2**60 for secret in range(1, 801)]
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(split_and_recover, secrets))
+        finally:
+            sys.setswitchinterval(switch_interval)
+        self.assertTrue(all(results))
+        self.assertEqual(Shamir._PRIME, 2**4096 + 1761)
+
+    def test_instance_values(self):
+        """
+        Test of the instance values not being shared between instances
+        """
+        first, second = Shamir(), Shamir()
+        first.get_values('65', '4', '2', 2**3072 + 813)
+        self.assertEqual(second.points, [])
+        self.assertEqual(second.large_prime, Shamir._PRIME)
+        self.assertRaises(AttributeError, setattr, first, 'other_value', 1)
+        self.assertEqual(first.points[0].x, 1)
+
+class TestShareFile(unittest.TestCase):
+
+    def test_write_read_shares(self):
+        """
+        Test of writing many shares into a binary share file and reading them with the memory map
+        """
+        prime_number = field_prime(128)
+        shares = [point for points in Shamir().split_many(range(2000), 5, 3, prime_number) for point in points]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "shares.shr")
+            self.assertEqual(write_shares(path, iter(shares), prime_number), len(shares))
+            self.assertEqual(os.path.getsize(path), 8 + 16 + len(shares) * 18 + 4)
+            with ShareFile(path) as share_file:
+                self.assertEqual(share_file.prime_number, prime_number)
+                self.assertEqual(len(share_file), len(shares))
+                self.assertEqual(share_file[-1], shares[-1])
+                self.assertEqual(list(share_file), shares)
+                with share_file.y_view(-1) as y_view:
+                    self.assertEqual(int.from_bytes(y_view), shares[-1][1])
+                for index in (len(shares), -len(shares) - 1):
+                    self.assertRaises(IndexError, share_file.y_view, index)
+            self.assertEqual(read_shares(path), (prime_number, shares))
+
+    def test_corrupted_share_file(self):
+        """
+        Test of the checksum detecting a corrupted share file
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "shares.shr")
+            write_shares(path, [(1, 5), (2, 7)], Shamir._PRIME)
+            with open(path, "r+b") as file:
+                file.seek(600)
+                value = file.read(1)
+                file.seek(600)
+                file.write(bytes([value[0] ^ 1]))
+            self.assertRaises(ValueError, ShareFile, path)
+            with ShareFile(path, verify=False) as share_file:
+                self.assertFalse(share_file.verify())
+
+class TestRecoverySession(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_shares(self):
+        """
+        Test of a session receiving the shares concurrently, with duplicates, and recovering the secret with the k-th share
+        """
+        prime_number = PRIME_REGISTRY[521]
+        points = Shamir().split_many([987654321], 8, 5, prime_number)[0]
+        session = RecoverySession(5, prime_number)
+        waiter = asyncio.ensure_future(session.wait())
+        statuses = await asyncio.gather(*(session.add_share(x, y, prime_number) for x, y in points[:4] + points[:2]))
+        self.assertEqual(statuses.count(ACCEPTED), 4)
+        self.assertEqual(statuses.count(DUPLICATE), 2)
+        self.assertFalse(session.done())
+        self.assertEqual(session.missing(), 1)
+        self.assertEqual(await session.add_share(*points[6]), ACCEPTED)
+        self.assertEqual(await waiter, 987654321)
+        self.assertEqual(await session.add_share(*points[7]), COMPLETE)
+
+    async def test_invalid_shares(self):
+        """
+        Test of the shares rejected by the session
+        """
+        session = RecoverySession(2, 101)
+        await session.add_share(1, 5)
+        for x, y, prime_number in [(1, 6, None), (2, 5, 103), (0, 5, None), (2, 101, None)]:
+            with self.assertRaises(ValueError):
+                await session.add_share(x, y, prime_number)
+        self.assertEqual(session.shares, {1: 5})
+
+    async def test_client_server(self):
+        """
+        Test of the local recovery server receiving the shares of several clients
+        """
+        prime_number = PRIME_REGISTRY[256]
+        points = Shamir().split_many([2**200 + 3], 6, 3, prime_number)[0]
+        server = RecoveryServer(RecoverySession(3, prime_number))
+        port = await server.start()
+        try:
+            first, second = await asyncio.gather(submit_shares("127.0.0.1", port, points[:2], prime_number),
+                                                 submit_shares("127.0.0.1", port, [points[1], (9, 1)], prime_number + 2))
+            self.assertEqual([response["status"] for response in first], [ACCEPTED, ACCEPTED])
+            self.assertEqual([response["status"] for response in second], ["error", "error"])
+            last = await submit_shares("127.0.0.1", port, points[5:], prime_number)
+            self.assertTrue(last[0]["complete"])
+            self.assertEqual(await server.session.wait(), 2**200 + 3)
+        finally:
+            await server.close()
+
+class TestVerifiable(unittest.TestCase):
+
+    def test_group_parameters(self):
+        """
+        Test of the commitment groups of the known offsets and of a searched group
+        """
+        for prime_number in [PRIME_REGISTRY[127], PRIME_REGISTRY[256], PRIME_REGISTRY[1024]]:
+            group = feldman_group(prime_number)
+            self.assertTrue(is_probable_prime(group.modulus))
+            self.assertGreaterEqual(group.modulus.bit_length(), 2048)
+            self.assertEqual(pow(group.generator, prime_number, group.modulus), 1)
+        group = feldman_group(PRIME_REGISTRY[89], 512)
+        self.assertTrue(is_probable_prime(group.modulus))
+        self.assertEqual((group.modulus - 1) % PRIME_REGISTRY[89], 0)
+        with self.assertRaises(ValueError):
+            FeldmanGroup(group.modulus, group.order, 1)
+
+    def test_verify_shares(self):
+        """
+        Test of the single and the batch verification finding the corrupted shares
+        """
+        group = feldman_group(PRIME_REGISTRY[127])
+        shamir_instance = Shamir()
+        shamir_instance.get_values('1234567', '20', '5', group=group)
+        self.assertEqual(shamir_instance.prime_number, PRIME_REGISTRY[127])
+        self.assertEqual(len(shamir_instance.commitments), 5)
+        self.assertEqual(shamir_instance.commitments[0], pow(group.generator, 1234567, group.modulus))
+        points = shamir_instance.points
+        self.assertTrue(all(group.verify_share(point, shamir_instance.commitments) for point in points))
+        self.assertTrue(group.verify_shares(points, shamir_instance.commitments))
+        corrupted = list(points)
+        corrupted[3] = (4, (points[3].y + 1) % group.order)
+        corrupted[17] = (18, points[2].y)
+        self.assertFalse(group.verify_share(corrupted[3], shamir_instance.commitments))
+        self.assertFalse(group.verify_shares(corrupted, shamir_instance.commitments))
+        self.assertEqual(group.invalid_shares(corrupted, shamir_instance.commitments), [3, 17])
+        self.assertEqual(group.invalid_shares(points, shamir_instance.commitments), [])
+        with self.assertRaises(ValueError):
+            shamir_instance.get_values(str(2**127), '5', '3', group=group)
+
+    def test_pedersen_shares(self):
+        """
+        Test of the Pedersen commitments hiding equal secrets and the verification finding the corrupted shares
+        """
+        group = pedersen_group(PRIME_REGISTRY[127])
+        self.assertIs(group, pedersen_group(PRIME_REGISTRY[127]))
+        self.assertEqual(pow(group.blinding_generator, group.order, group.modulus), 1)
+        self.assertNotEqual(group.blinding_generator, group.generator)
+        shares, commitments = group.share(42, 12, 4)
+        _, other_commitments = group.share(42, 12, 4)
+        self.assertNotEqual(commitments[0], other_commitments[0])
+        self.assertNotIn(pow(group.generator, 42, group.modulus), commitments)
+        self.assertTrue(all(group.verify_share(share, commitments) for share in shares))
+        self.assertTrue(group.verify_shares(shares, commitments))
+        self.assertEqual(Shamir().reconstruct_secret_shamir([share[:2] for share in shares[5:9]], group.order), 42)
+        corrupted = list(shares)
+        corrupted[2] = shares[2]._replace(y=shares[2].y + 1)
+        corrupted[9] = shares[9]._replace(blinding=shares[8].blinding)
+        self.assertFalse(group.verify_shares(corrupted, commitments))
+        self.assertEqual(group.invalid_shares(corrupted, commitments), [2, 9])
+        self.assertRaises(ValueError, group.share, group.order, 5, 3)
+        self.assertRaises(ArithmeticError, group.share, 1, 3, 4)
+        with self.assertRaises(ValueError):
+            PedersenGroup(group.modulus, group.order, group.generator, group.generator)
+
+    def test_multi_exponentiation(self):
+        """
+        Test of the multi-exponentiation against the product of the powers
+        """
+        modulus = PRIME_REGISTRY[521]
+        bases = [3, 5, 2**300 + 1, modulus - 2, 7, 11]
+        exponents = [0, 1, 2**200 + 5, 12345, 2**520, 9]
+        expected = 1
+        for base, exponent in zip(bases, exponents):
+            expected = expected * pow(base, exponent, modulus) % modulus
+        self.assertEqual(multi_exponentiation(bases, exponents, modulus), expected)
+
+class TestRobustReconstruction(unittest.TestCase):
+
+    def test_interpolate(self):
+        """
+        Test of the interpolation of all the shares giving back the polynomial
+        """
+        prime_number = PRIME_REGISTRY[127]
+        polynomial = [5, 0, prime_number - 1, 7]
+        x_shares = [3, 1, 8, 2, 11]
+        y_shares = [horner_evaluation(polynomial, x, prime_number) for x in x_shares]
+        self.assertEqual(interpolate(x_shares, y_shares, prime_number), polynomial)
+
+    def test_corrupted_shares(self):
+        """
+        Test of the recovery of the secret and the corrupted shares up to the error bound (m - k) / 2
+        """
+        for prime_number in [PRIME_REGISTRY[61], Shamir._PRIME]:
+            points = sample(Shamir().split_many([987654321], 20, 6, prime_number)[0], 16)
+            for errors in range(6):
+                corrupted = list(points)
+                for index in range(0, 2 * errors, 2):
+                    corrupted[index] = (points[index][0], (points[index][1] + index + 1) % prime_number)
+                secret, faulty = robust_reconstruct(corrupted, 6, prime_number)
+                self.assertEqual(secret, 987654321)
+                self.assertEqual(faulty, list(range(0, 2 * errors, 2)))
+
+    def test_too_many_errors(self):
+        """
+        Test of the errors when there are more corrupted shares than the bound or not enough shares
+        """
+        prime_number = PRIME_REGISTRY[127]
+        points = Shamir().split_many([42], 10, 4, prime_number)[0]
+        corrupted = [(x, (y + 1) % prime_number) for x, y in points[:4]] + points[4:]
+        with self.assertRaises(ValueError):
+            robust_reconstruct(corrupted, 4, prime_number)
+        with self.assertRaises(ValueError):
+            robust_reconstruct(points[:3], 4, prime_number)
+        with self.assertRaises(ValueError):
+            robust_reconstruct(points[:4] + points[:1], 4, prime_number)
+
+class TestRefresh(unittest.TestCase):
+
+    def test_refresh_many(self):
+        """
+        Test of the refreshed shares recovering the same secrets and not matching the old shares
+        """
+        shamir_instance = Shamir()
+        prime_number = PRIME_REGISTRY[256]
+        secrets = [0, 1, 2**200, prime_number - 1]
+        old_shares = shamir_instance.split_many(secrets, 6, 3, prime_number)
+        new_shares = refresh_many(old_shares, 3, prime_number)
+        self.assertEqual([[x for x, _ in points] for points in new_shares], [list(range(1, 7))] * 4)
+        self.assertTrue(all(old != new for old, new in zip(old_shares, new_shares)))
+        self.assertEqual(shamir_instance.reconstruct_many([sample(points, 3) for points in new_shares], prime_number), secrets)
+        mixed = [old_shares[2][:2] + new_shares[2][2:3]]
+        self.assertNotEqual(shamir_instance.reconstruct_many(mixed, prime_number), [2**200])
+        self.assertEqual(shamir_instance.reconstruct_secret_shamir(refresh(new_shares[1][1:4], 3, prime_number), prime_number), 1)
+
+    def test_reshare_many(self):
+        """
+        Test of the resharing from 3-of-5 to 4-of-7 and to 2-of-3 shares
+        """
+        shamir_instance = Shamir()
+        prime_number = Shamir._PRIME
+        secrets = [123456789, 2**4000 + 3]
+        old_shares = shamir_instance.split_many(secrets, 5, 3, prime_number)
+        new_shares = reshare_many([sample(points, 3) for points in old_shares], 4, 7, prime_number)
+        self.assertEqual([len(points) for points in new_shares], [7, 7])
+        self.assertEqual(shamir_instance.reconstruct_many([sample(points, 4) for points in new_shares], prime_number), secrets)
+        self.assertNotEqual(shamir_instance.reconstruct_many([points[:3] for points in new_shares], prime_number), secrets)
+        smaller = reshare(new_shares[0][2:6], 2, 3, prime_number)
+        self.assertEqual(shamir_instance.reconstruct_secret_shamir(smaller[1:], prime_number), 123456789)
+        with self.assertRaises(ArithmeticError):
+            reshare(old_shares[0], 4, 3, prime_number)
+
+class TestProfiler(unittest.TestCase):
+
+    def test_profiler_records(self):
+        """
+        Test of the phases and the counters recorded while the profiler is enabled
+        """
+        original_points_generation, original_invert = Shamir.points_generation, shamir_secret_sharing.invert
+        with Profiler() as profiler:
+            shamir_instance = Shamir()
+            shamir_instance.get_values('123456789', '10', '4')
+            reconstruction_context.cache_clear()
+            shamir_instance.reconstruct_secret_shamir(shamir_instance.points[:4], shamir_instance.prime_number)
+            shamir_secret_sharing.search_prime(64)
+        records = json.loads(profiler.to_json())
+        self.assertIs(Shamir.points_generation, original_points_generation)
+        self.assertIs(shamir_secret_sharing.invert, original_invert)
+        self.assertEqual(set(records["phases"]), {"prime_search", "randomness", "evaluation", "inversion", "reconstruction"})
+        self.assertTrue(all(records["phases"][phase]["calls"] > 0 for phase in records["phases"]))
+        self.assertLessEqual(sum(record["time_s"] for record in records["phases"].values()), records["elapsed_s"])
+        self.assertEqual(records["counters"]["inversions"], 1)
+        self.assertGreaterEqual(records["counters"]["prime_candidates"], 1)
+        self.assertGreaterEqual(records["counters"]["urandom_bytes"], 8)
+        self.assertEqual(records["counters"]["modmul"], 4 * 4 + 4 * 7 + 10 + 4)
+        self.assertEqual(records["functions"]["Shamir.points_generation"], 1)
+        shamir_instance.get_values('5', '3', '2')
+        self.assertEqual(profiler.as_dict()["functions"]["Shamir.points_generation"], 1)
+
+    def test_recursion_depth(self):
+        """
+        Test of the recursion depth of the legacy coefficient selection and of the single enabled profiler
+        """
+        shamir_instance = Shamir()
+        shamir_instance.prime_number = 11
+        with Profiler() as profiler:
+            shamir_instance.random_number_coeff_selection(8, 1)
+            with self.assertRaises(RuntimeError):
+                Profiler().enable()
+        self.assertGreater(profiler.as_dict()["recursion_depth"]["Shamir.random_number_coeff_selection"], 1)
+        profiler.reset()
+        self.assertEqual(profiler.as_dict()["counters"], {"modmul": 0, "inversions": 0, "urandom_bytes": 0, "prime_candidates": 0})
+
+    def test_profiler_threads(self):
+        """
+        Test of the profiler measuring the engine calls of several threads at the same time
+        """
+        def share(secret):
+            shamir_instance = Shamir()
+            for _ in range(25):
+                shamir_instance.get_values(str(secret), '20', '5')
+                shamir_instance.reconstruct_secret_shamir(sample(shamir_instance.points, 5), shamir_instance.prime_number)
+            return shamir_instance.secret
+        with Profiler() as profiler:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                self.assertEqual(list(executor.map(share, range(1000, 1008))), list(range(1000, 1008)))
+        records = profiler.as_dict()
+        self.assertEqual(records["functions"]["Shamir.points_generation"], 200)
+        self.assertEqual(records["functions"]["Shamir.reconstruct_secret_shamir"], 200)
+        self.assertTrue(all(record["time_s"] >= 0 for record in records["phases"].values()))
+        # A thread waits inside the lagrange basis while another thread calculates one, the calls are not nested
+        inside, release = threading.Event(), threading.Event()
+        def wait(done, total):
+            inside.set()
+            release.wait(10)
+        with Profiler() as profiler:
+            waiting = threading.Thread(target=shamir_secret_sharing.ReconstructionContext, args=((1, 2, 3), 11, wait))
+            waiting.start()
+            inside.wait(10)
+            shamir_secret_sharing.lagrange_weights([1, 2], 11)
+            release.set()
+            waiting.join()
+        records = profiler.as_dict()
+        self.assertEqual(records["functions"]["lagrange_weights"], 2)
+        self.assertEqual(records["recursion_depth"]["lagrange_weights"], 1)   # The depth is counted per thread
+
+class TestCommandLine(unittest.TestCase):
+
+    def test_split_recover_batch(self):
+        """
+        Test of the command line sharing a batch file and recovering the secrets with k shares
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            secrets_path, shares_path, recovered_path = (os.path.join(directory, name) for name in ("secrets.txt", "shares.csv", "recovered.csv"))
+            with open(secrets_path, "w") as secrets_file:
+                secrets_file.write("# secrets\nfirst,1234\n\n98765432109876543210\n" + "".join("{}\n".format(secret) for secret in range(2000)))
+            self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "5", "-k", "3", "-i", secrets_path, "-o", shares_path]), 0)
+            with open(shares_path) as shares_file:
+                lines = shares_file.read().splitlines()
+            self.assertEqual(lines[0], "prime,{}".format(PRIME_REGISTRY[89]))
+            self.assertEqual(len(lines), 1 + 2002 * 5)
+            self.assertTrue(lines[1].startswith("first,1,"))
+            self.assertEqual(shamir_cli.main(["--quiet", "recover", "-k", "3", "-i", shares_path, "-o", recovered_path]), 0)
+            with open(recovered_path) as recovered_file:
+                recovered = recovered_file.read().splitlines()
+        self.assertEqual(recovered[:3], ["first,1234", "4,98765432109876543210", "5,0"])
+        self.assertEqual(recovered[-1], "2004,1999")
+
+    def test_subset_and_errors(self):
+        """
+        Test of the recovery with a subset of the shares and of the errors of the command line
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            shares_path = os.path.join(directory, "shares.csv")
+            self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "4", "-k", "2", "--secret", "42", "--prime-bits", "127", "-o", shares_path]), 0)
+            with open(shares_path) as shares_file:
+                prime_number, shares = shamir_cli.read_shares(shares_file)
+            self.assertEqual(prime_number, PRIME_REGISTRY[127])
+            self.assertEqual(Shamir().reconstruct_secret_shamir(shares["1"][2:], prime_number), 42)
+            self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "2", "-k", "3", "--secret", "42", "-o", shares_path]), 1)
+            self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "3", "-k", "2", "--secret", "4x", "-o", shares_path]), 1)
+            self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "3", "-k", "2", "--secret", "4", "--prime-bits", "100", "-o", shares_path]), 1)
+        with self.assertRaises(ValueError):
+            shamir_cli.read_shares(["1,1,2"])
+
+    def test_repeated_labels(self):
+        """
+        Test of the command line refusing repeated labels and given labels that collide with the line numbers
+        """
+        with self.assertRaises(ValueError):
+            shamir_cli.read_secrets(["a,5", "a,9"])
+        with self.assertRaises(ValueError):
+            shamir_cli.read_secrets(["2,5", "7"])
+        self.assertEqual(shamir_cli.read_secrets(["a2,5", "7"]), (["a2", "2"], [5, 7]))
+        with tempfile.TemporaryDirectory() as directory:
+            secrets_path, shares_path = os.path.join(directory, "secrets.txt"), os.path.join(directory, "shares.csv")
+            for batch in ("a,5\na,9\n", "2,5\n7\n"):
+                with open(secrets_path, "w") as secrets_file:
+                    secrets_file.write(batch)
+                self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "3", "-k", "2", "-i", secrets_path, "-o", shares_path]), 1)
+                self.assertFalse(os.path.exists(shares_path))
+
+    def test_invalid_split_keeps_output(self):
+        """
+        Test of the invalid parts and secrets being refused before the output file is overwritten
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            shares_path = os.path.join(directory, "shares.csv")
+            with open(shares_path, "w") as shares_file:
+                shares_file.write("previous")
+            self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "2", "-k", "3", "--secret", "5", "-o", shares_path]), 1)
+            self.assertEqual(shamir_cli.main(["--quiet", "split", "-n", "3", "-k", "2", "--secret", str(2**61), "--prime-bits", "61", "-o", shares_path]), 1)
+            with open(shares_path) as shares_file:
+                self.assertEqual(shares_file.read(), "previous")
+
+    def test_backend_restored(self):
+        """
+        Test of the backend option being restored in the process and in the environment when the command finishes
+        """
+        active, environment = shamir_secret_sharing.BACKEND, os.environ.get("SHAMIR_BACKEND")
+        other = BACKEND_GMPY2 if active == BACKEND_PYTHON else BACKEND_PYTHON
+        with tempfile.TemporaryDirectory() as directory:
+            shares_path = os.path.join(directory, "shares.csv")
+            for arguments in (["split", "-n", "3", "-k", "2", "--secret", "5", "-o", shares_path], ["split", "-n", "2", "-k", "3", "--secret", "5"]):
+                shamir_cli.main(["--quiet", "--backend", other] + arguments)
+                self.assertEqual(shamir_secret_sharing.BACKEND, active)
+                self.assertEqual(os.environ.get("SHAMIR_BACKEND"), environment)
+
+    def test_headless_import(self):
+        """
+        Test of the command line working through pipes without importing tkinter or gmpy2 with the builtin integers
+        """
+        command = [sys.executable, "-c", "import sys, shamir_cli; code = shamir_cli.main(); "
+                   "sys.exit(code or 3 * any(name in sys.modules for name in ('tkinter', 'gmpy2', 'numpy')))"]
+        directory = os.path.dirname(os.path.abspath(__file__))
+        shares = subprocess.run(command + ["--backend", "python-int", "split", "-n", "3", "-k", "2"], input="777\n", capture_output=True, text=True, cwd=directory)
+        self.assertEqual(shares.returncode, 0)
+        self.assertIn("shares/s", shares.stderr)
+        recovered = subprocess.run(command + ["--backend", "python-int", "--quiet", "recover"], input=shares.stdout, capture_output=True, text=True, cwd=directory)
+        self.assertEqual((recovered.returncode, recovered.stdout), (0, "1,777\n"))
+
+class TestBackgroundTask(unittest.TestCase):
+
+    def run_task(self, operation, *args):
+        task = shamir_worker.BackgroundTask(operation, *args).start()
+        self.assertTrue(task.join(30))
+        return task.poll()
+
+    def test_split_events(self):
+        """
+        Test of the background secret sharing sending the shares in batches with the progress
+        """
+        events = self.run_task(shamir_worker.split_secret, "123456789", "250", "5")
+        self.assertEqual(events[0][0], "prime")
+        shares = [share for event in events if event[0] == "shares" for share in event[1]]
+        self.assertEqual([len(event[1]) for event in events if event[0] == "shares"], [100, 100, 50])
+        self.assertEqual([event[1:] for event in events if event[0] == "progress"], [(100, 250), (200, 250), (250, 250)])
+        self.assertEqual(events[-1], ("result", events[0][1]))
+        self.assertEqual([x for x, _ in shares], list(range(1, 251)))
+        self.assertEqual(Shamir().reconstruct_secret_shamir(sample(shares, 5), events[0][1]), 123456789)
+
+    def test_recover_events(self):
+        """
+        Test of the background recovery reporting the progress of the lagrange basis
+        """
+        shamir_instance = Shamir()
+        shamir_instance.get_values("5555", "300", "200")
+        events = self.run_task(shamir_worker.recover_secret, sample(shamir_instance.points, 200), shamir_instance.prime_number)
+        progress = [event[1:] for event in events if event[0] == "progress"]
+        self.assertEqual(len(progress), 100)
+        self.assertEqual(progress[-1], (200, 200))
+        self.assertEqual(events[-1], ("result", 5555))
+
+    def test_cancel_and_errors(self):
+        """
+        Test of the cancellation of a recovery and of the errors sent as events
+        """
+        shamir_instance = Shamir()
+        shamir_instance.get_values("5555", "50", "50")
+        task = shamir_worker.BackgroundTask(shamir_worker.recover_secret, shamir_instance.points, shamir_instance.prime_number)
+        task.cancel()
+        self.assertTrue(task.start().join(30))
+        self.assertEqual(task.poll(), [("cancelled",)])
+        self.assertTrue(task.done())
+        events = self.run_task(shamir_worker.split_secret, "12", "3", "x")
+        self.assertEqual(events[0][0], "error")
+        self.assertIsInstance(events[0][1], TypeError)
+        events = self.run_task(shamir_worker.recover_secret, [(1, 2), (1, 3)], 11)
+        self.assertIsInstance(events[-1][1], ValueError)
+
+    def test_lazy_points(self):
+        """
+        Test of get_values without the points and of the progress of the lagrange basis
+        """
+        shamir_instance = Shamir()
+        shamir_instance.get_values("77", "6", "3", points=False)
+        self.assertEqual(shamir_instance.points, [])
+        points = list(shamir_instance.iter_points())
+        self.assertEqual(shamir_instance.reconstruct_secret_shamir(points[3:], shamir_instance.prime_number), 77)
+        progress = []
+        lagrange_weights([1, 2, 3], 11, lambda done, total: progress.append((done, total)))
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+class TestShareSet(unittest.TestCase):
+
+    def setUp(self):
+        self.shamir_instance = Shamir()
+        self.shamir_instance.get_values("98765432109876543210", "20", "5")
+        self.share_set = ShareSet.from_points(self.shamir_instance.iter_points(), self.shamir_instance.prime_number)
+
+    def test_share_set_values(self):
+        """
+        Test of the ShareSet storing the same shares as the list of points in a fixed width buffer
+        """
+        share_set = self.share_set
+        self.assertEqual(len(share_set), 20)
+        self.assertEqual(list(share_set), self.shamir_instance.points)
+        self.assertEqual(share_set[-1], self.shamir_instance.points[-1])
+        self.assertEqual(share_set.y_values(), [y for _, y in self.shamir_instance.points])
+        self.assertEqual(int.from_bytes(share_set.y_view(3)), self.shamir_instance.points[3].y)
+        self.assertEqual(share_set.nbytes(), 20 * (2 + share_set.width))
+        with self.assertRaises(ValueError):
+            ShareSet.from_points([(1, self.shamir_instance.prime_number)], self.shamir_instance.prime_number)
+        with self.assertRaises(ValueError):
+            ShareSet.from_points([(70000, 1)], self.shamir_instance.prime_number)
+
+    def test_share_set_views(self):
+        """
+        Test of the slices and subsets of a ShareSet sharing the buffers and recovering the secret
+        """
+        share_set = self.share_set
+        self.assertEqual(share_set[3:8].reconstruct(), 98765432109876543210)
+        self.assertEqual(list(share_set[::-4].positions()), [20, 16, 12, 8, 4])
+        self.assertEqual(share_set[::-4].reconstruct(), 98765432109876543210)
+        subset = share_set[10:].select([9, 0, 4, 2, 7])
+        self.assertEqual(list(subset.positions()), [20, 11, 15, 13, 18])
+        self.assertEqual(subset.reconstruct(), 98765432109876543210)
+        self.assertIs(subset._y, share_set._y)
+        self.assertEqual(subset.nbytes(), share_set.nbytes() + 5 * subset._indexes.itemsize)
+        self.assertEqual(self.shamir_instance.reconstruct_secret_shamir(share_set[:5], share_set.prime_number), 98765432109876543210)
+        with self.assertRaises(ValueError):
+            share_set.select([1, 1, 2, 3, 4]).reconstruct()
+
+    def test_memory_benchmark(self):
+        """
+        Test of the memory benchmark showing the ShareSet smaller than the list of tuples
+        """
+        results = benchmark_shamir.benchmark_memory(field_bits=(64, 4096), n_parts=200)
+        self.assertEqual([result["field_bits"] for result in results], [64, 4096])
+        self.assertTrue(all(result["share_set_per_share_b"] < result["tuples_per_share_b"] for result in results))
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_benchmark_report(self):
+        """
+        Test of the benchmark harness producing a JSON report that can be compared with itself
+        """
+        profile = {"prime_bits": (64,), "parts": ((2, 3),), "batch_sizes": (10,), "prime_search_bits": (64,), "repeat": 1}
+        report = json.loads(json.dumps(benchmark_shamir.run_benchmarks(profile)))
+        names = {result["benchmark"] for result in report["results"]}
+        self.assertTrue({"random_prime", "search_prime", "field_prime_search", "field_prime_cached", "polynomial_construction", "points_generation",
+                         "reconstruct_secret_shamir", "split_many", "reconstruct_many"} <= names)
+        comparison = benchmark_shamir.compare_results(report, report)
+        self.assertEqual(len(comparison), len(report["results"]))
+        self.assertTrue(all(result["ratio"] == 1 for result in comparison))
+
+class TestBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.active = shamir_secret_sharing.BACKEND
+
+    def tearDown(self):
+        use_backend(self.active)
+
+    def test_backends_agree(self):
+        """
+        Test of the splitting and the recovery giving the same results with every installed arithmetic backend
+        """
+        backends = [BACKEND_PYTHON] + ([BACKEND_GMPY2] if gmpy2 is not None else [])
+        points = Shamir().split_many([12345, Shamir._PRIME - 1], 5, 3)
+        for backend in backends:
+            self.assertEqual(use_backend(backend), backend)
+            recovered = [Shamir().reconstruct_secret_shamir(sample(shares, 3), Shamir._PRIME) for shares in points]
+            self.assertEqual(recovered, [12345, Shamir._PRIME - 1])
+            self.assertIs(type(recovered[0]), int)
+            self.assertEqual(batch_inverse([3, 2**100], Shamir._PRIME), [pow(3, -1, Shamir._PRIME), pow(2**100, -1, Shamir._PRIME)])
+            self.assertTrue(is_probable_prime(2**521 - 1))
+            self.assertFalse(is_probable_prime(3825123056546413051))
+            with self.assertRaises(ValueError):
+                Shamir().lagrange_basis_calculation([2, 2], 0, Shamir._PRIME)
+
+    def test_backend_context(self):
+        """
+        Test of the backend selected in a with statement being replaced by the previous one at the end of the block
+        """
+        with use_backend(BACKEND_PYTHON) as backend:
+            self.assertEqual(backend, BACKEND_PYTHON)
+            self.assertEqual(shamir_secret_sharing.BACKEND, BACKEND_PYTHON)
+            self.assertEqual(Shamir().reconstruct_secret_shamir(Shamir().split_many([77], 3, 2)[0][:2], Shamir._PRIME), 77)
+        self.assertEqual(shamir_secret_sharing.BACKEND, self.active)
+
+    def test_unknown_backend(self):
+        """
+        Test of the errors selecting a backend that does not exist or is not installed
+        """
+        with self.assertRaises(ValueError):
+            use_backend("fortran")
+        if gmpy2 is None:
+            with self.assertRaises(ImportError):
+                use_backend(BACKEND_GMPY2)
+
+    def test_backend_benchmark(self):
+        """
+        Test of the backend benchmark measuring every installed backend and restoring the active one
+        """
+        active = shamir_secret_sharing.BACKEND
+        results = benchmark_shamir.benchmark_backends(PRIME_REGISTRY[256], 3, 5, repeat=1)
+        self.assertEqual({result["operation"] for result in results}, {"points_generation", "reconstruct", "invert", "powmod"})
+        self.assertTrue(all(BACKEND_PYTHON in result for result in results))
+        self.assertEqual(shamir_secret_sharing.BACKEND, active)
+
+class TestCoefficientSource(unittest.TestCase):
+
+    def test_coefficients_range_and_counters(self):
+        """
+        Test of the coefficients being in the field and the counters of the bytes drawn and the reads
+        """
+        source = CoefficientSource(block_size=4096)
+        coefficients = source.coefficients(1000, 11)
+        self.assertEqual(set(coefficients), set(range(1, 11)))
+        self.assertEqual(source.stats()["reads"], 1)   # All the coefficients are taken from a single read
+        source.coefficients(10, 11)
+        source.coefficients(10, 11)
+        stats = source.stats()
+        self.assertEqual(stats["values"], 1020)
+        self.assertEqual(stats["reads"], 2)
+        self.assertEqual(stats["bytes_drawn"], 1000 * 9 + 4096)
+        source.reset_stats()
+        self.assertEqual(source.stats(), {"bytes_drawn": 0, "reads": 0, "values": 0, "rejections": 0})
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_coefficient_array(self):
+        """
+        Test of the numpy coefficients being in the field
+        """
+        coefficients = CoefficientSource().coefficient_array(1000, 2**31 - 1)
+        self.assertEqual(len(coefficients), 1000)
+        self.assertTrue(((coefficients >= 1) & (coefficients < 2**31 - 1)).all())
+
+    def test_polynomial_full_size_coefficients(self):
+        """
+        Test of the polynomial coefficients using the whole field instead of 40 bits values
+        """
+        shamir_instance = Shamir()
+        shamir_instance.get_values('9876543211234561231313123789', '7', '5')
+        self.assertEqual(shamir_instance.prime_number.bit_length(), 107)
+        self.assertTrue(max(coeff.bit_length() for coeff in shamir_instance.polynomial[1:]) > 90)
+
+    def test_negative_count(self):
+        """
+        Test of the error raised for a negative number of coefficients, the counters are not changed
+        """
+        source = CoefficientSource()
+        self.assertRaises(ValueError, source.coefficients, -1, 11)
+        if np is not None:
+            self.assertRaises(ValueError, source.coefficient_array, -1, 11)
+        self.assertEqual(source.stats()["values"], 0)
+        self.assertRaises(ValueError, Shamir().get_values, '5', '3', '0')
+
+    def test_forked_workers(self):
+        """
+        Test of the worker processes not repeating the buffered random bytes inherited from the parent process
+        """
+        prime_number = 2**127 - 1
+        shamir_secret_sharing.COEFFICIENT_SOURCE.coefficients(1, prime_number)   # The parent buffer is not empty
+        shares = shamir_parallel.split_many([0] * 8, 3, 2, prime_number, workers=4, chunk_size=1)
+        self.assertEqual(len({tuple(points) for points in shares}), 8)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file